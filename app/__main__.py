@@ -0,0 +1,209 @@
+"""
+Командная строка парсера: python -m app <команда>.
+
+Модули с pandas и aiohttp импортируются только внутри команд, которым
+они нужны, поэтому справка и выгрузка каталога стартуют быстро, а
+токен и чаты Telegram проверяются только командами, которым они нужны.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Optional, Sequence
+
+APP_DIR: str = os.path.dirname(os.path.abspath(__file__))
+for path in (os.path.dirname(APP_DIR), APP_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+CATALOG_URL_PREFIX: str = "https://www.wildberries.ru"
+DEFAULT_CATALOG_SECTIONS: tuple[str, ...] = ("zhenshchinam", "detyam")
+TEST_MESSAGE: str = "✅ Тестовое сообщение парсера Wildberries"
+
+
+def setup_logging(level: str) -> None:
+    from config import LoggingSettings  # pylint: disable=C0415
+    from logging_config import LogConfig, LoggerSetup, LogLevel  # pylint: disable=C0415
+
+    log_level: LogLevel = LogLevel[level]
+    LoggerSetup(
+        "app",
+        LogConfig(
+            level=log_level,
+            filename=None,
+            console_level=log_level,
+            use_queue=LoggingSettings.USE_QUEUE,
+            json_format=LoggingSettings.JSON_FORMAT,
+            rate_limit=LoggingSettings.RATE_LIMIT,
+            rate_burst=LoggingSettings.RATE_BURST,
+        ),
+    )
+
+
+def command_crawl(args: argparse.Namespace) -> int:
+    """Один цикл: сбор категорий, сравнение и уведомления."""
+    import main  # pylint: disable=C0415
+
+    runtime = main.build_runtime()
+    try:
+        succeeded: bool = asyncio.run(
+            main.run_once(runtime, main.scheduled_job(runtime, args.urls or None))
+        )
+    finally:
+        runtime.close()
+    return 0 if succeeded else 1
+
+
+def command_daemon(_args: argparse.Namespace) -> int:
+    """Циклы по расписанию до SIGTERM."""
+    import main  # pylint: disable=C0415
+
+    runtime = main.build_runtime()
+    try:
+        asyncio.run(main.run_daemon(runtime))
+    finally:
+        runtime.close()
+    return 0
+
+
+def command_diff(_args: argparse.Namespace) -> int:
+    """Сравнение уже собранных снимков без нового сбора."""
+    import main  # pylint: disable=C0415
+
+    runtime = main.build_runtime()
+    try:
+        succeeded: bool = asyncio.run(
+            main.run_once(runtime, main.compare_changes(runtime))
+        )
+    finally:
+        runtime.close()
+    return 0 if succeeded else 1
+
+
+def command_notify_test(args: argparse.Namespace) -> int:
+    """Отправка тестового сообщения во все чаты."""
+    from config import APIConfig  # pylint: disable=C0415
+    from notification import NotificationService  # pylint: disable=C0415
+
+    async def send() -> int:
+        async with NotificationService(
+            APIConfig.TOKEN, APIConfig.CHANNEL_IDS
+        ) as notification_service:
+            await notification_service.send_message(args.text)
+        return 1 if notification_service.failed else 0
+
+    return asyncio.run(send())
+
+
+def command_catalog_dump(args: argparse.Namespace) -> int:
+    """Выгрузка URL категорий каталога в файл для обхода."""
+    from config import (  # pylint: disable=C0415
+        APIConfig,
+        CatalogSettings,
+        DataDirectories,
+    )
+    from catalog_fetcher import CatalogFetcher  # pylint: disable=C0415
+
+    catalog_fetcher = CatalogFetcher(
+        APIConfig.CATALOG_URL,
+        APIConfig.PROXIES,
+        cache_ttl=CatalogSettings.CACHE_TTL,
+        cache_path=CatalogSettings.CACHE_PATH,
+    )
+    categories: list[dict] = asyncio.run(catalog_fetcher.get_categories())
+    if not categories:
+        print("Не удалось получить данные каталога", file=sys.stderr)
+        return 1
+
+    sections: Sequence[str] = (
+        () if args.all else args.section or DEFAULT_CATALOG_SECTIONS
+    )
+    urls: list[str] = [
+        f"{CATALOG_URL_PREFIX}{category['url']}"
+        for category in categories
+        if not sections or any(section in category["url"] for section in sections)
+    ]
+    output: str = args.output or DataDirectories.URLS_FILE_PATH
+    if output == "-":
+        sys.stdout.write("".join(f"{url}\n" for url in urls))
+    else:
+        with open(output, "w", encoding="utf-8") as file:
+            file.writelines(f"{url}\n" for url in urls)
+        print(f"Сохранено {len(urls)} URL в {output}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app", description="Парсер цен Wildberries"
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl = subparsers.add_parser("crawl", help="один цикл сбора и сравнения")
+    crawl.add_argument(
+        "urls", nargs="*", help="URL категорий; по умолчанию из urls.txt"
+    )
+    crawl.set_defaults(handler=command_crawl, notifications=True)
+
+    daemon = subparsers.add_parser("daemon", help="циклы по расписанию")
+    daemon.set_defaults(handler=command_daemon, notifications=True)
+
+    diff = subparsers.add_parser(
+        "diff", help="сравнить собранные снимки и отправить уведомления"
+    )
+    diff.set_defaults(handler=command_diff, notifications=True)
+
+    notify_test = subparsers.add_parser(
+        "notify-test", help="отправить тестовое сообщение в Telegram"
+    )
+    notify_test.add_argument("--text", default=TEST_MESSAGE)
+    notify_test.set_defaults(handler=command_notify_test, notifications=True)
+
+    catalog_dump = subparsers.add_parser(
+        "catalog-dump", help="выгрузить URL категорий каталога"
+    )
+    catalog_dump.add_argument(
+        "-o", "--output", help="файл для URL, '-' для вывода; по умолчанию urls.txt"
+    )
+    catalog_dump.add_argument(
+        "--section",
+        action="append",
+        help="часть URL раздела, можно повторять; по умолчанию "
+        + ", ".join(DEFAULT_CATALOG_SECTIONS),
+    )
+    catalog_dump.add_argument(
+        "--all", action="store_true", help="выгрузить все категории"
+    )
+    catalog_dump.set_defaults(handler=command_catalog_dump, notifications=False)
+    return parser
+
+
+def run(argv: Optional[Sequence[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv  # pylint: disable=C0415
+
+    load_dotenv()
+    if args.notifications:
+        from config import APIConfig  # pylint: disable=C0415
+
+        try:
+            APIConfig.validate()
+        except ValueError as err:
+            parser.exit(2, f"{parser.prog} {args.command}: {err}\n")
+    setup_logging(args.log_level)
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(run())
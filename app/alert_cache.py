@@ -0,0 +1,65 @@
+import time
+from logging import Logger, getLogger
+from typing import Optional
+
+from json_store import JsonStore
+
+logger: Logger = getLogger(__name__)
+
+
+class AlertDedupCache(JsonStore):
+    """
+    Ограниченный кеш отправленных уведомлений с ключом (id товара, цена).
+
+    Повторное снижение до той же цены в течение ttl секунд не отправляется,
+    даже если товар встретился в другой категории или в следующем цикле.
+    Запись добавляется при постановке уведомления в очередь и удаляется,
+    если его не удалось доставить. При превышении max_size вытесняются
+    самые старые записи.
+
+    :param path: Путь к JSON-файлу. Если None, кеш хранится только в памяти.
+    :param ttl: Время жизни записи в секундах.
+    :param max_size: Максимальное число записей.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, ttl: float = 86400, max_size: int = 100000
+    ) -> None:
+        super().__init__(path)
+        self.ttl: float = ttl
+        self.max_size: int = max_size
+        self.evict()
+
+    @staticmethod
+    def make_key(product_id: int, price: int | float) -> str:
+        return f"{int(product_id)}:{int(price)}"
+
+    def seen(self, product_id: int, price: int | float) -> bool:
+        """Проверяет, отправлялось ли уведомление о товаре по этой цене."""
+        sent_at: Optional[float] = self.data.get(self.make_key(product_id, price))
+        return sent_at is not None and time.time() - sent_at < self.ttl
+
+    def add(self, product_id: int, price: int | float) -> None:
+        key: str = self.make_key(product_id, price)
+        self.data.pop(key, None)
+        self.data[key] = time.time()
+        while len(self.data) > self.max_size:
+            del self.data[next(iter(self.data))]
+
+    def discard(self, key: str) -> bool:
+        """Удаляет запись, чтобы уведомление можно было отправить снова."""
+        return self.data.pop(key, None) is not None
+
+    def evict(self) -> None:
+        """Удаляет устаревшие записи."""
+        threshold: float = time.time() - self.ttl
+        expired: list[str] = [
+            key for key, sent_at in self.data.items() if sent_at < threshold
+        ]
+        for key in expired:
+            del self.data[key]
+        if expired:
+            logger.info("Из кеша уведомлений удалено записей: %d", len(expired))
+
+
+__all__ = ["AlertDedupCache"]
@@ -1,70 +1,204 @@
-from typing import Optional, List
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, ClassVar, Optional, List
 from logging import Logger, getLogger
-import requests
+
+import aiohttp
+
+from catalog_index import CatalogIndex, flatten_catalog
+from proxy_pool import ProxyPool
 
 logger: Logger = getLogger(__name__)
 
 
+@dataclass
+class CachedCatalog:
+    """Закешированная копия каталога с метаданными для перепроверки."""
+
+    data: Any
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    index: Optional[CatalogIndex] = None
+
+
 class CatalogFetcher:
-    def __init__(self, catalog_url: str, proxies: dict[str, str]) -> None:
+    HEADERS: ClassVar[dict[str, str]] = {
+        "Accept": "*/*",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    }
+
+    _cache: ClassVar[dict[str, CachedCatalog]] = {}
+    _locks: ClassVar[dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Lock]]] = {}
+
+    def __init__(
+        self,
+        catalog_url: str,
+        proxies: dict[str, str],
+        cache_ttl: int = 3600,
+        cache_path: Optional[str] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+    ) -> None:
         self.catalog_url: str = catalog_url
         self.proxies: dict[str, str] = proxies
+        self.cache_ttl: int = cache_ttl
+        self.cache_path: Optional[str] = (
+            os.path.abspath(cache_path) if cache_path else None
+        )
+        self.proxy_pool: ProxyPool = proxy_pool or ProxyPool([proxies.get("http")])
+
+    async def get_catalog(self) -> Optional[Any]:
+        """
+        Возвращает каталог из общего для процесса кеша.
+
+        Пока копия моложе cache_ttl, сеть не используется. Устаревшая копия
+        перепроверяется запросом с ETag/If-Modified-Since, а при ошибке
+        загрузки возвращается последняя успешно полученная копия.
+        """
+        entry: Optional[CachedCatalog] = await self._get_entry()
+        return entry.data if entry else None
+
+    async def get_index(self) -> Optional[CatalogIndex]:
+        """
+        Возвращает индекс категорий закешированного каталога. Индекс
+        строится один раз на каждую загруженную версию каталога.
+        """
+        entry: Optional[CachedCatalog] = await self._get_entry()
+        if entry is None:
+            logger.warning("Не удалось получить данные каталога.")
+            return None
+        if entry.index is None:
+            entry.index = CatalogIndex.from_catalog(entry.data)
+            logger.info("Построен индекс каталога: %d категорий", len(entry.index))
+        return entry.index
+
+    async def get_categories(self) -> List[dict]:
+        """Возвращает плоский список категорий из закешированного каталога."""
+        index: Optional[CatalogIndex] = await self.get_index()
+        return index.categories if index else []
+
+    def _is_fresh(self, entry: Optional[CachedCatalog]) -> bool:
+        return entry is not None and time.time() - entry.fetched_at < self.cache_ttl
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock_loop, lock = self._locks.get(self.catalog_url, (None, None))
+        if lock is None or lock_loop is not loop:
+            lock = asyncio.Lock()
+            self._locks[self.catalog_url] = (loop, lock)
+        return lock
+
+    async def _get_entry(self) -> Optional[CachedCatalog]:
+        entry: Optional[CachedCatalog] = self._cache.get(self.catalog_url)
+        if self._is_fresh(entry):
+            return entry
+
+        async with self._get_lock():
+            entry = self._cache.get(self.catalog_url)
+            if entry is None and self.cache_path:
+                entry = await asyncio.to_thread(self._load_from_disk)
+                if entry is not None:
+                    self._cache[self.catalog_url] = entry
+            if self._is_fresh(entry):
+                return entry
+
+            refreshed: Optional[CachedCatalog] = await self._revalidate(entry)
+            if refreshed is None:
+                if entry is not None:
+                    logger.warning("Используется последняя сохраненная копия каталога")
+                return entry
 
-    def get_catalogs_wb(self) -> Optional[dict]:
-        headers: dict[str, str] = {
-            "Accept": "*/*",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        }
+            self._cache[self.catalog_url] = refreshed
+            if self.cache_path:
+                await asyncio.to_thread(self._save_to_disk, refreshed)
+            return refreshed
+
+    async def _revalidate(
+        self, entry: Optional[CachedCatalog]
+    ) -> Optional[CachedCatalog]:
+        """Загружает каталог, отправляя условный запрос, если есть копия."""
+        headers: dict[str, str] = dict(self.HEADERS)
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        timeout = aiohttp.ClientTimeout(connect=10, sock_read=20)
         try:
-            response: requests.Response = requests.get(
-                url=self.catalog_url,
-                headers=headers,
-                proxies=self.proxies,
-                timeout=(10, 20),
-            )
-            response.raise_for_status()
-            logger.info("Успешно получили данные каталога")
-            return response.json()
-        except requests.exceptions.HTTPError as http_err:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with self.proxy_pool.lease() as proxy, session.get(
+                    self.catalog_url,
+                    headers=headers,
+                    proxy=proxy.url,
+                ) as response:
+                    if response.status == 304 and entry is not None:
+                        logger.info("Каталог не изменился")
+                        entry.fetched_at = time.time()
+                        return entry
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+                    logger.info("Успешно получили данные каталога")
+                    return CachedCatalog(
+                        data=data,
+                        fetched_at=time.time(),
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                    )
+        except aiohttp.ClientResponseError as http_err:
             logger.error("Произошла ошибка HTTP: %s", http_err)
-        except requests.exceptions.RequestException as req_err:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
             logger.error("Произошла ошибка запроса: %s", req_err)
         except ValueError as json_err:
             logger.error("Ошибка декодирования JSON: %s", json_err)
         return None
 
+    def _load_from_disk(self) -> Optional[CachedCatalog]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                stored: dict = json.load(file)
+            logger.info("Каталог загружен из кеша %s", self.cache_path)
+            return CachedCatalog(
+                data=stored["data"],
+                fetched_at=stored.get("fetched_at", 0),
+                etag=stored.get("etag"),
+                last_modified=stored.get("last_modified"),
+            )
+        except (OSError, ValueError, KeyError) as err:
+            logger.warning("Не удалось прочитать кеш каталога: %s", err)
+            return None
+
+    def _save_to_disk(self, entry: CachedCatalog) -> None:
+        tmp_path: str = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "data": entry.data,
+                        "fetched_at": entry.fetched_at,
+                        "etag": entry.etag,
+                        "last_modified": entry.last_modified,
+                    },
+                    file,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, self.cache_path)
+        except OSError as err:
+            logger.warning("Не удалось сохранить кеш каталога: %s", err)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Сбрасывает кеш каталога в памяти процесса."""
+        cls._cache.clear()
+        cls._locks.clear()
+
     def get_data_category(self, catalogs_wb: Optional[dict]) -> List[dict]:
         if not catalogs_wb:
             logger.warning("Не удалось получить данные каталога.")
             return []
-
-        catalog_data = []
-        if isinstance(catalogs_wb, dict):
-            if "childs" not in catalogs_wb:
-                catalog_data.append(
-                    {
-                        "name": catalogs_wb.get("name", "Неизвестная категория"),
-                        "shard": catalogs_wb.get("shard"),
-                        "url": catalogs_wb.get("url"),
-                        "query": catalogs_wb.get("query"),
-                    }
-                )
-            else:
-                catalog_data.extend(
-                    self.get_data_category(catalogs_wb.get("childs", []))
-                )
-        else:
-            for child in catalogs_wb:
-                catalog_data.extend(self.get_data_category(child))
-        return catalog_data
-
-    @staticmethod
-    def search_category_in_catalog(
-        url: str, catalog_list: List[dict]
-    ) -> Optional[dict]:
-        for catalog in catalog_list:
-            if catalog["url"] == url.split("https://www.wildberries.ru")[-1]:
-                logger.info("Найдено совпадение: %s", catalog["name"])
-                return catalog
-        logger.warning("Категория не найдена в каталоге.")
-        return None
+        return flatten_catalog(catalogs_wb)
@@ -0,0 +1,82 @@
+from logging import Logger, getLogger
+from typing import Any, Iterable, Optional
+from urllib.parse import urlsplit
+
+logger: Logger = getLogger(__name__)
+
+
+class CatalogIndex:
+    """
+    Индекс категорий каталога для поиска за O(1).
+
+    Строится один раз на версию каталога: по нормализованному пути URL
+    и по паре (shard, query).
+    """
+
+    def __init__(self, categories: Iterable[dict]) -> None:
+        self.categories: list[dict] = list(categories)
+        self._by_path: dict[str, dict] = {}
+        self._by_shard_query: dict[tuple[str, str], dict] = {}
+        for category in self.categories:
+            if category.get("url"):
+                self._by_path.setdefault(self.normalize_path(category["url"]), category)
+            if category.get("shard") and category.get("query"):
+                self._by_shard_query.setdefault(
+                    (category["shard"], category["query"]), category
+                )
+
+    @classmethod
+    def from_catalog(cls, catalogs_wb: Any) -> "CatalogIndex":
+        """Создает индекс из дерева каталога."""
+        return cls(flatten_catalog(catalogs_wb))
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    @staticmethod
+    def normalize_path(url: str) -> str:
+        """
+        Приводит URL категории к пути вида /catalog/a/b: отбрасывает схему,
+        хост, query-строку, фрагмент, завершающий слеш и регистр.
+        """
+        url = url.strip()
+        parts = urlsplit(url if "://" in url or url.startswith("/") else f"//{url}")
+        path: str = parts.path or "/"
+        return "/" + path.strip("/").lower()
+
+    def find_by_url(self, url: str) -> Optional[dict]:
+        category: Optional[dict] = self._by_path.get(self.normalize_path(url))
+        if category is None:
+            logger.warning("Категория не найдена в каталоге.")
+        else:
+            logger.info("Найдено совпадение: %s", category["name"])
+        return category
+
+    def find_by_shard_query(self, shard: str, query: str) -> Optional[dict]:
+        return self._by_shard_query.get((shard, query))
+
+
+def flatten_catalog(catalogs_wb: Any) -> list[dict]:
+    """Обходит дерево каталога без рекурсии и возвращает список листьев."""
+    categories: list[dict] = []
+    stack: list[Any] = [catalogs_wb]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            if "childs" in node:
+                stack.extend(reversed(node.get("childs") or []))
+            else:
+                categories.append(
+                    {
+                        "name": node.get("name", "Неизвестная категория"),
+                        "shard": node.get("shard"),
+                        "url": node.get("url"),
+                        "query": node.get("query"),
+                    }
+                )
+    return categories
+
+
+__all__ = ["CatalogIndex", "flatten_catalog"]
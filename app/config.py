@@ -1,15 +1,45 @@
 import os
 
+APP_DIR: str = os.path.dirname(os.path.abspath(__file__))
+
 
 class APIConfig:
     PROXIES: dict[str, str] = {"http": os.getenv("proxy")}
-    TOKEN: str = os.getenv("token")
-    CHANNEL_IDS: list[str] = os.getenv("channel_id").split(",")
+    PROXY_LIST: list[str] = [
+        proxy.strip()
+        for proxy in (os.getenv("proxies") or os.getenv("proxy") or "").split(",")
+        if proxy.strip()
+    ]
+    TOKEN: str | None = os.getenv("token")
+    CHANNEL_IDS: list[str] = [
+        channel_id.strip()
+        for channel_id in (os.getenv("channel_id") or "").split(",")
+        if channel_id.strip()
+    ]
     CATALOG_URL: str = (
         "https://static-basket-01.wbbasket.ru/vol0/data/main-menu-ru-ru-v2.json"
     )
     PRICE_DIFFERENCE_PERCENTAGE: int | float = 30
 
+    @classmethod
+    def validate(cls) -> None:
+        """
+        Проверяет настройки, без которых нельзя отправлять уведомления.
+        Вызывается командами, которым они нужны, а не при импорте.
+        """
+        missing: list[str] = [
+            name
+            for name, value in (("token", cls.TOKEN), ("channel_id", cls.CHANNEL_IDS))
+            if not value
+        ]
+        if missing:
+            raise ValueError(f"Не заданы переменные окружения: {', '.join(missing)}")
+
+
+class CatalogSettings:
+    CACHE_TTL: int = 3600
+    CACHE_PATH: str = os.path.join(APP_DIR, "catalog_cache.json")
+
 
 class PriceSettings:
     LOW_PRICE: int = 100
@@ -18,19 +48,114 @@ class PriceSettings:
 
 
 class DataDirectories:
-    CURRENT_DATA_DIR: str = "current_data"
-    PREVIOUS_DATA_DIR: str = "previous_data"
-    CHANGES_DATA_DIR: str = "changes_data"
-    URLS_FILE_PATH: str = "urls.txt"
+    CURRENT_DATA_DIR: str = os.path.join(APP_DIR, "current_data")
+    PREVIOUS_DATA_DIR: str = os.path.join(APP_DIR, "previous_data")
+    CHANGES_DATA_DIR: str = os.path.join(APP_DIR, "changes_data")
+    URLS_FILE_PATH: str = os.path.join(APP_DIR, "urls.txt")
+
+
+class SnapshotSettings:
+    FORMAT: str = "parquet"
+    EXPORT_CSV: bool = False
+    DIFF_WORKERS: int | None = None
+    DEDUPLICATE_PRODUCTS: bool = True
+    PRODUCT_INDEX_PATH: str = os.path.join(APP_DIR, "product_index.json")
+
+
+class NotificationSettings:
+    QUEUE_PATH: str = os.path.join(APP_DIR, "notifications_queue.jsonl")
+    FLUSH_TIMEOUT: float = 30
+
+
+class AlertCacheSettings:
+    PATH: str = os.path.join(APP_DIR, "alert_cache.json")
+    TTL: int = 86400
+    MAX_SIZE: int = 100000
+
+
+class StorageSettings:
+    BACKEND: str = "sqlite"
+    DB_PATH: str = os.path.join(APP_DIR, "prices.db")
+    BATCH_SIZE: int = 5000
 
 
 class ScheduleSettings:
     SCHEDULE_INTERVAL: int = 15
+    JITTER: float = 0
+    SHUTDOWN_TIMEOUT: int = 60
+    CATEGORY_INTERVALS: dict[str, int] = {}
     MAX_URLS_TO_PARSE: int = 50
     START_PAGE: int = 1
     END_PAGE: int = 31
 
 
+class AdaptiveScheduleSettings:
+    ENABLED: bool = True
+    STATS_PATH: str = os.path.join(APP_DIR, "volatility.json")
+    MIN_INTERVAL: int = 15
+    MAX_INTERVAL: int = 900
+    SMOOTHING: float = 0.3
+
+
+class LoggingSettings:
+    USE_QUEUE: bool = True
+    JSON_FORMAT: bool = False
+    RATE_LIMIT: float | None = 5
+    RATE_BURST: float | None = 20
+
+
+class MetricsSettings:
+    ENABLED: bool = True
+    HOST: str = os.getenv("metrics_host") or "127.0.0.1"
+    PORT: int = 9108
+    DUMP_PATH: str = os.path.join(APP_DIR, "metrics.json")
+
+
+class ConnectionSettings:
+    LIMIT: int = 100
+    LIMIT_PER_HOST: int = 30
+    KEEPALIVE_TIMEOUT: int = 60
+    DNS_CACHE_TTL: int = 300
+    REQUEST_TIMEOUT: int = 20
+
+
+class ProxySettings:
+    MAX_CONCURRENT_PER_PROXY: int = 30
+    FAILURE_THRESHOLD: int = 3
+    QUARANTINE_TIME: int = 60
+
+
+class RetrySettings:
+    MAX_ATTEMPTS: int = 5
+    BASE_DELAY: float = 0.5
+    MAX_DELAY: float = 30.0
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30.0
+
+
+class PaginationSettings:
+    PAGE_SIZE: int = 100
+    PROBE_WINDOW: int = 5
+    DEPTH_CACHE_PATH: str = os.path.join(APP_DIR, "page_depth.json")
+
+
+class FingerprintSettings:
+    ENABLED: bool = True
+    CACHE_PATH: str = os.path.join(APP_DIR, "page_fingerprints.json")
+
+
+class PriceBandSettings:
+    BAND_CACHE_PATH: str = os.path.join(APP_DIR, "price_bands.json")
+    MIN_BAND_WIDTH: int = 1
+
+
+class ConcurrencySettings:
+    MAX_CONCURRENT_CATEGORIES: int = 5
+    MAX_CONCURRENT_REQUESTS: int = 30
+    REQUESTS_PER_SECOND: float = 20
+    REQUESTS_BURST: float = 30
+
+
 class Headers:
     HEADERS: dict[str, str] = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/113.0",
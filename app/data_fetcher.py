@@ -1,21 +1,118 @@
 from logging import Logger, getLogger
-from typing import Any
+from contextlib import nullcontext
+from typing import Any, Optional
 import asyncio
+import time
 import aiohttp
 
+from fast_json import loads
+from metrics import MetricsRegistry
 from page_params import PageParams
+from proxy_pool import ProxyPool
+from rate_limiter import RequestBudget
+from retry import CircuitBreaker, CircuitBreakers, RetryPolicy
 
 logger: Logger = getLogger(__name__)
 
 
+class FetchError(Exception):
+    """Страница не получена: шард недоступен, попытки исчерпаны или ответ испорчен."""
+
+
 class DataFetcher:
-    def __init__(self, proxies: dict[str, str], headers: dict[str, str]) -> None:
+    def __init__(
+        self,
+        proxies: dict[str, str],
+        headers: dict[str, str],
+        limit: int = 100,
+        limit_per_host: int = 30,
+        keepalive_timeout: int = 60,
+        dns_cache_ttl: int = 300,
+        request_timeout: int = 20,
+        base_url: str = "https://catalog.wb.ru/catalog",
+        request_budget: Optional[RequestBudget] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
         self.proxies: dict[str, str] = proxies
         self.headers: dict[str, str] = headers
+        self.limit: int = limit
+        self.limit_per_host: int = limit_per_host
+        self.keepalive_timeout: int = keepalive_timeout
+        self.dns_cache_ttl: int = dns_cache_ttl
+        self.request_timeout: int = request_timeout
+        self.base_url: str = base_url
+        self.request_budget: Optional[RequestBudget] = request_budget
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.circuit_breakers: CircuitBreakers = circuit_breakers or CircuitBreakers()
+        self.proxy_pool: ProxyPool = proxy_pool or ProxyPool(
+            [proxies.get("http")], max_concurrent_per_proxy=limit_per_host
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.metrics: MetricsRegistry = metrics or MetricsRegistry()
+        self._requests = self.metrics.counter(
+            "wb_requests_total", "Запросы страниц каталога", ("shard", "status")
+        )
+        self._latency = self.metrics.histogram(
+            "wb_request_seconds", "Время получения страницы каталога", ("shard",)
+        )
+        self._retries = self.metrics.counter(
+            "wb_retries_total", "Повторные запросы страниц", ("shard", "reason")
+        )
+        self._received_bytes = self.metrics.counter(
+            "wb_received_bytes_total", "Получено байт от каталога", ("shard",)
+        )
+        self._rejected = self.metrics.counter(
+            "wb_circuit_rejections_total",
+            "Запросы, отклоненные выключателем шарда",
+            ("shard",),
+        )
 
-    async def scrap_page(self, page_params: PageParams) -> dict:
-        """Сбор данных со страниц"""
-        base_url: str = f"https://catalog.wb.ru/catalog/{page_params.shard}/catalog"
+    async def __aenter__(self) -> "DataFetcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Создает общую сессию с пулом соединений."""
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        )
+        logger.info(
+            "Создана сессия: лимит соединений %d, на хост %d",
+            self.limit,
+            self.limit_per_host,
+        )
+
+    async def close(self) -> None:
+        """Закрывает общую сессию и все соединения пула."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("Сессия не открыта. Вызовите start() перед запросами.")
+        return self._session
+
+    def build_url(self, page_params: PageParams) -> str:
+        base_url: str = f"{self.base_url}/{page_params.shard}/catalog"
         query_params: dict[str, Any] = {
             "appType": 1,
             "curr": "rub",
@@ -30,44 +127,114 @@ class DataFetcher:
         if page_params.discount is not None:
             query_params["discount"] = page_params.discount
 
-        url: str = f"{base_url}?{page_params.query}&" + "&".join(
+        return f"{base_url}?{page_params.query}&" + "&".join(
             [f"{key}={value}" for key, value in query_params.items()]
         )
 
-        async with aiohttp.ClientSession() as session:
+    async def scrap_page(self, page_params: PageParams) -> dict:
+        """
+        Сбор данных со страницы.
+
+        Повторяет запрос только при ошибках сети, тайм-аутах и кодах из
+        retry_policy, выдерживая Retry-After или экспоненциальную задержку
+        с джиттером. Пока выключатель шарда разомкнут, запросы к нему не
+        отправляются.
+
+        :raises FetchError: Если страницу получить не удалось. Пустой
+            словарь не возвращается, чтобы сбой нельзя было принять за
+            пустую страницу.
+        """
+        url: str = self.build_url(page_params)
+        breaker: CircuitBreaker = self.circuit_breakers.get(page_params.shard)
+        max_attempts: int = self.retry_policy.max_attempts
+
+        shard: str = page_params.shard
+
+        for attempt in range(max_attempts):
+            if not breaker.allow():
+                self._rejected.inc(shard=shard)
+                logger.warning(
+                    "Шард %s недоступен, страница %d пропущена",
+                    shard,
+                    page_params.page,
+                )
+                raise FetchError(f"шард {shard} недоступен")
+
+            retry_after: Optional[str] = None
+            retry_reason: str = "error"
             try:
-                for attempt in range(5):
-                    async with session.get(
-                        url=url,
-                        headers=self.headers,
-                        proxy=self.proxies.get("http"),
-                        timeout=20,
-                    ) as response:
+                async with self.request_budget or nullcontext():
+                    async with self.proxy_pool.lease() as proxy:
+                        started: float = time.perf_counter()
+                        async with self.session.get(
+                            url=url,
+                            proxy=proxy.url,
+                        ) as response:
+                            body: bytes = (
+                                await response.read() if response.status == 200 else b""
+                            )
+                        self._requests.inc(shard=shard, status=response.status)
+                        self._latency.observe(
+                            time.perf_counter() - started, shard=shard
+                        )
                         if response.status == 200:
+                            self._received_bytes.inc(len(body), shard=shard)
+                            data: dict = loads(body)
+                            breaker.record_success()
                             logger.info(
                                 "Статус: %d Страница %d Идет сбор...",
                                 response.status,
                                 page_params.page,
                             )
-                            return await response.json(content_type=None)
+                            return data
+                        if not self.retry_policy.is_retryable(response.status):
+                            breaker.record_success()
+                            logger.error(
+                                "Статус %d для страницы %d, повтор не имеет смысла",
+                                response.status,
+                                page_params.page,
+                            )
+                            raise FetchError(f"статус {response.status}")
+                        retry_after = response.headers.get("Retry-After")
+                        retry_reason = str(response.status)
                         logger.warning(
                             "Попытка %d: неудачный статус %d для страницы %d",
                             attempt + 1,
                             response.status,
                             page_params.page,
                         )
-                        await asyncio.sleep(1)
-
+                        if response.status == 429:
+                            proxy.mark_failed()
+                        if (
+                            response.status != 429
+                            or breaker.state == CircuitBreaker.HALF_OPEN
+                        ):
+                            breaker.record_failure()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._requests.inc(shard=shard, status="error")
+                breaker.record_failure()
+                logger.warning(
+                    "Попытка %d: ошибка соединения для страницы %d: %s",
+                    attempt + 1,
+                    page_params.page,
+                    str(e) or type(e).__name__,
+                )
+            except ValueError as json_err:
+                breaker.record_failure()
                 logger.error(
-                    "Не удалось получить данные со страницы %d после 5 попыток.",
+                    "Ошибка декодирования JSON страницы %d: %s",
                     page_params.page,
+                    json_err,
                 )
-                return {}
+                raise FetchError("ответ не является JSON") from json_err
 
-            except aiohttp.ClientError as e:
-                logger.error("Ошибка соединения: %s", str(e))
-                return {}
+            if attempt + 1 < max_attempts:
+                self._retries.inc(shard=shard, reason=retry_reason)
+                await asyncio.sleep(self.retry_policy.delay(attempt, retry_after))
 
-            except asyncio.TimeoutError:
-                logger.error("Тайм-аут при запросе страницы %d", page_params.page)
-                return {}
+        logger.error(
+            "Не удалось получить данные со страницы %d после %d попыток.",
+            page_params.page,
+            max_attempts,
+        )
+        raise FetchError(f"попытки исчерпаны ({max_attempts})")
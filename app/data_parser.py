@@ -1,15 +1,41 @@
 import asyncio
 from dataclasses import dataclass
 from logging import Logger, getLogger
+from typing import Any, Awaitable
+
+import pandas as pd
 
 from page_params import PageParams
 from catalog_fetcher import CatalogFetcher
-from data_fetcher import DataFetcher
+from catalog_index import CatalogIndex
+from data_fetcher import DataFetcher, FetchError
 from data_processor import DataProcessor
+from metrics import MetricsRegistry
+from page_fingerprint import FingerprintStore, category_fingerprint, page_fingerprint
+from product_columns import ProductColumns
+from pagination import (
+    PageDepthStore,
+    count_products,
+    get_total,
+    last_page_from_total,
+)
+from price_bands import BandResult, PriceBandStore, merge_bands, split_band
 
 logger: Logger = getLogger(__name__)
 
 
+async def gather_all(*aws: Awaitable[Any]) -> list[Any]:
+    """
+    Дожидается всех задач и только затем поднимает первую ошибку, чтобы
+    после сбоя одной страницы остальные запросы не оставались без хозяина.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
 @dataclass
 class ParserConfig:
     """Конфигурация для парсера."""
@@ -19,6 +45,14 @@ class ParserConfig:
     discount: int = 0
 
 
+@dataclass
+class CrawlResult:
+    """Итог обхода категории: имя снимка и число запрошенных страниц."""
+
+    name: str
+    requests: int
+
+
 class Parser:
     def __init__(
         self,
@@ -26,11 +60,46 @@ class Parser:
         proxies: dict[str, str],
         data_processor: DataProcessor,
         config: ParserConfig,
+        data_fetcher: DataFetcher | None = None,
+        catalog_fetcher: CatalogFetcher | None = None,
+        page_depth_store: PageDepthStore | None = None,
+        price_band_store: PriceBandStore | None = None,
+        min_band_width: int = 1,
+        page_size: int = 100,
+        probe_window: int = 5,
+        fingerprint_store: FingerprintStore | None = None,
+        metrics: MetricsRegistry | None = None,
     ) -> None:
         self.catalog_url: str = catalog_url
         self.proxies: dict[str, str] = proxies
         self.data_processor: DataProcessor = data_processor
         self.config: ParserConfig = config
+        self.data_fetcher: DataFetcher | None = data_fetcher
+        self.catalog_fetcher: CatalogFetcher = catalog_fetcher or CatalogFetcher(
+            catalog_url, proxies
+        )
+        self.page_depth_store: PageDepthStore = page_depth_store or PageDepthStore()
+        self.price_band_store: PriceBandStore = price_band_store or PriceBandStore()
+        self.min_band_width: int = min_band_width
+        self.page_size: int = page_size
+        self.probe_window: int = probe_window
+        self.crawl_results: dict[str, CrawlResult] = {}
+        self.fingerprint_store: FingerprintStore | None = fingerprint_store
+        self._page_frames: dict[str, dict[str, pd.DataFrame]] = {}
+        self.metrics: MetricsRegistry = metrics or MetricsRegistry()
+        self._products_per_page = self.metrics.histogram(
+            "wb_products_per_page",
+            "Товаров на странице каталога",
+            buckets=(0, 1, 10, 25, 50, 75, 99, 100),
+        )
+        self._products = self.metrics.counter(
+            "wb_products_total", "Собрано товаров по категориям", ("category",)
+        )
+        self._page_cache = self.metrics.counter(
+            "wb_page_cache_total",
+            "Страницы, взятые из кеша или разобранные",
+            ("result",),
+        )
 
     async def run(
         self,
@@ -41,23 +110,33 @@ class Parser:
     ) -> None:
         try:
             logger.info("Текущая конфигурация: %s", self.config)
-            catalog_data = await self.fetch_catalog_data()
-            if not catalog_data:
+            catalog_index = await self.fetch_catalog_index()
+            if not catalog_index:
                 logger.error("Не удалось получить данные каталога.")
                 return
 
-            category = self.get_category(url, catalog_data)
+            category = catalog_index.find_by_url(url)
             if category is None:
                 logger.error("Ошибка! Категория не найдена для URL: %s", url)
                 return
 
-            data_list = await self.fetch_data_pages(
+            products_df = await self.fetch_data_pages(
                 headers,
                 category,
                 start_page,
                 end_page,
             )
-            self.save_data(data_list, category, url)
+            self.save_category(products_df, category, url)
+            self.crawl_results[url] = CrawlResult(
+                self.snapshot_name(category), products_df.attrs.get("requests", 0)
+            )
+        except FetchError as fe:
+            logger.error(
+                "Категория %s собрана не полностью (%s), снимок, глубина и "
+                "диапазоны не обновлены",
+                url,
+                fe,
+            )
         except TypeError as te:
             logger.error(
                 "Ошибка! Возможно, неверно указан раздел. Удалите все доп фильтры с ссылки. Ошибка: %s",
@@ -72,49 +151,339 @@ class Parser:
             logger.error("Произошла непредвиденная ошибка: %s", str(e))
 
     async def fetch_catalog_data(self) -> list[dict]:
-        """Получение данных каталога."""
-        catalog_fetcher = CatalogFetcher(self.catalog_url, self.proxies)
-        return catalog_fetcher.get_data_category(catalog_fetcher.get_catalogs_wb())
+        """Получение данных каталога из общего кеша."""
+        return await self.catalog_fetcher.get_categories()
 
-    def get_category(self, url: str, catalog_data: list[dict]) -> dict | None:
-        """Поиск категории в каталоге по URL."""
-        catalog_fetcher = CatalogFetcher(self.catalog_url, self.proxies)
-        return catalog_fetcher.search_category_in_catalog(url, catalog_data)
+    async def fetch_catalog_index(self) -> CatalogIndex | None:
+        """Получение индекса категорий каталога из общего кеша."""
+        return await self.catalog_fetcher.get_index()
 
     async def fetch_data_pages(
         self, headers: dict[str, str], category: dict, start_page: int, end_page: int
-    ) -> list:
+    ) -> pd.DataFrame:
         """Асинхронный сбор данных со страниц."""
-        data_fetcher = DataFetcher(self.proxies, headers)
-        tasks = [
-            asyncio.create_task(
-                data_fetcher.scrap_page(
-                    PageParams(
-                        page=page,
-                        shard=category["shard"],
-                        query=category["query"],
-                        low_price=self.config.low_price,
-                        top_price=self.config.top_price,
-                        discount=self.config.discount,
+        if self.data_fetcher is None:
+            async with DataFetcher(self.proxies, headers) as data_fetcher:
+                return await self.fetch_category(
+                    data_fetcher, category, start_page, end_page
+                )
+        return await self.fetch_category(
+            self.data_fetcher, category, start_page, end_page
+        )
+
+    async def fetch_category(
+        self,
+        data_fetcher: DataFetcher,
+        category: dict,
+        start_page: int,
+        end_page: int,
+    ) -> pd.DataFrame:
+        """
+        Собирает категорию по ценовым диапазонам, каждый из которых
+        помещается в лимит страниц. Диапазоны с прошлого цикла берутся из
+        кеша, переполненные делятся пополам и собираются параллельно.
+        Товары из соседних диапазонов объединяются без дубликатов по id.
+
+        Глубина и диапазоны запоминаются только после того, как получены
+        все страницы категории.
+
+        :raises FetchError: Если хотя бы одна страница не получена.
+        """
+        key: str = self.band_key(category)
+        bands: list[tuple[int, int]] = self.price_band_store.get(key) or [
+            (self.config.low_price, self.config.top_price)
+        ]
+        result = BandResult()
+        for band_result in await gather_all(
+            *(
+                self._fetch_band(data_fetcher, category, low, top, start_page, end_page)
+                for low, top in bands
+            )
+        ):
+            result.extend(band_result)
+
+        for band_key, depth in result.depths.items():
+            self._remember_depth(band_key, depth)
+
+        learned_bands = merge_bands(
+            result.bands, (end_page - start_page) * self.page_size
+        )
+        if learned_bands != bands:
+            logger.info("Ценовые диапазоны %s: %s", category["name"], learned_bands)
+            self.price_band_store.set(key, learned_bands)
+
+        for page_data in result.pages:
+            self._products_per_page.observe(count_products(page_data))
+        fingerprint: str | None = None
+        if self.fingerprint_store is not None:
+            products_df, fingerprint = self.pages_to_frame(key, result.pages)
+        else:
+            product_columns = ProductColumns()
+            for page_data in result.pages:
+                product_columns.extend_from_json(page_data)
+            products_df = product_columns.to_frame()
+        products_df = products_df.drop_duplicates("id", ignore_index=True)
+        products_df.attrs["requests"] = len(result.pages)
+        products_df.attrs["fingerprint"] = fingerprint
+        self._products.inc(len(products_df), category=category["name"])
+        logger.info(
+            "Сбор данных завершен. Собрано: %d товаров, запрошено страниц: %d.",
+            len(products_df),
+            len(result.pages),
+        )
+        return products_df
+
+    def pages_to_frame(self, key: str, pages: list[dict]) -> tuple[pd.DataFrame, str]:
+        """
+        Собирает товары категории из страниц и считает отпечаток категории.
+        Страницы с тем же отпечатком, что и в прошлом цикле, берутся из
+        кеша без повторного разбора.
+        """
+        cached: dict[str, pd.DataFrame] = self._page_frames.get(key, {})
+        frames: dict[str, pd.DataFrame] = {}
+        for page_data in pages:
+            fingerprint: str = page_fingerprint(page_data)
+            if fingerprint in frames:
+                continue
+            frame: pd.DataFrame | None = cached.get(fingerprint)
+            if frame is None:
+                product_columns = ProductColumns()
+                product_columns.extend_from_json(page_data)
+                frame = product_columns.to_frame()
+                self._page_cache.inc(result="miss")
+            else:
+                self._page_cache.inc(result="hit")
+            frames[fingerprint] = frame
+        self._page_frames[key] = frames
+        products_df: pd.DataFrame = (
+            pd.concat(frames.values(), ignore_index=True)
+            if frames
+            else ProductColumns().to_frame()
+        )
+        return products_df, category_fingerprint(frames.keys())
+
+    async def _fetch_band(
+        self,
+        data_fetcher: DataFetcher,
+        category: dict,
+        low_price: int,
+        top_price: int,
+        start_page: int,
+        end_page: int,
+    ) -> BandResult:
+        """Собирает ценовой диапазон, рекурсивно деля его при переполнении."""
+        can_split: bool = top_price - low_price > self.min_band_width
+        pages, overflow, depth = await self._fetch_band_pages(
+            data_fetcher,
+            category,
+            low_price,
+            top_price,
+            start_page,
+            end_page,
+            can_split,
+        )
+        result = BandResult(pages=[pages[page] for page in sorted(pages)])
+        if depth is not None:
+            result.depths[self.pagination_key(category, low_price, top_price)] = depth
+        if overflow and can_split:
+            logger.info(
+                "Диапазон %d-%d не помещается в %d стр., делим",
+                low_price,
+                top_price,
+                end_page - start_page,
+            )
+            for band_result in await gather_all(
+                *(
+                    self._fetch_band(
+                        data_fetcher, category, low, top, start_page, end_page
                     )
+                    for low, top in split_band(low_price, top_price)
+                )
+            ):
+                result.extend(band_result)
+        else:
+            band_size: int = self._band_size(pages)
+            if overflow:
+                collected: int = sum(count_products(data) for data in pages.values())
+                logger.warning(
+                    "Категория %s: диапазон %d-%d шириной не больше %d не помещается "
+                    "в %d стр., не собрано товаров: %s",
+                    category["name"],
+                    low_price,
+                    top_price,
+                    self.min_band_width,
+                    end_page - start_page,
+                    (
+                        band_size - collected
+                        if band_size > collected
+                        else "неизвестно (нет поля total)"
+                    ),
                 )
+            result.bands.append((low_price, top_price, band_size))
+        return result
+
+    async def _fetch_band_pages(
+        self,
+        data_fetcher: DataFetcher,
+        category: dict,
+        low_price: int,
+        top_price: int,
+        start_page: int,
+        end_page: int,
+        stop_on_overflow: bool = False,
+    ) -> tuple[dict[int, dict], bool, int | None]:
+        """
+        Собирает только страницы диапазона, на которых могут быть товары.
+
+        Если глубина известна с прошлого цикла, сразу запрашиваются страницы
+        до нее, а если последняя из них полная и поля total нет, — одна
+        следующая страница-проба. Иначе первая страница служит пробой: число
+        страниц берется из поля total, а без него страницы запрашиваются
+        окнами до первой неполной.
+
+        :return: Ответы по номерам страниц, признак того, что товаров
+            больше, чем помещается в лимит страниц, и номер последней
+            непустой страницы для следующего цикла.
+        """
+        key: str = self.pagination_key(category, low_price, top_price)
+        pages: dict[int, dict] = {}
+        known_depth: int | None = self.page_depth_store.get(key)
+
+        def params(page: int) -> PageParams:
+            return self._page_params(category, page, low_price, top_price)
+
+        probe_step: int = self.probe_window
+        if known_depth is not None:
+            planned_end: int = min(max(known_depth, start_page) + 1, end_page)
+            probe_step = 1
+        else:
+            pages[start_page] = await data_fetcher.scrap_page(params(start_page))
+            if stop_on_overflow and self._overflows(pages, end_page):
+                return pages, True, None
+            planned_end = self._plan_from_probe(pages[start_page], start_page, end_page)
+
+        next_page: int = start_page + len(pages)
+        while next_page < planned_end:
+            batch = range(next_page, planned_end)
+            result_list = await gather_all(
+                *(data_fetcher.scrap_page(params(page)) for page in batch)
             )
-            for page in range(start_page, end_page)
-        ]
-        result_list = await asyncio.gather(*tasks)
-        data_list = []
-        for data in result_list:
-            page_data = self.data_processor.get_data_from_json(data)
-            logger.info("Добавлено позиций: %d", len(page_data))
-            if page_data:
-                data_list.extend(page_data)
-        logger.info("Сбор данных завершен. Собрано: %d товаров.", len(data_list))
-        return data_list
-
-    def save_data(self, data_list: list, category: dict, url: str) -> None:
+            pages.update(zip(batch, result_list))
+            next_page = planned_end
+            last_page: int | None = self._last_page_from_total(pages)
+            if last_page is not None:
+                planned_end = min(max(last_page, start_page) + 1, end_page)
+            elif count_products(pages[planned_end - 1]) >= self.page_size:
+                planned_end = min(planned_end + probe_step, end_page)
+                probe_step = self.probe_window
+
+        return pages, self._overflows(pages, end_page), self._page_depth(pages)
+
+    def _page_params(
+        self, category: dict, page: int, low_price: int, top_price: int
+    ) -> PageParams:
+        return PageParams(
+            page=page,
+            shard=category["shard"],
+            query=category["query"],
+            low_price=low_price,
+            top_price=top_price,
+            discount=self.config.discount,
+        )
+
+    def band_key(self, category: dict) -> str:
+        """Ключ категории и фильтров для хранения ценовых диапазонов."""
+        return self.pagination_key(
+            category, self.config.low_price, self.config.top_price
+        )
+
+    def pagination_key(self, category: dict, low_price: int, top_price: int) -> str:
+        """Ключ категории, диапазона цен и фильтров для хранения глубины."""
+        return (
+            f'{category["shard"]}|{category["query"]}|{low_price}|'
+            f"{top_price}|{self.config.discount}"
+        )
+
+    def _overflows(self, pages: dict[int, dict], end_page: int) -> bool:
+        """Проверяет, что у диапазона есть товары за пределами лимита страниц."""
+        last_page: int | None = self._last_page_from_total(pages)
+        if last_page is not None:
+            return last_page >= end_page
+        return count_products(pages.get(end_page - 1, {})) >= self.page_size
+
+    def _band_size(self, pages: dict[int, dict]) -> int:
+        """Число товаров диапазона: из поля total или по собранным страницам."""
+        for page in sorted(pages):
+            total: int | None = get_total(pages[page])
+            if total is not None:
+                return total
+        return sum(count_products(data) for data in pages.values())
+
+    def _plan_from_probe(self, first_page: dict, start_page: int, end_page: int) -> int:
+        """Определяет, до какой страницы (не включительно) вести сбор."""
+        if first_page and count_products(first_page) < self.page_size:
+            return start_page + 1
+        last_page: int | None = last_page_from_total(first_page, self.page_size)
+        if last_page is not None:
+            return min(max(last_page, start_page) + 1, end_page)
+        return min(start_page + 1 + self.probe_window, end_page)
+
+    def _last_page_from_total(self, pages: dict[int, dict]) -> int | None:
+        for page in sorted(pages):
+            last_page = last_page_from_total(pages[page], self.page_size)
+            if last_page is not None:
+                return last_page
+        return None
+
+    @staticmethod
+    def _page_depth(pages: dict[int, dict]) -> int | None:
+        """Номер последней непустой страницы или None, если ответов нет."""
+        if not any(pages.values()):
+            return None
+        return max(
+            (page for page, data in pages.items() if count_products(data)),
+            default=0,
+        )
+
+    def _remember_depth(self, key: str, depth: int) -> None:
+        """Сохраняет номер последней непустой страницы."""
+        if depth != self.page_depth_store.get(key):
+            logger.info("Глубина категории %s: %d стр.", key, depth)
+            self.page_depth_store.set(key, depth)
+
+    def snapshot_name(self, category: dict) -> str:
+        """Имя снимка категории в хранилище."""
+        return f'{category["name"]}_from_{self.config.low_price}_to_{self.config.top_price}'
+
+    def save_category(
+        self, products_df: pd.DataFrame, category: dict, url: str
+    ) -> bool:
+        """
+        Сохраняет снимок категории, если ее отпечаток изменился с прошлого
+        сохранения. Неизменившаяся категория не записывается и не
+        сравнивается, а в статистику изменений идет без изменений цен.
+
+        :return: False, если сохранение пропущено.
+        """
+        name: str = self.snapshot_name(category)
+        fingerprint: str | None = products_df.attrs.get("fingerprint")
+        if (
+            self.fingerprint_store is not None
+            and fingerprint is not None
+            and self.fingerprint_store.get(name) == fingerprint
+            and self.data_processor.has_snapshot(name)
+        ):
+            logger.info("Цены в категории %s не изменились, снимок не записан", name)
+            self.data_processor.record_unchanged(name, len(products_df))
+            return False
+        self.save_data(products_df, category, url)
+        if self.fingerprint_store is not None and fingerprint is not None:
+            self.fingerprint_store.set(name, fingerprint)
+        return True
+
+    def save_data(self, products_df: pd.DataFrame, category: dict, url: str) -> None:
         """Сохранение собранных данных и логирование итоговой информации."""
-        file_name = f'{category["name"]}_from_{self.config.low_price}_to_{self.config.top_price}'
-        self.data_processor.save_csv(data_list, file_name)
+        self.data_processor.save_snapshot(products_df, self.snapshot_name(category))
         logger.info(
             "Ссылка для проверки: %s?priceU=%d;%d&discount=%d",
             url,
@@ -1,58 +1,185 @@
 import asyncio
+import multiprocessing
 import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
 from logging import Logger, getLogger
-from typing import Any, Literal
+from typing import Any, AsyncIterator, Literal
 from math import ceil
 
 import shutil
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
-from app.notification import NotificationService
+from alert_cache import AlertDedupCache
+from metrics import MetricsRegistry
+from notification import NotificationService
+from volatility import VolatilityTracker
+from price_store import PriceStore
+from product_index import ProductIndex
+from product_columns import (
+    ProductRecord,
+    records_from_frame,
+    records_from_json,
+    records_to_frame,
+    with_links,
+)
+from snapshot_diff import (
+    ChangeStats,
+    DiffResult,
+    DiffTask,
+    PRICE_COLUMNS,
+    calculate_percent_changes,
+    compact_price_columns,
+    diff_frames,
+    diff_snapshot_files,
+)
+from snapshot_store import (
+    CsvSnapshotBackend,
+    SnapshotBackend,
+    get_snapshot_backend,
+)
 
-load_dotenv()
 logger: Logger = getLogger(__name__)
 
 
+def create_diff_executor(workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    Создает пул процессов для сравнения снимков. Процессы запускаются
+    через forkserver: форк процесса с потоками логирования, метрик и
+    asyncio может унаследовать захваченные блокировки.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("forkserver")
+    )
+
+
 class DataProcessor:
-    def __init__(self, current_dir: str, previous_dir: str, changes_dir: str) -> None:
+    PRICE_COLUMNS: tuple[str, ...] = PRICE_COLUMNS
+
+    def __init__(
+        self,
+        current_dir: str,
+        previous_dir: str,
+        changes_dir: str,
+        snapshot_format: str = "csv",
+        export_csv: bool = False,
+        price_store: PriceStore | None = None,
+        notification_queue_path: str | None = None,
+        notification_flush_timeout: float | None = None,
+        alert_cache: AlertDedupCache | None = None,
+        volatility_tracker: VolatilityTracker | None = None,
+        diff_workers: int | None = None,
+        diff_executor: Executor | None = None,
+        product_index: ProductIndex | None = None,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
         self.current_dir: str = os.path.abspath(current_dir)
         self.previous_dir: str = os.path.abspath(previous_dir)
         self.changes_dir: str = os.path.abspath(changes_dir)
+        self.snapshot_backend: SnapshotBackend = self._create_snapshot_backend(
+            snapshot_format
+        )
+        self.export_csv: bool = export_csv
+        self.price_store: PriceStore | None = price_store
+        self.notification_queue_path: str | None = notification_queue_path
+        self.notification_flush_timeout: float | None = notification_flush_timeout
+        self.alert_cache: AlertDedupCache | None = alert_cache
+        self.volatility_tracker: VolatilityTracker | None = volatility_tracker
+        self.diff_workers: int | None = diff_workers
+        self.diff_executor: Executor | None = diff_executor
+        self.product_index: ProductIndex | None = product_index
+        self.metrics: MetricsRegistry = metrics or MetricsRegistry()
+        self._write_seconds = self.metrics.histogram(
+            "snapshot_write_seconds", "Время записи снимка категории", ("backend",)
+        )
+        self._read_seconds = self.metrics.histogram(
+            "snapshot_read_seconds", "Время чтения пары снимков", ("backend",)
+        )
+        self._diff_seconds = self.metrics.histogram(
+            "diff_seconds", "Время сравнения категории", ("category",)
+        )
+        self._alerts = self.metrics.counter(
+            "price_drops_total", "Найдено снижений цен", ("category",)
+        )
 
         for directory in [self.current_dir, self.previous_dir, self.changes_dir]:
             os.makedirs(directory, exist_ok=True)
             logger.info("Каталог %s создан или уже существует", directory)
 
     @staticmethod
-    def get_data_from_json(json_file: dict) -> list:
+    def _create_snapshot_backend(snapshot_format: str) -> SnapshotBackend:
+        try:
+            return get_snapshot_backend(snapshot_format)
+        except ImportError as err:
+            logger.warning("%s. Снимки будут сохраняться в CSV", err)
+            return CsvSnapshotBackend()
+
+    @staticmethod
+    def get_data_from_json(json_file: dict) -> list[ProductRecord]:
         """Извлекаем данные из JSON"""
-        return [
-            {
-                "id": data.get("id"),
-                "name": data.get("name"),
-                "price": data.get("priceU", 0) // 100,
-                "salePriceU": data.get("salePriceU", 0) // 100,
-                "sale": data.get("sale"),
-                "brand": data.get("brand"),
-                "rating": data.get("rating"),
-                "supplier": data.get("supplier"),
-                "supplierRating": data.get("supplierRating"),
-                "feedbacks": data.get("feedbacks"),
-                "reviewRating": data.get("reviewRating"),
-                "promoTextCard": data.get("promoTextCard"),
-                "promoTextCat": data.get("promoTextCat"),
-                "link": f'https://www.wildberries.ru/catalog/{data.get("id")}/detail.aspx?targetUrl=BP',
-            }
-            for data in json_file.get("data", {}).get("products", [])
-        ]
+        return records_from_json(json_file)
 
-    def save_csv(self, data: list, filename: str) -> None:
+    def save_csv(self, data: pd.DataFrame | list[ProductRecord], filename: str) -> None:
         """Сохраняем данные в CSV"""
-        df = pd.DataFrame(data)
+        df = data if isinstance(data, pd.DataFrame) else records_to_frame(data)
+        if "link" not in df.columns and "id" in df.columns:
+            df = with_links(df)
         file_path: str = os.path.join(self.current_dir, f"{filename}.csv")
         df.to_csv(file_path, index=False)
 
+    def save_snapshot(
+        self, data: pd.DataFrame | list[ProductRecord], filename: str
+    ) -> None:
+        """
+        Сохраняем снимок категории в хранилище цен или в файл. Ссылки
+        на товары в снимок не пишутся, они строятся по id при выводе.
+        С product_index в снимок попадают только товары, закрепленные за
+        категорией, поэтому общий товар сравнивается один раз за цикл.
+        """
+        df = data if isinstance(data, pd.DataFrame) else records_to_frame(data)
+        if self.product_index is not None:
+            df = self.product_index.claim(filename, df)
+        if self.price_store is not None:
+            with self._write_seconds.time(backend="sqlite"):
+                self.price_store.record(filename, df)
+            if self.export_csv:
+                self.save_csv(df, filename)
+            return
+        file_path: str = os.path.join(
+            self.current_dir, f"{filename}{self.snapshot_backend.extension}"
+        )
+        with self._write_seconds.time(backend=self.snapshot_backend.extension):
+            self.snapshot_backend.write(df, file_path)
+        if self.export_csv and not isinstance(
+            self.snapshot_backend, CsvSnapshotBackend
+        ):
+            self.save_csv(df, filename)
+
+    def has_snapshot(self, filename: str) -> bool:
+        """Есть ли сохраненный снимок категории, с которым можно сравнивать."""
+        if self.price_store is not None:
+            return self.price_store.has_category(filename)
+        file_name: str = f"{filename}{self.snapshot_backend.extension}"
+        return any(
+            os.path.exists(os.path.join(directory, file_name))
+            for directory in (self.current_dir, self.previous_dir)
+        )
+
+    def read_snapshot(self, file_path: str, columns: list[str]) -> pd.DataFrame:
+        """Читает из снимка только нужные колонки"""
+        return self.compact_price_columns(
+            self.snapshot_backend.read(file_path, columns)
+        )
+
+    def start_cycle(self) -> None:
+        """Подготовка к новому циклу сбора"""
+        if self.price_store is not None:
+            self.price_store.start_cycle()
+        else:
+            self.move_data_to_previous()
+
     def move_data_to_previous(self) -> None:
         """Перемещение данных из current_data в previous_data"""
         if os.path.exists(self.current_dir):
@@ -82,19 +209,84 @@ class DataProcessor:
             return float("inf") if current_price != 0 else 0
         return ((current_price - previous_price) / previous_price) * 100
 
+    @staticmethod
+    def calculate_percent_changes(
+        current_prices: pd.Series, previous_prices: pd.Series
+    ) -> np.ndarray:
+        """Векторная версия calculate_percent_change."""
+        return calculate_percent_changes(current_prices, previous_prices)
+
+    @staticmethod
+    def compact_price_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """Приводит целочисленные колонки цен к самому компактному типу."""
+        return compact_price_columns(df)
+
     async def compare_and_save_changes(
         self,
         token: str,
         channel_ids: list[str],
         price_difference_percentage: int | float,
+        notification_service: NotificationService | None = None,
     ) -> None:
-        """Сравнивает файлы и сохраняет изменения."""
+        """
+        Сравнивает файлы и сохраняет изменения. Уведомления только ставятся
+        в очередь notification_service, доставка идет в фоне. Если очередь
+        не передана, создается своя и закрывается после сравнения всех
+        файлов, то есть с ожиданием доставки.
+        """
         logger.info("Начало процесса сравнения и сохранения изменений")
 
         if not os.path.exists(self.changes_dir):
             os.makedirs(self.changes_dir)
             logger.info("Создан каталог для изменений: %s", self.changes_dir)
 
+        owns_service: bool = notification_service is None
+        if notification_service is None:
+            notification_service = self.create_notification_service(token, channel_ids)
+            await notification_service.start()
+        try:
+            if self.price_store is not None:
+                await self.compare_from_store(
+                    notification_service, price_difference_percentage
+                )
+            else:
+                await self.compare_files(
+                    notification_service, price_difference_percentage
+                )
+        finally:
+            if owns_service:
+                await notification_service.close(self.notification_flush_timeout)
+            if self.alert_cache is not None:
+                self.alert_cache.evict()
+                self.alert_cache.save()
+            if self.volatility_tracker is not None:
+                self.volatility_tracker.save()
+            if self.product_index is not None:
+                self.product_index.save()
+
+        logger.info("Процесс сравнения и сохранения изменений завершён")
+
+    def create_notification_service(
+        self, token: str, channel_ids: list[str]
+    ) -> NotificationService:
+        return NotificationService(
+            token,
+            channel_ids,
+            queue_path=self.notification_queue_path,
+            metrics=self.metrics,
+            alert_cache=self.alert_cache,
+        )
+
+    async def compare_files(
+        self,
+        notification_service: NotificationService,
+        price_difference_percentage: int | float,
+    ) -> None:
+        """
+        Сравнивает снимки текущего и предыдущего циклов по файлам. Файлы
+        сравниваются параллельно в пуле процессов, а изменения каждого
+        файла отправляются в очередь уведомлений сразу по готовности.
+        """
         columns_to_include: list[str] = [
             "id",
             "name_current",
@@ -110,35 +302,125 @@ class DataProcessor:
             "reviewRating_current",
             "promoTextCard_current",
             "promoTextCat_current",
-            "link_current",
         ]
 
-        for current_file in os.listdir(self.current_dir):
-            current_filepath = os.path.join(self.current_dir, current_file)
+        tasks: list[DiffTask] = []
+        for current_file in sorted(os.listdir(self.current_dir)):
+            if not current_file.endswith(self.snapshot_backend.extension):
+                continue
             previous_filepath = os.path.join(self.previous_dir, current_file)
-
-            if os.path.exists(previous_filepath):
-                logger.info("Обработка файла: %s", current_file)
-                current_df: pd.DataFrame = pd.read_csv(current_filepath)
-                previous_df: pd.DataFrame = pd.read_csv(previous_filepath)
-
-                changes_df = await self.process_file(
-                    current_df,
-                    previous_df,
+            if not os.path.exists(previous_filepath):
+                logger.warning("Предыдущий файл для %s не найден", current_file)
+                continue
+            tasks.append(
+                DiffTask(
+                    current_file,
+                    os.path.join(self.current_dir, current_file),
+                    previous_filepath,
+                    self.snapshot_backend,
                     columns_to_include,
                     price_difference_percentage,
                 )
+            )
 
-                if not changes_df.empty:
-                    await self.handle_changes(
-                        changes_df, current_file, token, channel_ids
-                    )
-                else:
-                    logger.info("Изменений не найдено для файла %s", current_file)
+        async for result in self.diff_snapshots(tasks):
+            category: str = os.path.splitext(result.file_name)[0]
+            logger.info("Обработан файл: %s", result.file_name)
+            self._read_seconds.observe(
+                result.read_seconds, backend=self.snapshot_backend.extension
+            )
+            self._diff_seconds.observe(result.diff_seconds, category=category)
+            self._alerts.inc(len(result.changes), category=category)
+            self.record_change_stats(category, result.stats)
+            if not result.changes.empty:
+                await self.handle_changes(
+                    result.changes, result.file_name, notification_service
+                )
             else:
-                logger.warning("Предыдущий файл для %s не найден", current_file)
+                logger.info("Изменений не найдено для файла %s", result.file_name)
 
-        logger.info("Процесс сравнения и сохранения изменений завершён")
+    async def diff_snapshots(self, tasks: list[DiffTask]) -> AsyncIterator[DiffResult]:
+        """
+        Выполняет сравнения в пуле из diff_workers процессов (по умолчанию
+        по числу ядер) и отдает результаты в порядке готовности. Один файл
+        или diff_workers=1 сравниваются в потоке без запуска процессов.
+        Если передан diff_executor, используется он, иначе пул создается
+        на время вызова.
+        """
+        if not tasks:
+            return
+        workers: int = min(self.diff_workers or os.cpu_count() or 1, len(tasks))
+        if workers == 1:
+            for task in tasks:
+                try:
+                    yield await asyncio.to_thread(diff_snapshot_files, task)
+                except Exception as e:  # pylint: disable=W0718
+                    logger.error("Ошибка сравнения %s: %s", task.file_name, e)
+            return
+
+        loop = asyncio.get_running_loop()
+        with (
+            nullcontext(self.diff_executor)
+            if self.diff_executor is not None
+            else create_diff_executor(workers)
+        ) as executor:
+            futures: dict[asyncio.Future, DiffTask] = {
+                loop.run_in_executor(executor, diff_snapshot_files, task): task
+                for task in tasks
+            }
+            pending: set[asyncio.Future] = set(futures)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        yield future.result()
+                    except Exception as e:  # pylint: disable=W0718
+                        logger.error(
+                            "Ошибка сравнения %s: %s", futures[future].file_name, e
+                        )
+
+    def record_change_stats(self, category: str, stats: ChangeStats) -> None:
+        if self.volatility_tracker is not None:
+            self.volatility_tracker.record(
+                category, stats.compared, stats.changed, stats.mean_change
+            )
+
+    def record_unchanged(self, category: str, products: int) -> None:
+        """Учитывает категорию, в которой цены не менялись и сравнение пропущено."""
+        self.record_change_stats(category, ChangeStats(products, 0, 0.0))
+
+    async def compare_from_store(
+        self,
+        notification_service: NotificationService,
+        price_difference_percentage: int | float,
+    ) -> None:
+        """Находит снижения цен текущего цикла запросом к хранилищу цен."""
+        if self.volatility_tracker is not None:
+            for stats in self.price_store.change_stats().itertuples(index=False):
+                self.record_change_stats(
+                    stats.category,
+                    ChangeStats(
+                        int(stats.compared),
+                        int(stats.changed or 0),
+                        float(stats.mean_change or 0),
+                    ),
+                )
+        with self._diff_seconds.time(category="*"):
+            changes_df: pd.DataFrame = self.price_store.find_price_drops(
+                price_difference_percentage
+            )
+        if changes_df.empty:
+            logger.info("Изменений не найдено")
+            return
+        for category, category_changes in changes_df.groupby("category", sort=False):
+            self._alerts.inc(len(category_changes), category=category)
+            await self.handle_changes(
+                category_changes.drop(columns="category"),
+                str(category),
+                notification_service,
+            )
 
     async def process_file(
         self,
@@ -146,68 +428,93 @@ class DataProcessor:
         previous_df: pd.DataFrame,
         columns_to_include: list[str],
         price_difference_percentage: int | float,
+        category: str | None = None,
     ) -> pd.DataFrame:
-        """Обрабатывает один файл и возвращает изменения."""
-        merged_df: pd.DataFrame = current_df.merge(
-            previous_df, on="id", suffixes=("_current", "_previous")
+        """
+        Обрабатывает один файл и возвращает изменения. Если указана
+        категория, статистика изменений передается в volatility_tracker.
+        """
+        changes_df, stats = diff_frames(
+            current_df, previous_df, columns_to_include, price_difference_percentage
         )
-        merged_df["percent_change"] = merged_df.apply(
-            lambda row: self.calculate_percent_change(
-                row["salePriceU_current"], row["salePriceU_previous"]
-            ),
-            axis=1,
-        )
-
-        return merged_df[
-            (merged_df["percent_change"] != -100)
-            & (merged_df["percent_change"] < -price_difference_percentage)
-        ][columns_to_include]
+        if category is not None:
+            self.record_change_stats(category, stats)
+        return changes_df
 
     async def handle_changes(
         self,
         changes_df: pd.DataFrame,
         current_file: str,
-        token: str,
-        channel_ids: list[str],
+        notification_service: NotificationService,
     ) -> None:
-        """Обрабатывает изменения и сохраняет их."""
-        changes_filepath = os.path.join(self.changes_dir, f"changes_{current_file}")
+        """Обрабатывает изменения, сохраняет их и ставит уведомления в очередь."""
+        changes_filepath = os.path.join(
+            self.changes_dir, f"changes_{os.path.splitext(current_file)[0]}.csv"
+        )
         changes_df.columns = [col.replace("_current", "") for col in changes_df.columns]
+        changes_df = with_links(changes_df)
+        if self.product_index is not None:
+            changes_df["categories"] = self.product_index.categories(changes_df["id"])
         changes_df.to_csv(changes_filepath, index=False)
         logger.info("Изменения сохранены в %s", changes_filepath)
 
-        notification_service = NotificationService(token, channel_ids)
         await self.send_notifications(changes_df, notification_service)
 
     async def send_notifications(
         self, changes_df: pd.DataFrame, notification_service: NotificationService
     ) -> None:
-        """Отправляет уведомления о каждом изменении."""
-        tasks = [
-            self.send_notification(row, notification_service)
-            for _, row in changes_df.iterrows()
-        ]
-        await asyncio.gather(*tasks)
+        """
+        Ставит в очередь уведомления о каждом изменении. Товары, о которых
+        уже сообщали по той же цене, отбрасываются до формирования текста.
+        """
+        if self.alert_cache is not None:
+            changes_df = self.drop_seen_alerts(changes_df)
+        for product, previous_price in zip(
+            records_from_frame(changes_df), changes_df["salePriceU_previous"].tolist()
+        ):
+            await self.send_notification(product, previous_price, notification_service)
+
+    def drop_seen_alerts(self, changes_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Убирает повторные уведомления и запоминает новые. Если уведомление
+        не будет доставлено, очередь удалит его ключ из кеша.
+        """
+        fresh: list[bool] = []
+        for product_id, price in zip(changes_df["id"], changes_df["salePriceU"]):
+            is_fresh: bool = not self.alert_cache.seen(product_id, price)
+            if is_fresh:
+                self.alert_cache.add(product_id, price)
+            fresh.append(is_fresh)
+        skipped: int = len(fresh) - sum(fresh)
+        if skipped:
+            logger.info("Пропущено повторных уведомлений: %d", skipped)
+        return changes_df[fresh]
 
     async def send_notification(
-        self, row: pd.Series, notification_service: NotificationService
+        self,
+        product: ProductRecord,
+        previous_price: int,
+        notification_service: NotificationService,
     ) -> None:
         """Отправляет уведомление об одном изменении."""
         discount_percent = ceil(
-            -self.calculate_percent_change(
-                row["salePriceU"], row["salePriceU_previous"]
-            )
+            -self.calculate_percent_change(product.salePriceU, previous_price)
         )
         message: str = (
-            f"📢 <b>{str(row['name']).upper()}</b>\n\n"
-            f"🔻 <b>Цена была:</b> <code>{row['salePriceU_previous']}₽</code>\n"
-            f"🔺 <b>Цена стала:</b> <code>{row['salePriceU']}₽</code>\n\n"
-            f"💬 <b>Количество отзывов:</b> <code>{row['feedbacks']}</code>\n"
-            f"⭐️ <b>Рейтинг:</b> <code>{row['supplierRating']}</code>\n\n"
+            f"📢 <b>{str(product.name).upper()}</b>\n\n"
+            f"🔻 <b>Цена была:</b> <code>{previous_price}₽</code>\n"
+            f"🔺 <b>Цена стала:</b> <code>{product.salePriceU}₽</code>\n\n"
+            f"💬 <b>Количество отзывов:</b> <code>{product.feedbacks}</code>\n"
+            f"⭐️ <b>Рейтинг:</b> <code>{product.supplierRating}</code>\n\n"
             f"📉 <b>Цена уменьшилась на:</b> <code>{self.beautify_number(discount_percent)}%</code>\n\n"
-            f"🔗 <a href='{row['link']}'>Ссылка на товар</a>"
+            f"🔗 <a href='{product.link}'>Ссылка на товар</a>"
+        )
+        alert_key: str | None = (
+            AlertDedupCache.make_key(product.id, product.salePriceU)
+            if self.alert_cache is not None
+            else None
         )
-        await notification_service.send_message(message)
+        await notification_service.send_message(message, alert_key)
 
 
 async def main():
@@ -222,4 +529,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    load_dotenv()
     asyncio.run(main())
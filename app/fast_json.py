@@ -0,0 +1,17 @@
+"""Быстрый разбор JSON: orjson, если установлен, иначе стандартный json."""
+
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+loads: Callable[[bytes | str], Any] = (
+    orjson.loads  # pylint: disable=no-member - расширение на C
+    if orjson
+    else json.loads
+)
+
+__all__ = ["loads"]
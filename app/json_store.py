@@ -0,0 +1,44 @@
+import json
+import os
+from logging import Logger, getLogger
+from typing import Any, Optional
+
+logger: Logger = getLogger(__name__)
+
+
+class JsonStore:
+    """
+    Словарь, сохраняемый в JSON-файл между запусками.
+
+    :param path: Путь к файлу. Если None, данные хранятся только в памяти.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path: Optional[str] = os.path.abspath(path) if path else None
+        self.data: dict[str, Any] = self._load()
+
+    def _load(self) -> dict[str, Any]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError) as err:
+            logger.warning("Не удалось прочитать %s: %s", self.path, err)
+            return {}
+
+    def save(self) -> None:
+        """Атомарно записывает данные в файл."""
+        if not self.path:
+            return
+        tmp_path: str = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.data, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            logger.warning("Не удалось сохранить %s: %s", self.path, err)
+
+
+__all__ = ["JsonStore"]
@@ -1,15 +1,32 @@
+import atexit
+import json
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from enum import Enum
 import logging
 from logging import (
+    Filter,
+    Formatter,
     Handler,
     Logger,
+    LogRecord,
     getLogger,
     basicConfig,
     FileHandler,
     StreamHandler,
 )
-from typing import List, Optional
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+FORMAT: str = "%(asctime)s : %(name)s : %(levelname)s : %(message)s"
+
+RECORD_ATTRIBUTES: frozenset = frozenset(
+    logging.makeLogRecord({}).__dict__
+) | frozenset({"message", "asctime"})
 
 
 class LogLevel(Enum):
@@ -32,12 +49,113 @@ class LogConfig:
     :param filename: Имя файла для записи логов. Если None, логирование в файл отключено.
     :param console_level: Уровень логирования для консоли.
     :param file_level: Уровень логирования для файла.
+    :param use_queue: Писать логи в фоновом потоке через очередь, не
+        блокируя цикл событий на форматировании и вводе-выводе.
+    :param json_format: Выводить каждую запись одной строкой JSON.
+    :param rate_limit: Сколько одинаковых сообщений (по шаблону) уровня
+        INFO и ниже в секунду пропускать. None — без ограничения.
+    :param rate_burst: Допустимый всплеск одинаковых сообщений.
     """
 
     level: LogLevel = LogLevel.INFO
     filename: Optional[str] = "data.log"
     console_level: LogLevel = LogLevel.INFO
     file_level: LogLevel = LogLevel.INFO
+    use_queue: bool = False
+    json_format: bool = False
+    rate_limit: Optional[float] = None
+    rate_burst: Optional[float] = None
+
+
+class JsonFormatter(Formatter):
+    """Форматирует запись как объект JSON в одну строку."""
+
+    def format(self, record: LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_")
+        )
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(Filter):
+    """
+    Ограничивает частоту одинаковых сообщений: для каждого шаблона
+    сообщения свой token bucket. Записи выше max_level проходят всегда.
+    Первая пропущенная после подавления запись сообщает, сколько похожих
+    было отброшено.
+
+    :param rate: Сообщений одного шаблона в секунду.
+    :param burst: Допустимый всплеск. По умолчанию равен rate.
+    :param max_level: Максимальный уровень, к которому применяется лимит.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        max_level: int = logging.INFO,
+    ) -> None:
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("Частота должна быть положительной")
+        self.rate: float = rate
+        self.burst: float = max(burst if burst is not None else rate, 1.0)
+        self.max_level: int = max_level
+        self._buckets: Dict[Tuple[str, Any], List[float]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        # Решение по записи, чтобы несколько обработчиков с этим фильтром
+        # не расходовали токены повторно.
+        self._decisions: WeakKeyDictionary[LogRecord, bool] = WeakKeyDictionary()
+
+    def filter(self, record: LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        with self._lock:
+            decision: Optional[bool] = self._decisions.get(record)
+        if decision is None:
+            decision = self._allow(record)
+            with self._lock:
+                self._decisions[record] = decision
+        return decision
+
+    def _allow(self, record: LogRecord) -> bool:
+        key: Tuple[str, Any] = (record.name, record.msg)
+        now: float = time.monotonic()
+        with self._lock:
+            bucket: Optional[List[float]] = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now, 0]
+            tokens, updated, suppressed = bucket
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                bucket[:] = [tokens, now, suppressed + 1]
+                return False
+            bucket[:] = [tokens - 1, now, 0]
+        if suppressed:
+            record.suppressed = int(suppressed)
+            record.msg = f"{record.msg} (пропущено похожих: {int(suppressed)})"
+        return True
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Передает запись в очередь без форматирования: сообщение собирается
+    уже в потоке QueueListener. Аргументы записи не должны меняться
+    после вызова логгера.
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        return record
 
 
 class LoggerSetup:
@@ -52,24 +170,52 @@ class LoggerSetup:
     ) -> None:
         self.logger: Logger = getLogger(logger_name)
         self._log_config: LogConfig = log_config
+        self.queue_handler: Optional[QueueHandler] = None
+        self.listener: Optional[QueueListener] = None
         self._setup_logger()
 
     def _setup_logger(self) -> None:
         """
-        Настраивает логгер с файловыми и консольными обработчиками.
+        Настраивает логгер с файловыми и консольными обработчиками. В
+        режиме очереди корневой логгер получает только QueueHandler, а
+        форматирование и запись выполняет фоновый QueueListener.
         """
-        format_str = "%(asctime)s : %(name)s : %(levelname)s : %(message)s"
         try:
             handlers: List[logging.Handler] = self._get_handlers()
+            rate_filter: Optional[RateLimitFilter] = (
+                RateLimitFilter(
+                    self._log_config.rate_limit, self._log_config.rate_burst
+                )
+                if self._log_config.rate_limit
+                else None
+            )
+            if self._log_config.use_queue:
+                queue: SimpleQueue = SimpleQueue()
+                self.listener = QueueListener(
+                    queue, *handlers, respect_handler_level=True
+                )
+                self.listener.start()
+                atexit.register(self.stop)
+                self.queue_handler = BackgroundQueueHandler(queue)
+                handlers = [self.queue_handler]
+            if rate_filter is not None:
+                for handler in handlers:
+                    handler.addFilter(rate_filter)
             self.logger.setLevel(self._log_config.level.value)
             basicConfig(
                 level=self._log_config.level.value,
-                format=format_str,
+                format=FORMAT,
                 handlers=handlers,
             )
         except Exception as e:
             self.logger.error("Ошибка при настройке логгера: %s", e)
 
+    def stop(self) -> None:
+        """Дописывает записи из очереди и останавливает фоновый поток."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
     def _get_handlers(self) -> List[Handler]:
         """
         Создает список обработчиков логирования.
@@ -77,14 +223,19 @@ class LoggerSetup:
         :return: Список обработчиков логирования.
         """
         handlers: List[Handler] = []
+        formatter: Formatter = (
+            JsonFormatter() if self._log_config.json_format else Formatter(FORMAT)
+        )
 
         if self._log_config.filename:
             file_handler = FileHandler(self._log_config.filename)
             file_handler.setLevel(self._log_config.file_level.value)
+            file_handler.setFormatter(formatter)
             handlers.append(file_handler)
 
         console = StreamHandler()
         console.setLevel(self._log_config.console_level.value)
+        console.setFormatter(formatter)
         handlers.append(console)
 
         return handlers
@@ -98,7 +249,14 @@ class LoggerSetup:
         return self.logger
 
 
-__all__ = ["LogConfig", "LoggerSetup", "LogLevel"]
+__all__ = [
+    "BackgroundQueueHandler",
+    "JsonFormatter",
+    "LogConfig",
+    "LoggerSetup",
+    "LogLevel",
+    "RateLimitFilter",
+]
 
 if __name__ == "__main__":
     log_config = LogConfig(
@@ -1,25 +1,52 @@
 import asyncio
 import datetime
 import os
-import time
-from logging import Logger
-
-import schedule
-from dotenv import load_dotenv
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from functools import partial
+from logging import Logger, getLogger
+from typing import Awaitable
 
+from alert_cache import AlertDedupCache
+from catalog_fetcher import CatalogFetcher
+from data_fetcher import DataFetcher
 from data_parser import Parser, ParserConfig
-from data_processor import DataProcessor
-from logging_config import LogConfig, LoggerSetup
-from config import APIConfig, ScheduleSettings, PriceSettings, DataDirectories, Headers
-
-load_dotenv()
-
+from metrics import Histogram, MetricsRegistry, start_metrics_server
+from notification import NotificationService
+from page_fingerprint import FingerprintStore
+from pagination import PageDepthStore
+from price_bands import PriceBandStore
+from price_store import PriceStore
+from product_index import ProductIndex
+from proxy_pool import ProxyPool
+from rate_limiter import RequestBudget
+from retry import CircuitBreakers, RetryPolicy
+from scheduler import Scheduler
+from volatility import VolatilityTracker
+from data_processor import DataProcessor, create_diff_executor
+from config import (
+    AdaptiveScheduleSettings,
+    AlertCacheSettings,
+    APIConfig,
+    CatalogSettings,
+    ConcurrencySettings,
+    ConnectionSettings,
+    FingerprintSettings,
+    NotificationSettings,
+    PaginationSettings,
+    PriceBandSettings,
+    ProxySettings,
+    RetrySettings,
+    SnapshotSettings,
+    StorageSettings,
+    ScheduleSettings,
+    PriceSettings,
+    DataDirectories,
+    Headers,
+    MetricsSettings,
+)
 
-def setup_logger() -> Logger:
-    logger_setup = LoggerSetup(
-        logger_name=__name__, log_config=LogConfig(filename=None)
-    )
-    return logger_setup.get_logger()
+logger: Logger = getLogger(__name__)
 
 
 def load_urls(file_path: str) -> list[str]:
@@ -33,42 +60,255 @@ def load_urls(file_path: str) -> list[str]:
     return urls
 
 
-logger: Logger = setup_logger()
+@dataclass
+class Runtime:
+    """Компоненты процесса, общие для всех циклов сбора."""
 
-data_processor = DataProcessor(
-    current_dir=os.path.abspath(DataDirectories.CURRENT_DATA_DIR),
-    previous_dir=os.path.abspath(DataDirectories.PREVIOUS_DATA_DIR),
-    changes_dir=os.path.abspath(DataDirectories.CHANGES_DATA_DIR),
-)
+    metrics: MetricsRegistry
+    cycle_seconds: Histogram
+    proxy_pool: ProxyPool
+    volatility_tracker: VolatilityTracker
+    data_processor: DataProcessor
+    parser: Parser
+    notification_service: NotificationService
+    diff_executor: Executor | None = None
+    cycle_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
-parser = Parser(
-    APIConfig.CATALOG_URL,
-    APIConfig.PROXIES,
-    data_processor,
-    ParserConfig(
-        PriceSettings.LOW_PRICE,
-        PriceSettings.TOP_PRICE,
-        PriceSettings.DISCOUNT,
-    ),
-)
+    def close(self) -> None:
+        """Останавливает пул процессов сравнения."""
+        if self.diff_executor is not None:
+            self.diff_executor.shutdown(cancel_futures=True)
+            self.diff_executor = None
 
 
-async def scheduled_job() -> None:
-    """Функция для выполнения запланированной работы"""
-    try:
-        data_processor.move_data_to_previous()
-        await main()
-        await data_processor.compare_and_save_changes(
+def create_data_fetcher(runtime: Runtime) -> DataFetcher:
+    """
+    Создает загрузчик с общей сессией и бюджетом запросов на весь цикл.
+    Лимиты ConcurrencySettings заданы на один прокси, поэтому бюджет
+    растет вместе с числом прокси в пуле.
+    """
+    proxy_count: int = len(runtime.proxy_pool)
+    request_budget = RequestBudget(
+        ConcurrencySettings.MAX_CONCURRENT_REQUESTS * proxy_count,
+        ConcurrencySettings.REQUESTS_PER_SECOND * proxy_count,
+        ConcurrencySettings.REQUESTS_BURST * proxy_count,
+    )
+    return DataFetcher(
+        APIConfig.PROXIES,
+        Headers.HEADERS,
+        limit=max(
+            ConnectionSettings.LIMIT,
+            ConcurrencySettings.MAX_CONCURRENT_REQUESTS * proxy_count,
+        ),
+        limit_per_host=ConnectionSettings.LIMIT_PER_HOST,
+        keepalive_timeout=ConnectionSettings.KEEPALIVE_TIMEOUT,
+        dns_cache_ttl=ConnectionSettings.DNS_CACHE_TTL,
+        request_timeout=ConnectionSettings.REQUEST_TIMEOUT,
+        request_budget=request_budget,
+        retry_policy=RetryPolicy(
+            RetrySettings.MAX_ATTEMPTS,
+            RetrySettings.BASE_DELAY,
+            RetrySettings.MAX_DELAY,
+        ),
+        circuit_breakers=CircuitBreakers(
+            RetrySettings.BREAKER_FAILURE_THRESHOLD,
+            RetrySettings.BREAKER_RESET_TIMEOUT,
+        ),
+        proxy_pool=runtime.proxy_pool,
+        metrics=runtime.metrics,
+    )
+
+
+def build_runtime() -> Runtime:
+    """
+    Создает компоненты по настройкам из config. Каталоги данных и файлы
+    хранилищ появляются только здесь, а не при импорте модуля. Пул
+    процессов сравнения один на процесс, его останавливает Runtime.close().
+    """
+    metrics = MetricsRegistry()
+    diff_executor = (
+        create_diff_executor(SnapshotSettings.DIFF_WORKERS)
+        if SnapshotSettings.DIFF_WORKERS != 1
+        else None
+    )
+    proxy_pool = ProxyPool(
+        APIConfig.PROXY_LIST,
+        max_concurrent_per_proxy=ProxySettings.MAX_CONCURRENT_PER_PROXY,
+        failure_threshold=ProxySettings.FAILURE_THRESHOLD,
+        quarantine_time=ProxySettings.QUARANTINE_TIME,
+    )
+    volatility_tracker = VolatilityTracker(
+        AdaptiveScheduleSettings.STATS_PATH,
+        min_interval=AdaptiveScheduleSettings.MIN_INTERVAL,
+        max_interval=AdaptiveScheduleSettings.MAX_INTERVAL,
+        smoothing=AdaptiveScheduleSettings.SMOOTHING,
+        saturation_change=APIConfig.PRICE_DIFFERENCE_PERCENTAGE,
+    )
+    alert_cache = AlertDedupCache(
+        AlertCacheSettings.PATH,
+        AlertCacheSettings.TTL,
+        AlertCacheSettings.MAX_SIZE,
+    )
+    data_processor = DataProcessor(
+        current_dir=os.path.abspath(DataDirectories.CURRENT_DATA_DIR),
+        previous_dir=os.path.abspath(DataDirectories.PREVIOUS_DATA_DIR),
+        changes_dir=os.path.abspath(DataDirectories.CHANGES_DATA_DIR),
+        snapshot_format=SnapshotSettings.FORMAT,
+        export_csv=SnapshotSettings.EXPORT_CSV,
+        diff_workers=SnapshotSettings.DIFF_WORKERS,
+        diff_executor=diff_executor,
+        product_index=(
+            ProductIndex(SnapshotSettings.PRODUCT_INDEX_PATH)
+            if SnapshotSettings.DEDUPLICATE_PRODUCTS
+            else None
+        ),
+        price_store=(
+            PriceStore(StorageSettings.DB_PATH, StorageSettings.BATCH_SIZE)
+            if StorageSettings.BACKEND == "sqlite"
+            else None
+        ),
+        alert_cache=alert_cache,
+        volatility_tracker=volatility_tracker,
+        metrics=metrics,
+    )
+    parser = Parser(
+        APIConfig.CATALOG_URL,
+        APIConfig.PROXIES,
+        data_processor,
+        ParserConfig(
+            PriceSettings.LOW_PRICE,
+            PriceSettings.TOP_PRICE,
+            PriceSettings.DISCOUNT,
+        ),
+        catalog_fetcher=CatalogFetcher(
+            APIConfig.CATALOG_URL,
+            APIConfig.PROXIES,
+            cache_ttl=CatalogSettings.CACHE_TTL,
+            cache_path=CatalogSettings.CACHE_PATH,
+            proxy_pool=proxy_pool,
+        ),
+        page_depth_store=PageDepthStore(PaginationSettings.DEPTH_CACHE_PATH),
+        price_band_store=PriceBandStore(PriceBandSettings.BAND_CACHE_PATH),
+        min_band_width=PriceBandSettings.MIN_BAND_WIDTH,
+        page_size=PaginationSettings.PAGE_SIZE,
+        probe_window=PaginationSettings.PROBE_WINDOW,
+        fingerprint_store=(
+            FingerprintStore(FingerprintSettings.CACHE_PATH)
+            if FingerprintSettings.ENABLED
+            else None
+        ),
+        metrics=metrics,
+    )
+    return Runtime(
+        metrics=metrics,
+        cycle_seconds=metrics.histogram(
+            "cycle_seconds", "Длительность цикла сбора и сравнения"
+        ),
+        proxy_pool=proxy_pool,
+        volatility_tracker=volatility_tracker,
+        data_processor=data_processor,
+        parser=parser,
+        notification_service=NotificationService(
             APIConfig.TOKEN,
             APIConfig.CHANNEL_IDS,
-            APIConfig.PRICE_DIFFERENCE_PERCENTAGE,
-        )
-    except Exception as e:
+            queue_path=NotificationSettings.QUEUE_PATH,
+            metrics=metrics,
+            alert_cache=alert_cache,
+        ),
+        diff_executor=diff_executor,
+    )
+
+
+async def compare_changes(runtime: Runtime) -> None:
+    """
+    Сравнивает собранные снимки и ставит уведомления о снижении цен в
+    очередь процесса, не дожидаясь их доставки.
+    """
+    await runtime.data_processor.compare_and_save_changes(
+        APIConfig.TOKEN,
+        APIConfig.CHANNEL_IDS,
+        APIConfig.PRICE_DIFFERENCE_PERCENTAGE,
+        notification_service=runtime.notification_service,
+    )
+
+
+async def run_once(runtime: Runtime, job: Awaitable[bool | None]) -> bool:
+    """
+    Выполняет одну задачу и дожидается доставки ее уведомлений.
+
+    :return: False, если задача завершилась исключением или вернула False.
+    """
+    await runtime.notification_service.start()
+    try:
+        return await job is not False
+    except Exception as e:  # pylint: disable=W0718
+        logger.error("Ошибка при выполнении задачи: %s", e)
+        return False
+    finally:
+        await runtime.notification_service.close(NotificationSettings.FLUSH_TIMEOUT)
+
+
+async def scheduled_job(runtime: Runtime, urls: list[str] | None = None) -> bool:
+    """
+    Функция для выполнения запланированной работы. Циклы разных задач
+    выполняются по очереди, потому что делят хранилище цен и снимки.
+
+    :return: False, если цикл прервался ошибкой.
+    """
+    try:
+        async with runtime.cycle_lock:
+            with runtime.cycle_seconds.time():
+                runtime.data_processor.start_cycle()
+                await main(runtime, urls)
+                for url in urls or []:
+                    result = runtime.parser.crawl_results.pop(url, None)
+                    if result is not None:
+                        runtime.volatility_tracker.mark_crawled(
+                            url, result.name, result.requests
+                        )
+                await compare_changes(runtime)
+            if MetricsSettings.DUMP_PATH:
+                runtime.metrics.dump_json(MetricsSettings.DUMP_PATH)
+    except Exception as e:  # pylint: disable=W0718
         logger.error("Ошибка при выполнении запланированной работы: %s", e)
+        return False
+    return True
+
+
+async def crawl_urls(runtime: Runtime, urls: list[str]) -> None:
+    """
+    Обходит категории параллельно. Одновременно обрабатывается не более
+    MAX_CONCURRENT_CATEGORIES категорий, а все запросы к страницам делят
+    общий бюджет загрузчика. При значении 1 обход последовательный.
+    """
+    category_semaphore = asyncio.Semaphore(
+        max(ConcurrencySettings.MAX_CONCURRENT_CATEGORIES, 1)
+    )
+
+    async def crawl(url: str) -> None:
+        async with category_semaphore:
+            await runtime.parser.run(
+                Headers.HEADERS,
+                url,
+                ScheduleSettings.START_PAGE,
+                ScheduleSettings.END_PAGE,
+            )
+
+    await asyncio.gather(*(crawl(url) for url in urls))
 
 
-async def main() -> None:
+def load_target_urls() -> list[str]:
     urls: list[str] = load_urls(os.path.abspath(DataDirectories.URLS_FILE_PATH))
+    return urls[: ScheduleSettings.MAX_URLS_TO_PARSE]
+
+
+async def main(runtime: Runtime, urls: list[str] | None = None) -> None:
+    """
+    Обходит категории. Если загрузчик уже открыт (режим планировщика),
+    используется его сессия, иначе создается новая на время обхода.
+    """
+    if urls is None:
+        urls = load_target_urls()
 
     if not urls:
         logger.error("Список URL пуст.")
@@ -76,10 +316,16 @@ async def main() -> None:
 
     start: datetime.datetime = datetime.datetime.now()
 
-    for url in urls[: ScheduleSettings.MAX_URLS_TO_PARSE]:
-        await parser.run(
-            Headers.HEADERS, url, ScheduleSettings.START_PAGE, ScheduleSettings.END_PAGE
-        )
+    parser: Parser = runtime.parser
+    if parser.data_fetcher is not None:
+        await crawl_urls(runtime, urls)
+    else:
+        async with create_data_fetcher(runtime) as data_fetcher:
+            parser.data_fetcher = data_fetcher
+            try:
+                await crawl_urls(runtime, urls)
+            finally:
+                parser.data_fetcher = None
 
     end: datetime.datetime = datetime.datetime.now()
     total: datetime.timedelta = end - start
@@ -87,14 +333,73 @@ async def main() -> None:
     logger.info("Затраченное время: %s", str(total))
 
 
-def run_scheduled_job() -> None:
-    asyncio.run(scheduled_job())
+async def adaptive_job(runtime: Runtime, urls: list[str]) -> None:
+    """
+    Обходит только категории, которым пора на обход по их волатильности.
+    За один цикл тратится не больше запросов, чем позволяет бюджет частоты
+    на интервал планировщика.
+    """
+    request_budget: float = (
+        ConcurrencySettings.REQUESTS_PER_SECOND
+        * len(runtime.proxy_pool)
+        * ScheduleSettings.SCHEDULE_INTERVAL
+    )
+    due_urls: list[str] = runtime.volatility_tracker.select_due(urls, request_budget)
+    if not due_urls:
+        logger.info("Нет категорий для обхода")
+        return
+    logger.info("Категорий к обходу: %d из %d", len(due_urls), len(urls))
+    await scheduled_job(runtime, due_urls)
 
 
-if __name__ == "__main__":
-    run_scheduled_job()
-    schedule.every(ScheduleSettings.SCHEDULE_INTERVAL).seconds.do(run_scheduled_job)
+async def run_daemon(runtime: Runtime) -> None:
+    """
+    Запускает планировщик в одном цикле событий. Сессия, пул прокси,
+    очередь уведомлений и кеши живут между циклами. Категории из CATEGORY_INTERVALS опрашиваются
+    отдельными задачами со своим интервалом, остальные — общей задачей.
+    """
+    urls: list[str] = load_target_urls()
+    category_intervals: dict[str, int] = ScheduleSettings.CATEGORY_INTERVALS
+    common_urls: list[str] = [url for url in urls if url not in category_intervals]
 
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    scheduler = Scheduler(ScheduleSettings.SHUTDOWN_TIMEOUT)
+    if common_urls:
+        scheduler.add_job(
+            "cycle",
+            (
+                partial(adaptive_job, runtime, common_urls)
+                if AdaptiveScheduleSettings.ENABLED
+                else partial(scheduled_job, runtime, common_urls)
+            ),
+            ScheduleSettings.SCHEDULE_INTERVAL,
+            ScheduleSettings.JITTER,
+        )
+    for url in urls:
+        if url in category_intervals:
+            scheduler.add_job(
+                url,
+                partial(scheduled_job, runtime, [url]),
+                category_intervals[url],
+                ScheduleSettings.JITTER,
+            )
+
+    metrics_server = (
+        await start_metrics_server(
+            runtime.metrics, MetricsSettings.HOST, MetricsSettings.PORT
+        )
+        if MetricsSettings.ENABLED
+        else None
+    )
+    await runtime.notification_service.start()
+    try:
+        async with create_data_fetcher(runtime) as data_fetcher:
+            runtime.parser.data_fetcher = data_fetcher
+            try:
+                await scheduler.run()
+            finally:
+                runtime.parser.data_fetcher = None
+    finally:
+        await runtime.notification_service.close(NotificationSettings.FLUSH_TIMEOUT)
+        if metrics_server is not None:
+            await metrics_server.cleanup()
+    logger.info("Планировщик остановлен")
@@ -0,0 +1,260 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from logging import Logger, getLogger
+from typing import Any, Iterator, Optional, Sequence
+
+from aiohttp import web
+
+logger: Logger = getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs: list[str] = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    ] + [f'{name}="{value}"' for name, value in extra.items()]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """Базовая метрика с набором меток."""
+
+    TYPE: str = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name: str = name
+        self.description: str = description
+        self.labels: tuple[str, ...] = tuple(labels)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key: tuple[str, ...] = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        """Сумма по всем сочетаниям меток."""
+        return sum(self._values.values())
+
+    def render(self) -> list[str]:
+        lines: list[str] = super().render()
+        for key, value in self._values.items():
+            lines.append(
+                f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            )
+        return lines
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": self.TYPE,
+            "samples": [
+                {"labels": dict(zip(self.labels, key)), "value": value}
+                for key, value in self._values.items()
+            ],
+        }
+
+
+class Histogram(Metric):
+    """Гистограмма распределения значений с фиксированными границами."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labels)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key: tuple[str, ...] = self._key(labels)
+        counts: Optional[list[int]] = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Замеряет длительность блока в секундах."""
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def render(self) -> list[str]:
+        lines: list[str] = super().render()
+        for key, counts in self._counts.items():
+            cumulative: int = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le: str = bound if bound == "+Inf" else _format_number(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, key, le=le)}"
+                    f" {cumulative}"
+                )
+            label_text: str = _format_labels(self.labels, key)
+            lines.append(
+                f"{self.name}_sum{label_text} {_format_number(self._sums[key])}"
+            )
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "type": self.TYPE,
+            "buckets": list(self.buckets),
+            "samples": [
+                {
+                    "labels": dict(zip(self.labels, key)),
+                    "count": sum(counts),
+                    "sum": self._sums[key],
+                    "counts": counts,
+                }
+                for key, counts in self._counts.items()
+            ],
+        }
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса.
+
+    Метрики создаются при первом обращении по имени и обновляются без
+    блокировок: все потребители работают в одном цикле событий. Данные
+    отдаются в текстовом формате Prometheus и в виде JSON.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(
+        self, name: str, description: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, description, labels)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, description, labels, buckets)
+
+    def _get_or_create(self, cls: type, name: str, *args: Any) -> Any:
+        metric: Optional[Metric] = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Метрика {name} уже зарегистрирована с другим типом")
+        return metric
+
+    def render_prometheus(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "timestamp": time.time(),
+            "metrics": {
+                name: metric.to_dict() for name, metric in self._metrics.items()
+            },
+        }
+
+    def dump_json(self, path: str) -> None:
+        """Атомарно сохраняет текущие значения метрик в JSON-файл."""
+        tmp_path: str = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as err:
+            logger.warning("Не удалось сохранить метрики: %s", err)
+
+
+async def start_metrics_server(
+    registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108
+) -> web.AppRunner:
+    """Запускает HTTP-сервер с метриками в формате Prometheus на /metrics."""
+
+    async def handle_metrics(_: web.Request) -> web.Response:
+        return web.Response(
+            body=registry.render_prometheus().encode("utf-8"),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Метрики доступны на http://%s:%d/metrics", host, port)
+    return runner
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "start_metrics_server",
+]
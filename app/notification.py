@@ -1,56 +1,351 @@
+import json
 import os
+import time
+from dataclasses import asdict, dataclass, field
 from logging import Logger, getLogger
 import asyncio
+from typing import Optional
+from uuid import uuid4
+
 from dotenv import load_dotenv
 import aiohttp
 
-load_dotenv()
+from alert_cache import AlertDedupCache
+from metrics import MetricsRegistry
+from rate_limiter import TokenBucket
 
 logger: Logger = getLogger(__name__)
 
 
+@dataclass
+class PendingMessage:
+    """Сообщение, ожидающее доставки в один чат."""
+
+    chat_id: str
+    text: str
+    attempts: int = 0
+    alert_key: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid4().hex)
+
+
 class NotificationService:
-    def __init__(self, token: str, channel_ids: list[str]) -> None:
+    """
+    Очередь доставки сообщений в Telegram.
+
+    Все запросы идут через одну сессию. Для каждого чата работает свой
+    обработчик, поэтому порядок сообщений в чате сохраняется. Частота
+    ограничена общим и поканальным token bucket под лимиты Telegram, а
+    ответ 429 приостанавливает общий bucket на время retry_after. Недоставленные сообщения
+    записываются в журнал на диске и досылаются после перезапуска. Когда
+    очередь опустевает, журнал очищается, поэтому сервис может работать
+    весь процесс, а не один цикл.
+
+    :param token: Токен бота.
+    :param channel_ids: Идентификаторы чатов для рассылки.
+    :param queue_path: Путь к журналу очереди. Если None, очередь только в памяти.
+    :param global_rate: Сообщений в секунду на всего бота.
+    :param per_chat_rate: Сообщений в секунду на один чат.
+    :param per_chat_burst: Допустимый всплеск сообщений в один чат.
+    :param max_attempts: Число попыток при 429, 5xx и ошибках сети.
+    :param alert_cache: Кеш отправленных уведомлений. Ключ недоставленного
+        сообщения удаляется из него, чтобы уведомление пришло в следующем
+        цикле. Кеш сохраняется, когда очередь опустевает, и при закрытии.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        channel_ids: list[str],
+        queue_path: Optional[str] = None,
+        global_rate: float = 30,
+        per_chat_rate: float = 20 / 60,
+        per_chat_burst: float = 3,
+        max_attempts: int = 5,
+        request_timeout: int = 10,
+        api_url: str = "https://api.telegram.org",
+        metrics: Optional[MetricsRegistry] = None,
+        alert_cache: Optional[AlertDedupCache] = None,
+    ) -> None:
         self.token: str = token
         self.channel_ids: list[str] = channel_ids
-        self.url: str = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        self.url: str = f"{api_url}/bot{self.token}/sendMessage"
+        self.queue_path: Optional[str] = (
+            os.path.abspath(queue_path) if queue_path else None
+        )
+        self.per_chat_rate: float = per_chat_rate
+        self.per_chat_burst: float = per_chat_burst
+        self.max_attempts: int = max_attempts
+        self.request_timeout: int = request_timeout
+        self.global_bucket: TokenBucket = TokenBucket(global_rate)
+        self.alert_cache: Optional[AlertDedupCache] = alert_cache
+        self._alert_cache_dirty: bool = False
+        self.sent: int = 0
+        self.failed: int = 0
+        self._pending: dict[str, PendingMessage] = {}
+        self._queues: dict[str, asyncio.Queue] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.metrics: MetricsRegistry = metrics or MetricsRegistry()
+        self._notifications = self.metrics.counter(
+            "notifications_total", "Уведомления по итогу доставки", ("status",)
+        )
+        self._send_seconds = self.metrics.histogram(
+            "notification_send_seconds", "Время запроса к Telegram"
+        )
+
+    async def __aenter__(self) -> "NotificationService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """
+        Открывает сессию и ставит в очередь сообщения из журнала. Повторный
+        вызов до close() ничего не делает.
+        """
+        if self._session is not None and not self._session.closed:
+            return
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+        restored: list[PendingMessage] = self._load_journal()
+        if restored:
+            logger.info("Восстановлено недоставленных сообщений: %d", len(restored))
+        self._compact_journal(restored)
+        for message in restored:
+            self._enqueue(message)
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Дожидается доставки и освобождает ресурсы. Остаток сохраняется на диск."""
+        await self.flush(timeout)
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+        self._compact_journal(list(self._pending.values()))
+        self._save_alert_cache()
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        logger.info(
+            "Уведомления: отправлено %d, ошибок %d, в очереди %d",
+            self.sent,
+            self.failed,
+            len(self._pending),
+        )
+
+    async def send_message(self, text: str, alert_key: Optional[str] = None) -> None:
+        """
+        Ставит сообщение в очередь для каждого чата.
 
-    async def send_message(self, text: str) -> None:
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for channel_id in self.channel_ids:
-                payload: dict[str, str] = {
-                    "chat_id": channel_id,
-                    "text": text,
-                    "parse_mode": "HTML",
-                }
-                tasks.append(session.post(self.url, data=payload))
+        :param alert_key: Ключ сообщения в кеше уведомлений, который нужно
+            удалить, если сообщение не доставлено.
+        """
+        for channel_id in self.channel_ids:
+            message = PendingMessage(chat_id=channel_id, text=text, alert_key=alert_key)
+            self._append_journal({"op": "add", **asdict(message)})
+            self._enqueue(message)
 
-            responses = await asyncio.gather(*tasks)
-            for response in responses:
-                if response.status != 200:
-                    logger.error("Ошибка при отправке сообщения: %s", response.status)
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ожидает доставки всех сообщений из очереди.
+
+        :return: False, если время ожидания истекло раньше.
+        """
+        waiters = [queue.join() for queue in self._queues.values()]
+        if not waiters:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.gather(*waiters), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Не все сообщения доставлены, в очереди осталось %d",
+                len(self._pending),
+            )
+            return False
+
+    def _enqueue(self, message: PendingMessage) -> None:
+        self._pending[message.id] = message
+        queue: Optional[asyncio.Queue] = self._queues.get(message.chat_id)
+        if queue is None:
+            queue = self._queues[message.chat_id] = asyncio.Queue()
+            self._buckets[message.chat_id] = TokenBucket(
+                self.per_chat_rate, self.per_chat_burst
+            )
+            self._workers[message.chat_id] = asyncio.create_task(
+                self._worker(message.chat_id, queue)
+            )
+        queue.put_nowait(message)
+
+    async def _worker(self, chat_id: str, queue: asyncio.Queue) -> None:
+        while True:
+            message: PendingMessage = await queue.get()
+            try:
+                await self._deliver(message)
+            except Exception as e:  # pylint: disable=W0718
+                logger.error("Ошибка доставки сообщения в чат %s: %s", chat_id, e)
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, message: PendingMessage) -> None:
+        """Отправляет сообщение, повторяя при 429, 5xx и ошибках сети."""
+        payload: dict[str, str] = {
+            "chat_id": message.chat_id,
+            "text": message.text,
+            "parse_mode": "HTML",
+        }
+        while message.attempts < self.max_attempts:
+            await self._buckets[message.chat_id].acquire()
+            await self.global_bucket.acquire()
+            message.attempts += 1
+            delay: float = min(2**message.attempts, 60)
+            started: float = time.perf_counter()
+            try:
+                async with self._session.post(self.url, data=payload) as response:
+                    self._send_seconds.observe(time.perf_counter() - started)
+                    if response.status == 200:
+                        self._done(message, delivered=True)
+                        return
+                    body = await response.json(content_type=None)
+                    if not isinstance(body, dict):
+                        body = {}
+                    if response.status == 429:
+                        delay = self._retry_after(body, delay)
+                        self.global_bucket.pause(delay)
+                        logger.warning(
+                            "Лимит Telegram для чата %s, повтор через %s с, попытка %d",
+                            message.chat_id,
+                            delay,
+                            message.attempts,
+                        )
+                    elif response.status < 500:
+                        logger.error(
+                            "Ошибка при отправке сообщения: %s %s",
+                            response.status,
+                            body.get("description"),
+                        )
+                        self._done(message, delivered=False)
+                        return
+                    else:
+                        logger.warning(
+                            "Ошибка сервера Telegram %s, попытка %d",
+                            response.status,
+                            message.attempts,
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.warning(
+                    "Ошибка соединения с Telegram: %s, попытка %d",
+                    e,
+                    message.attempts,
+                )
+            await asyncio.sleep(delay)
+
+        logger.error(
+            "Сообщение в чат %s не доставлено после %d попыток",
+            message.chat_id,
+            self.max_attempts,
+        )
+        self._done(message, delivered=False)
+
+    @staticmethod
+    def _retry_after(body: dict, default: float) -> float:
+        """Пауза из parameters.retry_after ответа 429 или default."""
+        parameters = body.get("parameters")
+        retry_after = (
+            parameters.get("retry_after") if isinstance(parameters, dict) else None
+        )
+        if isinstance(retry_after, (int, float)) and retry_after >= 0:
+            return retry_after
+        return default
+
+    def _done(self, message: PendingMessage, delivered: bool) -> None:
+        self._pending.pop(message.id, None)
+        if delivered:
+            self.sent += 1
+        else:
+            self.failed += 1
+            if message.alert_key and self.alert_cache is not None:
+                self._alert_cache_dirty |= self.alert_cache.discard(message.alert_key)
+        if self._pending:
+            self._append_journal({"op": "done", "id": message.id})
+        else:
+            self._compact_journal([])
+            self._save_alert_cache()
+        self._notifications.inc(status="sent" if delivered else "failed")
+
+    def _save_alert_cache(self) -> None:
+        if self._alert_cache_dirty:
+            self.alert_cache.save()
+            self._alert_cache_dirty = False
+
+    def _append_journal(self, record: dict) -> None:
+        if not self.queue_path:
+            return
+        try:
+            with open(self.queue_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as err:
+            logger.warning("Не удалось записать журнал очереди: %s", err)
+
+    def _load_journal(self) -> list[PendingMessage]:
+        if not self.queue_path or not os.path.exists(self.queue_path):
+            return []
+        pending: dict[str, PendingMessage] = {}
+        try:
+            with open(self.queue_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record: dict = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.pop("op", None) == "add":
+                        message = PendingMessage(**record)
+                        message.attempts = 0
+                        pending[message.id] = message
+                    else:
+                        pending.pop(record.get("id"), None)
+        except OSError as err:
+            logger.warning("Не удалось прочитать журнал очереди: %s", err)
+        return list(pending.values())
+
+    def _compact_journal(self, pending: list[PendingMessage]) -> None:
+        """Перезаписывает журнал, оставляя только недоставленные сообщения."""
+        if not self.queue_path:
+            return
+        tmp_path: str = f"{self.queue_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                for message in pending:
+                    record: dict = {"op": "add", **asdict(message)}
+                    file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.queue_path)
+        except OSError as err:
+            logger.warning("Не удалось сохранить журнал очереди: %s", err)
 
 
 async def main():
-    notification_service = NotificationService(
+    async with NotificationService(
         os.getenv("token"), os.getenv("channel_id").split(",")
-    )
-    tasks = []
-    # message = "hello" * 5
-    message: str = (
-        "📢 <b>РЕЗИНКИ ДЛЯ ВОЛОС ВИШЕНКИ</b>\n\n"
-        "🔻 <b>Цена была:</b> <code>379₽</code>\n"
-        "🔺 <b>Цена стала:</b> <code>249₽</code>\n\n"
-        "💬 <b>Количество отзывов:</b> <code>420</code>\n"
-        "⭐️ <b>Рейтинг:</b> <code>4.8</code>\n\n"
-        "📉 <b>Цена уменьшилась на:</b> <code>35%</code>\n\n"
-        "🔗 <a href='https://www.wildberries.ru/catalog/139813034/detail.aspx?targetUrl=BP'>Ссылка на товар</a>"
-    )
-
-    tasks.append(notification_service.send_message(message))
-    await asyncio.gather(*tasks)
+    ) as notification_service:
+        # message = "hello" * 5
+        message: str = (
+            "📢 <b>РЕЗИНКИ ДЛЯ ВОЛОС ВИШЕНКИ</b>\n\n"
+            "🔻 <b>Цена была:</b> <code>379₽</code>\n"
+            "🔺 <b>Цена стала:</b> <code>249₽</code>\n\n"
+            "💬 <b>Количество отзывов:</b> <code>420</code>\n"
+            "⭐️ <b>Рейтинг:</b> <code>4.8</code>\n\n"
+            "📉 <b>Цена уменьшилась на:</b> <code>35%</code>\n\n"
+            "🔗 <a href='https://www.wildberries.ru/catalog/139813034/detail.aspx?targetUrl=BP'>Ссылка на товар</a>"
+        )
+
+        await notification_service.send_message(message)
 
 
 if __name__ == "__main__":
+    load_dotenv()
     asyncio.run(main())
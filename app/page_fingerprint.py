@@ -0,0 +1,43 @@
+from hashlib import blake2b
+from logging import Logger, getLogger
+from typing import Iterable, Optional
+
+from json_store import JsonStore
+
+logger: Logger = getLogger(__name__)
+
+
+def page_fingerprint(data: dict) -> str:
+    """
+    Отпечаток страницы ответа по парам id и salePriceU. Порядок товаров
+    на странице не учитывается, остальные поля товара тоже.
+    """
+    products: list[dict] = (data or {}).get("data", {}).get("products") or []
+    pairs: list[tuple[int, int]] = sorted(
+        (product.get("id") or 0, product.get("salePriceU") or 0) for product in products
+    )
+    return blake2b(repr(pairs).encode(), digest_size=16).hexdigest()
+
+
+def category_fingerprint(page_fingerprints: Iterable[str]) -> str:
+    """Отпечаток категории по отпечаткам ее страниц."""
+    return blake2b(
+        ",".join(sorted(page_fingerprints)).encode(), digest_size=16
+    ).hexdigest()
+
+
+class FingerprintStore(JsonStore):
+    """
+    Хранит отпечатки сохраненных снимков категорий между циклами, чтобы
+    не записывать и не сравнивать категории, в которых цены не менялись.
+    """
+
+    def get(self, key: str) -> Optional[str]:
+        return self.data.get(key)
+
+    def set(self, key: str, fingerprint: str) -> None:
+        self.data[key] = fingerprint
+        self.save()
+
+
+__all__ = ["FingerprintStore", "category_fingerprint", "page_fingerprint"]
@@ -0,0 +1,42 @@
+from logging import Logger, getLogger
+from math import ceil
+from typing import Optional
+
+from json_store import JsonStore
+
+logger: Logger = getLogger(__name__)
+
+
+class PageDepthStore(JsonStore):
+    """
+    Хранит глубину категорий (номер последней непустой страницы) между
+    циклами, чтобы следующий обход сразу запрашивал нужное число страниц.
+    """
+
+    def get(self, key: str) -> Optional[int]:
+        depth = self.data.get(key)
+        return int(depth) if depth is not None else None
+
+    def set(self, key: str, depth: int) -> None:
+        self.data[key] = depth
+        self.save()
+
+
+def count_products(data: dict) -> int:
+    """Количество товаров на странице ответа."""
+    return len((data or {}).get("data", {}).get("products", []) or [])
+
+
+def get_total(data: dict) -> Optional[int]:
+    """Общее число товаров по полю total ответа, если оно есть."""
+    total = (data or {}).get("data", {}).get("total")
+    return total if isinstance(total, int) else None
+
+
+def last_page_from_total(data: dict, page_size: int) -> Optional[int]:
+    """Номер последней страницы по полю total ответа, если оно есть."""
+    total: Optional[int] = get_total(data)
+    return ceil(total / page_size) if total is not None else None
+
+
+__all__ = ["PageDepthStore", "count_products", "get_total", "last_page_from_total"]
@@ -0,0 +1,72 @@
+from dataclasses import dataclass, field
+from logging import Logger, getLogger
+from typing import Optional
+
+from json_store import JsonStore
+
+logger: Logger = getLogger(__name__)
+
+
+@dataclass
+class BandResult:
+    """
+    Результат сбора ценового диапазона.
+
+    :param bands: Итоговые диапазоны (low, top, число товаров) после деления.
+    :param pages: Ответы всех запрошенных страниц, включая страницы
+        диапазонов, которые пришлось поделить.
+    :param depths: Глубина страниц по ключам диапазонов, которую можно
+        запомнить после успешного сбора всей категории.
+    """
+
+    bands: list[tuple[int, int, int]] = field(default_factory=list)
+    pages: list[dict] = field(default_factory=list)
+    depths: dict[str, int] = field(default_factory=dict)
+
+    def extend(self, other: "BandResult") -> None:
+        self.bands.extend(other.bands)
+        self.pages.extend(other.pages)
+        self.depths.update(other.depths)
+
+
+class PriceBandStore(JsonStore):
+    """Хранит найденные границы ценовых диапазонов категорий между циклами."""
+
+    def get(self, key: str) -> Optional[list[tuple[int, int]]]:
+        bands = self.data.get(key)
+        if not bands:
+            return None
+        return [(int(low), int(top)) for low, top in bands]
+
+    def set(self, key: str, bands: list[tuple[int, int]]) -> None:
+        self.data[key] = [list(band) for band in bands]
+        self.save()
+
+
+def split_band(low: int, top: int) -> list[tuple[int, int]]:
+    """
+    Делит диапазон пополам. Соседние диапазоны делят границу, чтобы
+    не потерять товары с копейками; дубликаты убираются по id.
+    """
+    middle: int = (low + top) // 2
+    return [(low, middle), (middle, top)]
+
+
+def merge_bands(
+    bands: list[tuple[int, int, int]], capacity: int
+) -> list[tuple[int, int]]:
+    """
+    Склеивает соседние диапазоны, если вместе они заполняют не больше
+    половины лимита страниц, чтобы не тратить лишние запросы.
+    """
+    merged: list[tuple[int, int, int]] = []
+    for low, top, count in sorted(bands):
+        if merged and merged[-1][2] + count <= capacity // 2:
+            prev_low, _, prev_count = merged[-1]
+            merged[-1] = (prev_low, max(top, merged[-1][1]), prev_count + count)
+        else:
+            merged.append((low, top, count))
+    return [(low, top) for low, top, _ in merged]
+
+
+__all__ = ["BandResult", "PriceBandStore", "merge_bands", "split_band"]
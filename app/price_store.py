@@ -0,0 +1,268 @@
+import os
+import sqlite3
+import time
+from logging import Logger, getLogger
+from typing import Any, Iterable, Optional
+
+import pandas as pd
+
+logger: Logger = getLogger(__name__)
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS cycles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER REFERENCES categories(id),
+    name TEXT,
+    brand TEXT,
+    supplier TEXT,
+    price INTEGER,
+    sale_price INTEGER,
+    previous_sale_price INTEGER,
+    sale INTEGER,
+    rating REAL,
+    supplier_rating REAL,
+    feedbacks INTEGER,
+    review_rating REAL,
+    promo_text_card TEXT,
+    promo_text_cat TEXT,
+    last_seen_cycle INTEGER,
+    changed_cycle INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_products_changed_cycle
+    ON products(changed_cycle);
+
+CREATE TABLE IF NOT EXISTS observations (
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    cycle INTEGER NOT NULL,
+    observed_at REAL NOT NULL,
+    price INTEGER,
+    sale_price INTEGER,
+    PRIMARY KEY (product_id, cycle)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS products_history_insert
+AFTER INSERT ON products
+BEGIN
+    INSERT OR REPLACE INTO observations
+    VALUES (new.id, new.last_seen_cycle, (julianday('now') - 2440587.5) * 86400.0, new.price, new.sale_price);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_history_update
+AFTER UPDATE OF sale_price, price ON products
+WHEN old.sale_price IS NOT new.sale_price OR old.price IS NOT new.price
+BEGIN
+    INSERT OR REPLACE INTO observations
+    VALUES (new.id, new.last_seen_cycle, (julianday('now') - 2440587.5) * 86400.0, new.price, new.sale_price);
+END;
+"""
+
+UPSERT_PRODUCT: str = """
+INSERT INTO products (
+    id, category_id, name, brand, supplier, price, sale_price, sale, rating,
+    supplier_rating, feedbacks, review_rating, promo_text_card, promo_text_cat,
+    last_seen_cycle
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    previous_sale_price = CASE
+        WHEN products.sale_price IS NOT excluded.sale_price THEN products.sale_price
+        ELSE products.previous_sale_price
+    END,
+    changed_cycle = CASE
+        WHEN products.sale_price IS NOT excluded.sale_price
+        THEN excluded.last_seen_cycle
+        ELSE products.changed_cycle
+    END,
+    category_id = excluded.category_id,
+    name = excluded.name,
+    brand = excluded.brand,
+    supplier = excluded.supplier,
+    price = excluded.price,
+    sale_price = excluded.sale_price,
+    sale = excluded.sale,
+    rating = excluded.rating,
+    supplier_rating = excluded.supplier_rating,
+    feedbacks = excluded.feedbacks,
+    review_rating = excluded.review_rating,
+    promo_text_card = excluded.promo_text_card,
+    promo_text_cat = excluded.promo_text_cat,
+    last_seen_cycle = excluded.last_seen_cycle
+"""
+
+SELECT_PRICE_DROPS: str = """
+SELECT
+    p.id AS id,
+    p.name AS name,
+    p.price AS price,
+    p.sale_price AS salePriceU,
+    p.previous_sale_price AS salePriceU_previous,
+    p.sale AS sale,
+    p.brand AS brand,
+    p.rating AS rating,
+    p.supplier AS supplier,
+    p.supplier_rating AS supplierRating,
+    p.feedbacks AS feedbacks,
+    p.review_rating AS reviewRating,
+    p.promo_text_card AS promoTextCard,
+    p.promo_text_cat AS promoTextCat,
+    c.name AS category
+FROM products AS p
+JOIN categories AS c ON c.id = p.category_id
+WHERE p.changed_cycle = ?
+    AND p.previous_sale_price > 0
+    AND p.sale_price > 0
+    AND p.sale_price * 100.0 < p.previous_sale_price * (100.0 - ?)
+"""
+
+SELECT_CHANGE_STATS: str = """
+SELECT
+    c.name AS category,
+    COUNT(*) AS compared,
+    SUM(p.changed_cycle = ?1 AND p.previous_sale_price > 0) AS changed,
+    AVG(
+        CASE WHEN p.changed_cycle = ?1 AND p.previous_sale_price > 0
+        THEN ABS(p.sale_price - p.previous_sale_price) * 100.0 / p.previous_sale_price
+        END
+    ) AS mean_change
+FROM products AS p
+JOIN categories AS c ON c.id = p.category_id
+WHERE p.last_seen_cycle = ?1
+GROUP BY c.name
+"""
+
+PRODUCT_COLUMNS: tuple[str, ...] = (
+    "id",
+    "name",
+    "brand",
+    "supplier",
+    "price",
+    "salePriceU",
+    "sale",
+    "rating",
+    "supplierRating",
+    "feedbacks",
+    "reviewRating",
+    "promoTextCard",
+    "promoTextCat",
+)
+
+
+class PriceStore:
+    """
+    Встроенное хранилище цен на SQLite.
+
+    В таблице products лежит последняя и предыдущая цена каждого товара,
+    а в observations — история изменений, которую ведут триггеры. Товары,
+    цена которых изменилась в текущем цикле, помечаются changed_cycle,
+    поэтому поиск снижений идет по индексу только среди изменившихся строк.
+
+    :param path: Путь к файлу базы данных.
+    :param batch_size: Размер пачки строк в одной транзакции.
+    """
+
+    def __init__(self, path: str, batch_size: int = 5000) -> None:
+        self.path: str = os.path.abspath(path) if path != ":memory:" else path
+        self.batch_size: int = batch_size
+        self._connection: sqlite3.Connection = sqlite3.connect(self.path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._connection.executescript(SCHEMA)
+        self.current_cycle: Optional[int] = self._last_cycle()
+
+    def _last_cycle(self) -> Optional[int]:
+        row = self._connection.execute("SELECT MAX(id) FROM cycles").fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def start_cycle(self) -> int:
+        """Начинает новый цикл сбора и возвращает его номер."""
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO cycles (started_at) VALUES (?)", (time.time(),)
+            )
+        self.current_cycle = cursor.lastrowid
+        logger.info("Начат цикл сбора %d", self.current_cycle)
+        return self.current_cycle
+
+    def _category_id(self, name: str) -> int:
+        self._connection.execute(
+            "INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,)
+        )
+        return self._connection.execute(
+            "SELECT id FROM categories WHERE name = ?", (name,)
+        ).fetchone()[0]
+
+    def has_category(self, name: str) -> bool:
+        """Записывались ли уже товары категории."""
+        row = self._connection.execute(
+            "SELECT 1 FROM categories WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def record(self, category: str, df: pd.DataFrame) -> None:
+        """Пакетно добавляет или обновляет товары категории."""
+        if self.current_cycle is None:
+            self.start_cycle()
+        if df.empty:
+            return
+        frame: pd.DataFrame = df.reindex(columns=list(PRODUCT_COLUMNS))
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows: Iterable[tuple[Any, ...]] = frame.itertuples(index=False, name=None)
+
+        with self._connection:
+            category_id: int = self._category_id(category)
+            batch: list[tuple[Any, ...]] = []
+            for row in rows:
+                batch.append((row[0], category_id, *row[1:], self.current_cycle))
+                if len(batch) >= self.batch_size:
+                    self._connection.executemany(UPSERT_PRODUCT, batch)
+                    batch.clear()
+            if batch:
+                self._connection.executemany(UPSERT_PRODUCT, batch)
+        logger.info("Сохранено %d товаров категории %s", len(frame), category)
+
+    def find_price_drops(
+        self, price_difference_percentage: int | float
+    ) -> pd.DataFrame:
+        """Товары, цена которых в текущем цикле снизилась больше чем на X%."""
+        return pd.read_sql_query(
+            SELECT_PRICE_DROPS,
+            self._connection,
+            params=(self.current_cycle, price_difference_percentage),
+        )
+
+    def change_stats(self) -> pd.DataFrame:
+        """
+        Статистика изменений цен по категориям, собранным в текущем цикле:
+        число товаров, число изменивших цену и средний модуль изменения
+        в процентах.
+        """
+        return pd.read_sql_query(
+            SELECT_CHANGE_STATS, self._connection, params=(self.current_cycle,)
+        )
+
+    def history(self, product_id: int) -> pd.DataFrame:
+        """История изменений цены товара."""
+        return pd.read_sql_query(
+            "SELECT cycle, observed_at, price, sale_price FROM observations "
+            "WHERE product_id = ? ORDER BY cycle",
+            self._connection,
+            params=(product_id,),
+        )
+
+
+__all__ = ["PriceStore"]
@@ -0,0 +1,193 @@
+import sys
+from array import array
+from typing import Any, Iterable, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+PRODUCT_LINK_PREFIX: str = "https://www.wildberries.ru/catalog/"
+PRODUCT_LINK_SUFFIX: str = "/detail.aspx?targetUrl=BP"
+
+INT_COLUMNS: tuple[str, ...] = ("id", "price", "salePriceU")
+OBJECT_COLUMNS: tuple[str, ...] = (
+    "name",
+    "sale",
+    "brand",
+    "rating",
+    "supplier",
+    "supplierRating",
+    "feedbacks",
+    "reviewRating",
+    "promoTextCard",
+    "promoTextCat",
+)
+INTERNED_COLUMNS: frozenset[str] = frozenset({"brand", "supplier"})
+COLUMN_ORDER: tuple[str, ...] = (
+    "id",
+    "name",
+    "price",
+    "salePriceU",
+    "sale",
+    "brand",
+    "rating",
+    "supplier",
+    "supplierRating",
+    "feedbacks",
+    "reviewRating",
+    "promoTextCard",
+    "promoTextCat",
+)
+
+
+def intern_string(value: Any) -> Any:
+    """
+    Возвращает единственный экземпляр строки. Бренды и продавцы
+    повторяются у тысяч товаров, поэтому хранятся в памяти один раз.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProductRecord(NamedTuple):
+    """
+    Компактная запись о товаре: кортеж без словаря атрибутов. Бренд и
+    продавец интернируются, ссылка строится по id.
+    """
+
+    id: int
+    name: Optional[str] = None
+    price: int = 0
+    salePriceU: int = 0
+    sale: Any = None
+    brand: Optional[str] = None
+    rating: Any = None
+    supplier: Optional[str] = None
+    supplierRating: Any = None
+    feedbacks: Any = None
+    reviewRating: Any = None
+    promoTextCard: Optional[str] = None
+    promoTextCat: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, product: dict) -> "ProductRecord":
+        """Запись из товара в ответе WB, цены переводятся в рубли."""
+        get = product.get
+        return cls(
+            get("id"),
+            get("name"),
+            (get("priceU") or 0) // 100,
+            (get("salePriceU") or 0) // 100,
+            get("sale"),
+            intern_string(get("brand")),
+            get("rating"),
+            intern_string(get("supplier")),
+            get("supplierRating"),
+            get("feedbacks"),
+            get("reviewRating"),
+            get("promoTextCard"),
+            get("promoTextCat"),
+        )
+
+    @property
+    def link(self) -> str:
+        return f"{PRODUCT_LINK_PREFIX}{self.id}{PRODUCT_LINK_SUFFIX}"
+
+
+def records_from_json(json_file: dict) -> list[ProductRecord]:
+    """Записи о товарах страницы ответа WB."""
+    products: list[dict] = (json_file or {}).get("data", {}).get("products") or []
+    return [ProductRecord.from_json(product) for product in products]
+
+
+def records_from_frame(df: pd.DataFrame) -> list[ProductRecord]:
+    """
+    Записи из строк таблицы. Лишние колонки отбрасываются, недостающие
+    заполняются None, пропуски NaN заменяются на None.
+    """
+    frame: pd.DataFrame = df.reindex(columns=list(ProductRecord._fields))
+    frame = frame.astype(object).where(frame.notna(), None)
+    return list(map(ProductRecord._make, frame.itertuples(index=False, name=None)))
+
+
+def records_to_frame(records: Iterable[ProductRecord]) -> pd.DataFrame:
+    """Таблица из записей с колонками в порядке COLUMN_ORDER."""
+    return pd.DataFrame.from_records(list(records), columns=list(ProductRecord._fields))
+
+
+class ProductColumns:
+    """
+    Накопитель товаров по колонкам.
+
+    Поля из ответа WB добавляются сразу в списки колонок, без словаря на
+    каждый товар. id и цены хранятся в типизированных массивах, бренды и
+    продавцы интернируются, а ссылка на товар не хранится и строится по id
+    только при выводе.
+    """
+
+    __slots__ = ("_ints", "_objects")
+
+    def __init__(self) -> None:
+        self._ints: dict[str, array] = {column: array("q") for column in INT_COLUMNS}
+        self._objects: dict[str, list[Any]] = {column: [] for column in OBJECT_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self._ints["id"])
+
+    def extend_from_json(self, json_file: dict) -> int:
+        """Добавляет товары страницы и возвращает их количество."""
+        products: list[dict] = (json_file or {}).get("data", {}).get("products") or []
+        ids, prices, sale_prices = (self._ints[column] for column in INT_COLUMNS)
+        appenders = [
+            (self._objects[column].append, column)
+            for column in OBJECT_COLUMNS
+            if column not in INTERNED_COLUMNS
+        ]
+        interned_appenders = [
+            (self._objects[column].append, column)
+            for column in OBJECT_COLUMNS
+            if column in INTERNED_COLUMNS
+        ]
+        for product in products:
+            get = product.get
+            ids.append(get("id") or 0)
+            prices.append((get("priceU") or 0) // 100)
+            sale_prices.append((get("salePriceU") or 0) // 100)
+            for append, key in appenders:
+                append(get(key))
+            for append, key in interned_appenders:
+                append(intern_string(get(key)))
+        return len(products)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Собирает DataFrame из накопленных колонок без лишних копий."""
+        data: dict[str, Any] = {
+            column: (
+                np.frombuffer(values, dtype=np.int64)
+                if values
+                else np.array([], dtype=np.int64)
+            )
+            for column, values in self._ints.items()
+        }
+        data.update(self._objects)
+        return pd.DataFrame(data, columns=list(COLUMN_ORDER))
+
+
+def product_links(ids: pd.Series) -> pd.Series:
+    """Ссылки на товары по их id."""
+    return PRODUCT_LINK_PREFIX + ids.astype(str) + PRODUCT_LINK_SUFFIX
+
+
+def with_links(df: pd.DataFrame) -> pd.DataFrame:
+    """Возвращает копию таблицы с колонкой link, построенной по id."""
+    return df.assign(link=product_links(df["id"]))
+
+
+__all__ = [
+    "ProductColumns",
+    "ProductRecord",
+    "intern_string",
+    "product_links",
+    "records_from_frame",
+    "records_from_json",
+    "records_to_frame",
+    "with_links",
+]
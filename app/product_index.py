@@ -0,0 +1,119 @@
+from logging import Logger, getLogger
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from json_store import JsonStore
+
+logger: Logger = getLogger(__name__)
+
+
+class ProductIndex(JsonStore):
+    """
+    Общий для всех категорий индекс товаров по id.
+
+    Товар закрепляется за первой категорией, в которой встретился, и
+    сохраняется и сравнивается только в ней, а для остальных категорий
+    запоминается лишь принадлежность. Закрепление держится между циклами,
+    пока товар есть в своей категории, поэтому товар всегда сравнивается
+    со своим же прошлым снимком. С path индекс сохраняется вызовом save()
+    и переживает перезапуск, иначе после него товар мог бы достаться
+    категории, которая первой закончила обход, и пропасть из сравнения.
+
+    :param path: Путь к JSON-файлу индекса. Если None, индекс только в памяти.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        super().__init__(path)
+        self._names: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._owners: dict[int, int] = {}
+        self._members: dict[int, np.ndarray] = {}
+        for category, stored in self.data.items():
+            code: int = self._code(category)
+            self._members[code] = np.unique(
+                np.asarray(stored.get("members", []), dtype=np.int64)
+            )
+            for product_id in stored.get("owned", []):
+                self._owners[int(product_id)] = code
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def _code(self, category: str) -> int:
+        code: int | None = self._codes.get(category)
+        if code is None:
+            code = self._codes[category] = len(self._names)
+            self._names.append(category)
+        return code
+
+    def claim(self, category: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Запоминает товары категории и возвращает только закрепленные за
+        ней. Товары, пропавшие из категории, освобождаются для других.
+        """
+        code: int = self._code(category)
+        ids: np.ndarray = df["id"].to_numpy(dtype=np.int64)
+        previous: np.ndarray | None = self._members.get(code)
+        if previous is not None:
+            for product_id in np.setdiff1d(previous, ids).tolist():
+                if self._owners.get(product_id) == code:
+                    del self._owners[product_id]
+        self._members[code] = np.unique(ids)
+
+        setdefault = self._owners.setdefault
+        owned: np.ndarray = np.fromiter(
+            (setdefault(product_id, code) == code for product_id in ids.tolist()),
+            dtype=bool,
+            count=len(ids),
+        )
+        shared: int = len(owned) - int(owned.sum())
+        if shared:
+            logger.info(
+                "Категория %s: %d товаров уже учтены в других категориях",
+                category,
+                shared,
+            )
+            return df[owned].reset_index(drop=True)
+        return df
+
+    def save(self) -> None:
+        """Записывает состав и закрепление товаров всех категорий."""
+        if not self.path:
+            return
+        owned: dict[int, list[int]] = {code: [] for code in self._members}
+        for product_id, code in self._owners.items():
+            owned.setdefault(code, []).append(product_id)
+        self.data.clear()
+        self.data.update(
+            (
+                self._names[code],
+                {
+                    "members": members.tolist(),
+                    "owned": sorted(owned.get(code, [])),
+                },
+            )
+            for code, members in self._members.items()
+        )
+        super().save()
+
+    def categories(self, ids: pd.Series) -> pd.Series:
+        """Категории каждого товара через запятую."""
+        values: np.ndarray = ids.to_numpy(dtype=np.int64)
+        names: list[list[str]] = [[] for _ in range(len(values))]
+        for code, members in self._members.items():
+            if members.size == 0:
+                continue
+            positions: np.ndarray = np.searchsorted(members, values)
+            found: np.ndarray = (
+                members[np.minimum(positions, len(members) - 1)] == values
+            )
+            for position in np.flatnonzero(found).tolist():
+                names[position].append(self._names[code])
+        return pd.Series(
+            [", ".join(product_names) for product_names in names], index=ids.index
+        )
+
+
+__all__ = ["ProductIndex"]
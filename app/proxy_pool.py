@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import deque
+from logging import Logger, getLogger
+from typing import Iterable, Optional
+
+import aiohttp
+
+logger: Logger = getLogger(__name__)
+
+NETWORK_ERRORS: tuple[type[BaseException], ...] = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+)
+
+
+class ProxyState:
+    """
+    Состояние одного прокси: число активных запросов и скользящие средние
+    задержки и доли ошибок. None в url означает прямое соединение.
+    """
+
+    __slots__ = (
+        "url",
+        "in_flight",
+        "latency",
+        "error_rate",
+        "failures",
+        "quarantined_until",
+    )
+
+    def __init__(self, url: Optional[str]) -> None:
+        self.url: Optional[str] = url
+        self.in_flight: int = 0
+        self.latency: Optional[float] = None
+        self.error_rate: float = 0.0
+        self.failures: int = 0
+        self.quarantined_until: float = 0.0
+
+    def score(self, default_latency: float) -> float:
+        """Ожидаемая стоимость запроса: чем меньше, тем предпочтительнее прокси."""
+        latency: float = self.latency if self.latency is not None else default_latency
+        return (self.in_flight + 1) * latency * (1 + 4 * self.error_rate)
+
+    def is_quarantined(self, now: float) -> bool:
+        return self.quarantined_until > now
+
+
+class ProxyLease:
+    """Прокси, выданный на время одного запроса."""
+
+    __slots__ = ("state", "started_at", "failed")
+
+    def __init__(self, state: ProxyState) -> None:
+        self.state: ProxyState = state
+        self.started_at: float = time.monotonic()
+        self.failed: bool = False
+
+    @property
+    def url(self) -> Optional[str]:
+        return self.state.url
+
+    def mark_failed(self) -> None:
+        """Отмечает запрос как неудачный по вине прокси (например, 429)."""
+        self.failed = True
+
+
+class ProxyPool:
+    """
+    Пул прокси с оценкой состояния.
+
+    Каждый запрос получает прокси с наименьшей оценкой с учетом текущей
+    нагрузки, задержки и доли ошибок. Число одновременных запросов через
+    один прокси ограничено, а прокси с ошибками подряд временно выводится
+    из ротации. Если в карантине все прокси, используется лучший из них.
+
+    :param proxies: Адреса прокси. Пустой список — прямое соединение.
+    :param max_concurrent_per_proxy: Лимит одновременных запросов на прокси.
+    :param failure_threshold: Число ошибок подряд до карантина.
+    :param quarantine_time: Длительность карантина в секундах.
+    :param smoothing: Вес нового замера в скользящих средних.
+    """
+
+    def __init__(
+        self,
+        proxies: Iterable[Optional[str]] = (),
+        max_concurrent_per_proxy: int = 10,
+        failure_threshold: int = 3,
+        quarantine_time: float = 60,
+        smoothing: float = 0.3,
+    ) -> None:
+        urls: list[Optional[str]] = list(dict.fromkeys(proxies)) or [None]
+        self.proxies: list[ProxyState] = [ProxyState(url) for url in urls]
+        self.max_concurrent_per_proxy: int = max_concurrent_per_proxy
+        self.failure_threshold: int = failure_threshold
+        self.quarantine_time: float = quarantine_time
+        self.smoothing: float = smoothing
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def __len__(self) -> int:
+        return len(self.proxies)
+
+    def _select(self) -> Optional[ProxyState]:
+        now: float = time.monotonic()
+        available: list[ProxyState] = [
+            proxy
+            for proxy in self.proxies
+            if proxy.in_flight < self.max_concurrent_per_proxy
+        ]
+        healthy: list[ProxyState] = [
+            proxy for proxy in available if not proxy.is_quarantined(now)
+        ]
+        if not healthy and all(proxy.is_quarantined(now) for proxy in self.proxies):
+            healthy = available
+        if not healthy:
+            return None
+        known: list[float] = [p.latency for p in self.proxies if p.latency is not None]
+        default_latency: float = sum(known) / len(known) if known else 1.0
+        return min(healthy, key=lambda proxy: proxy.score(default_latency))
+
+    async def acquire(self) -> ProxyLease:
+        """Выдает прокси, ожидая освобождения слота, если все заняты."""
+        while (proxy := self._select()) is None:
+            waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        proxy.in_flight += 1
+        return ProxyLease(proxy)
+
+    def release(self, lease: ProxyLease, failed: bool = False) -> None:
+        """Возвращает прокси в пул и обновляет его оценку."""
+        proxy: ProxyState = lease.state
+        proxy.in_flight -= 1
+        failed = failed or lease.failed
+        elapsed: float = time.monotonic() - lease.started_at
+        if not failed:
+            proxy.latency = (
+                elapsed
+                if proxy.latency is None
+                else proxy.latency + self.smoothing * (elapsed - proxy.latency)
+            )
+        proxy.error_rate += self.smoothing * (float(failed) - proxy.error_rate)
+        proxy.failures = proxy.failures + 1 if failed else 0
+        if proxy.failures >= self.failure_threshold:
+            proxy.quarantined_until = time.monotonic() + self.quarantine_time
+            proxy.failures = 0
+            logger.warning(
+                "Прокси %s выведен из ротации на %s с", proxy.url, self.quarantine_time
+            )
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        while self._waiters:
+            waiter: asyncio.Future = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def lease(self) -> "_LeaseContext":
+        """
+        Контекстный менеджер запроса через прокси. Ошибки сети внутри
+        блока засчитываются прокси как неудача.
+        """
+        return _LeaseContext(self)
+
+
+class _LeaseContext:
+    __slots__ = ("pool", "_lease")
+
+    def __init__(self, pool: ProxyPool) -> None:
+        self.pool: ProxyPool = pool
+        self._lease: Optional[ProxyLease] = None
+
+    async def __aenter__(self) -> ProxyLease:
+        self._lease = await self.pool.acquire()
+        return self._lease
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        failed: bool = exc_type is not None and issubclass(exc_type, NETWORK_ERRORS)
+        self.pool.release(self._lease, failed=failed)
+
+
+__all__ = ["ProxyLease", "ProxyPool"]
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from logging import Logger, getLogger
+from typing import Optional
+
+logger: Logger = getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов по алгоритму token bucket.
+
+    :param rate: Количество токенов, восполняемых за секунду.
+    :param capacity: Максимальный запас токенов (размер всплеска).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("Частота должна быть положительной")
+        self.rate: float = rate
+        self.capacity: float = max(capacity if capacity is not None else rate, 1.0)
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Ожидает, пока в корзине не появится нужное количество токенов."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Останавливает выдачу токенов на seconds секунд: запас уходит в
+        минус, и все ожидающие acquire ждут его восполнения.
+        """
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class RequestBudget:
+    """
+    Общий бюджет запросов: ограничивает число одновременных запросов
+    и их частоту для всех потребителей, которые его разделяют.
+
+    :param max_concurrent: Максимальное число одновременных запросов.
+    :param rate: Максимальное число запросов в секунду. None — без ограничения.
+    :param burst: Допустимый всплеск запросов сверх частоты.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+    ) -> None:
+        self.max_concurrent: int = max_concurrent
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrent)
+        self._bucket: Optional[TokenBucket] = (
+            TokenBucket(rate, burst) if rate is not None else None
+        )
+
+    async def __aenter__(self) -> "RequestBudget":
+        await self._semaphore.acquire()
+        if self._bucket is not None:
+            try:
+                await self._bucket.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+
+__all__ = ["RequestBudget", "TokenBucket"]
@@ -0,0 +1,126 @@
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from logging import Logger, getLogger
+from typing import Optional
+
+logger: Logger = getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Разбирает заголовок Retry-After: число секунд или HTTP-дату.
+
+    :return: Задержка в секундах или None, если заголовок не задан или некорректен.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Политика повторов с экспоненциальной задержкой и полным джиттером.
+
+    :param max_attempts: Максимальное число попыток.
+    :param base_delay: Базовая задержка в секундах.
+    :param max_delay: Верхняя граница задержки.
+    :param retry_statuses: Коды ответа, после которых запрос повторяется.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def is_retryable(self, status: int) -> bool:
+        return status in self.retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        """Случайная задержка от 0 до base_delay * 2**attempt (не больше max_delay)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Задержка перед следующей попыткой. Retry-After имеет приоритет."""
+        server_delay: Optional[float] = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель для одного апстрима.
+
+    После failure_threshold ошибок подряд запросы сразу отклоняются на
+    reset_timeout секунд. Затем пропускается один пробный запрос: успех
+    закрывает выключатель, ошибка снова открывает его. Если исход пробы
+    так и не записан (например, запрос отменен), через reset_timeout
+    пропускается следующая проба.
+
+    :param failure_threshold: Число ошибок подряд до размыкания.
+    :param reset_timeout: Время в секундах до пробного запроса.
+    """
+
+    CLOSED: str = "closed"
+    OPEN: str = "open"
+    HALF_OPEN: str = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.state: str = self.CLOSED
+        self._failures: int = 0
+        self._opened_at: float = 0.0
+        self._probe_at: float = 0.0
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос сейчас."""
+        if self.state == self.CLOSED:
+            return True
+        now: float = time.monotonic()
+        since: float = self._opened_at if self.state == self.OPEN else self._probe_at
+        if now - since >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class CircuitBreakers:
+    """Набор выключателей, создаваемых по ключу (шард или хост)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker: Optional[CircuitBreaker] = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+
+__all__ = ["CircuitBreaker", "CircuitBreakers", "RetryPolicy", "parse_retry_after"]
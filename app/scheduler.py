@@ -0,0 +1,174 @@
+import asyncio
+import math
+import random
+import signal
+import time
+from dataclasses import dataclass, field
+from logging import Logger, getLogger
+from typing import Awaitable, Callable, Optional
+
+logger: Logger = getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """
+    Периодическая задача планировщика.
+
+    next_run — момент по сетке интервалов (time.monotonic), due — момент
+    фактического запуска с учетом джиттера.
+    """
+
+    name: str
+    func: Callable[[], Awaitable[None]]
+    interval: float
+    jitter: float = 0.0
+    next_run: float = 0.0
+    due: float = 0.0
+    runs: int = 0
+    skipped: int = 0
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def schedule_next(self, now: float) -> None:
+        """Сдвигает запуск на следующий шаг сетки, пропуская прошедшие."""
+        self.next_run += self.interval
+        if self.next_run <= now:
+            missed: int = math.ceil((now - self.next_run) / self.interval)
+            self.next_run += missed * self.interval
+        self.due = self.next_run + random.uniform(0, self.jitter)
+
+
+class Scheduler:
+    """
+    Планировщик периодических задач в одном постоянном цикле событий.
+
+    Интервалы отсчитываются от сетки, а не от окончания задачи, поэтому
+    время запуска не накапливает смещение. Если предыдущий запуск задачи
+    еще идет, очередной пропускается. По SIGTERM/SIGINT новые запуски
+    прекращаются, а текущие получают shutdown_timeout секунд на завершение.
+
+    :param shutdown_timeout: Время ожидания текущих задач при остановке.
+    """
+
+    def __init__(self, shutdown_timeout: float = 60) -> None:
+        self.shutdown_timeout: float = shutdown_timeout
+        self.jobs: dict[str, Job] = {}
+        self._stopping: bool = False
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        interval: float,
+        jitter: float = 0.0,
+        run_immediately: bool = True,
+    ) -> Job:
+        """Добавляет задачу. Первый запуск — сразу или через interval."""
+        if interval <= 0:
+            raise ValueError("Интервал должен быть положительным")
+        now: float = time.monotonic()
+        job = Job(name, func, interval, jitter)
+        job.next_run = now if run_immediately else now + interval
+        job.due = job.next_run + (0 if run_immediately else random.uniform(0, jitter))
+        self.jobs[name] = job
+        self._wake()
+        return job
+
+    def remove_job(self, name: str) -> None:
+        self.jobs.pop(name, None)
+        self._wake()
+
+    def set_interval(self, name: str, interval: float) -> None:
+        """Меняет интервал задачи, пересчитывая ближайший запуск."""
+        job: Optional[Job] = self.jobs.get(name)
+        if job is None or interval <= 0 or interval == job.interval:
+            return
+        job.next_run += interval - job.interval
+        job.due += interval - job.interval
+        job.interval = interval
+        self._wake()
+
+    def stop(self) -> None:
+        """Прекращает запуск новых задач."""
+        if not self._stopping:
+            logger.info("Планировщик останавливается")
+        self._stopping = True
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Выполняет задачи до вызова stop() или сигнала завершения."""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        handled: list[signal.Signals] = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+                handled.append(sig)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass
+
+        try:
+            while not self._stopping:
+                now: float = time.monotonic()
+                for job in list(self.jobs.values()):
+                    if job.due <= now:
+                        self._launch(job, now)
+                delay: Optional[float] = (
+                    max(min(job.due for job in self.jobs.values()) - now, 0)
+                    if self.jobs
+                    else None
+                )
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for sig in handled:
+                loop.remove_signal_handler(sig)
+            await self._shutdown()
+
+    def _launch(self, job: Job, now: float) -> None:
+        if job.running:
+            job.skipped += 1
+            logger.warning("Задача %s еще выполняется, запуск пропущен", job.name)
+        else:
+            job.task = asyncio.create_task(self._execute(job))
+        job.schedule_next(now)
+
+    async def _execute(self, job: Job) -> None:
+        started: float = time.monotonic()
+        try:
+            await job.func()
+        except Exception as e:  # pylint: disable=W0718
+            logger.error("Ошибка в задаче %s: %s", job.name, e)
+        finally:
+            job.runs += 1
+            logger.info(
+                "Задача %s выполнена за %.1f с", job.name, time.monotonic() - started
+            )
+
+    async def _shutdown(self) -> None:
+        tasks: list[asyncio.Task] = [
+            job.task for job in self.jobs.values() if job.running
+        ]
+        if not tasks:
+            return
+        logger.info("Ожидание завершения задач: %d", len(tasks))
+        _, pending = await asyncio.wait(tasks, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+__all__ = ["Job", "Scheduler"]
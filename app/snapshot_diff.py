@@ -0,0 +1,163 @@
+"""
+Сравнение снимков категорий без состояния. Функции модуля не зависят от
+DataProcessor, поэтому их можно выполнять в отдельных процессах.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from snapshot_store import SnapshotBackend
+
+PRICE_COLUMNS: tuple[str, ...] = ("price", "salePriceU")
+
+
+@dataclass
+class ChangeStats:
+    """Сводка изменений цен категории за цикл."""
+
+    compared: int = 0
+    changed: int = 0
+    mean_change: float = 0.0
+
+
+@dataclass
+class DiffTask:
+    """Задание на сравнение текущего и предыдущего снимков одной категории."""
+
+    file_name: str
+    current_path: str
+    previous_path: str
+    backend: SnapshotBackend
+    columns_to_include: Sequence[str]
+    price_difference_percentage: int | float
+
+
+@dataclass
+class DiffResult:
+    """Изменения категории и время чтения снимков и сравнения в секундах."""
+
+    file_name: str
+    changes: pd.DataFrame
+    stats: ChangeStats
+    read_seconds: float = 0.0
+    diff_seconds: float = 0.0
+
+
+def compact_price_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Приводит целочисленные колонки цен к самому компактному типу."""
+    for column in PRICE_COLUMNS:
+        if column in df.columns and pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def calculate_percent_changes(
+    current_prices: pd.Series, previous_prices: pd.Series
+) -> np.ndarray:
+    """
+    Процент изменения цены для каждой строки. Деление на нулевую прежнюю
+    цену дает inf, если новая цена ненулевая, и 0 иначе.
+    """
+    current: np.ndarray = current_prices.to_numpy(dtype=np.float64)
+    previous: np.ndarray = previous_prices.to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_change: np.ndarray = (current - previous) / previous * 100
+    zero_previous: np.ndarray = previous == 0
+    percent_change[zero_previous] = np.where(current[zero_previous] != 0, np.inf, 0.0)
+    return percent_change
+
+
+def change_stats(percent_change: pd.Series) -> ChangeStats:
+    """Сводка по изменениям без учета пропавших из продажи товаров."""
+    changes: pd.Series = percent_change.abs()
+    changed: pd.Series = changes[
+        np.isfinite(changes) & (changes > 0) & (changes != 100)
+    ]
+    return ChangeStats(
+        compared=len(changes),
+        changed=len(changed),
+        mean_change=float(changed.mean()) if len(changed) else 0.0,
+    )
+
+
+def diff_frames(
+    current_df: pd.DataFrame,
+    previous_df: pd.DataFrame,
+    columns_to_include: Sequence[str],
+    price_difference_percentage: int | float,
+) -> tuple[pd.DataFrame, ChangeStats]:
+    """
+    Находит товары, цена которых снизилась больше чем на заданный процент.
+    Колонки текущего и предыдущего снимков должны иметь суффиксы
+    _current и _previous, кроме id.
+    """
+    merged_df: pd.DataFrame = current_df.merge(
+        previous_df, on="id", suffixes=("_current", "_previous")
+    )
+    merged_df["percent_change"] = calculate_percent_changes(
+        merged_df["salePriceU_current"], merged_df["salePriceU_previous"]
+    )
+    changes_df: pd.DataFrame = merged_df[
+        (merged_df["percent_change"] != -100)
+        & (merged_df["percent_change"] < -price_difference_percentage)
+    ][list(columns_to_include)]
+    return changes_df, change_stats(merged_df["percent_change"])
+
+
+def read_suffixed(
+    backend: SnapshotBackend, path: str, columns: list[str], suffix: str
+) -> pd.DataFrame:
+    """Читает нужные колонки снимка и добавляет суффикс ко всем, кроме id."""
+    df: pd.DataFrame = compact_price_columns(backend.read(path, ["id", *columns]))
+    return df.rename(columns={column: f"{column}{suffix}" for column in columns})
+
+
+def diff_snapshot_files(task: DiffTask) -> DiffResult:
+    """Читает пару снимков и сравнивает их. Выполняется в процессе пула."""
+    current_columns: list[str] = [
+        column.removesuffix("_current")
+        for column in task.columns_to_include
+        if column.endswith("_current")
+    ]
+    previous_columns: list[str] = [
+        column.removesuffix("_previous")
+        for column in task.columns_to_include
+        if column.endswith("_previous")
+    ]
+    started: float = time.perf_counter()
+    current_df: pd.DataFrame = read_suffixed(
+        task.backend, task.current_path, current_columns, "_current"
+    )
+    previous_df: pd.DataFrame = read_suffixed(
+        task.backend, task.previous_path, previous_columns, "_previous"
+    )
+    read_done: float = time.perf_counter()
+    changes_df, stats = diff_frames(
+        current_df,
+        previous_df,
+        task.columns_to_include,
+        task.price_difference_percentage,
+    )
+    return DiffResult(
+        task.file_name,
+        changes_df,
+        stats,
+        read_seconds=read_done - started,
+        diff_seconds=time.perf_counter() - read_done,
+    )
+
+
+__all__ = [
+    "ChangeStats",
+    "DiffResult",
+    "DiffTask",
+    "calculate_percent_changes",
+    "change_stats",
+    "compact_price_columns",
+    "diff_frames",
+    "diff_snapshot_files",
+]
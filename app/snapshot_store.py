@@ -0,0 +1,149 @@
+import importlib.util
+from abc import ABC, abstractmethod
+from logging import Logger, getLogger
+from typing import ClassVar, Optional, Sequence
+
+import pandas as pd
+
+logger: Logger = getLogger(__name__)
+
+SNAPSHOT_SCHEMA: dict[str, str] = {
+    "id": "int64",
+    "name": "string",
+    "price": "int32",
+    "salePriceU": "int32",
+    "sale": "Int16",
+    "brand": "category",
+    "rating": "float32",
+    "supplier": "category",
+    "supplierRating": "float32",
+    "feedbacks": "Int32",
+    "reviewRating": "float32",
+    "promoTextCard": "string",
+    "promoTextCat": "string",
+    "link": "string",
+}
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Приводит колонки снимка к фиксированной схеме. Бренд и продавец
+    хранятся как категории, что в колоночных форматах дает словарное
+    кодирование.
+    """
+    columns: dict[str, pd.Series] = {}
+    for column, dtype in SNAPSHOT_SCHEMA.items():
+        if column not in df.columns:
+            continue
+        series: pd.Series = df[column]
+        if dtype in ("string", "category"):
+            columns[column] = series.astype(dtype)
+        elif dtype in ("int64", "int32"):
+            columns[column] = (
+                pd.to_numeric(series, errors="coerce").fillna(0).astype(dtype)
+            )
+        else:
+            columns[column] = pd.to_numeric(series, errors="coerce").astype(dtype)
+    extra: list[str] = [c for c in df.columns if c not in SNAPSHOT_SCHEMA]
+    return pd.concat([pd.DataFrame(columns, index=df.index), df[extra]], axis=1)
+
+
+class SnapshotBackend(ABC):
+    """Формат хранения снимков категорий."""
+
+    name: ClassVar[str]
+    extension: ClassVar[str]
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        """Записывает снимок в файл."""
+
+    @abstractmethod
+    def read(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Читает снимок, при необходимости только указанные колонки."""
+
+
+class CsvSnapshotBackend(SnapshotBackend):
+    name = "csv"
+    extension = ".csv"
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        df.to_csv(path, index=False)
+
+    def read(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        return pd.read_csv(path, usecols=list(columns) if columns else None)
+
+
+class ParquetSnapshotBackend(SnapshotBackend):
+    name = "parquet"
+    extension = ".parquet"
+
+    def __init__(self, compression: str = "zstd") -> None:
+        _require_pyarrow(self.name)
+        self.compression: str = compression
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        apply_schema(df).to_parquet(path, index=False, compression=self.compression)
+
+    def read(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        return pd.read_parquet(path, columns=list(columns) if columns else None)
+
+
+class ArrowIpcSnapshotBackend(SnapshotBackend):
+    """
+    Несжатый Arrow IPC: файл отображается в память, и при чтении
+    декодируются только запрошенные колонки.
+    """
+
+    name = "arrow"
+    extension = ".arrow"
+
+    def __init__(self) -> None:
+        _require_pyarrow(self.name)
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        import pyarrow as pa  # pylint: disable=C0415
+        from pyarrow import feather  # pylint: disable=C0415
+
+        table = pa.Table.from_pandas(apply_schema(df), preserve_index=False)
+        feather.write_feather(table, path, compression="uncompressed")
+
+    def read(self, path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        import pyarrow as pa  # pylint: disable=C0415
+
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+            if columns:
+                table = table.select(list(columns))
+            return table.to_pandas()
+
+
+SNAPSHOT_BACKENDS: dict[str, type[SnapshotBackend]] = {
+    backend.name: backend
+    for backend in (CsvSnapshotBackend, ParquetSnapshotBackend, ArrowIpcSnapshotBackend)
+}
+
+
+def _require_pyarrow(backend_name: str) -> None:
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(f"Для формата {backend_name} требуется пакет pyarrow")
+
+
+def get_snapshot_backend(name: str) -> SnapshotBackend:
+    """Создает бэкенд снимков по имени формата: csv, parquet или arrow."""
+    try:
+        backend_class: type[SnapshotBackend] = SNAPSHOT_BACKENDS[name]
+    except KeyError as err:
+        raise ValueError(f"Неизвестный формат снимков: {name}") from err
+    return backend_class()
+
+
+__all__ = [
+    "ArrowIpcSnapshotBackend",
+    "CsvSnapshotBackend",
+    "ParquetSnapshotBackend",
+    "SNAPSHOT_SCHEMA",
+    "SnapshotBackend",
+    "apply_schema",
+    "get_snapshot_backend",
+]
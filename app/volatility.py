@@ -0,0 +1,138 @@
+import math
+import time
+from logging import Logger, getLogger
+from typing import Any, Optional
+
+from json_store import JsonStore
+
+logger: Logger = getLogger(__name__)
+
+
+class VolatilityTracker(JsonStore):
+    """
+    Статистика изменений цен по категориям и адаптивный интервал опроса.
+
+    По итогам каждого сравнения для категории обновляются скользящие
+    средние: доля циклов с изменениями, доля изменившихся товаров и
+    средний размер изменения. Чем чаще и сильнее меняются цены, тем ближе
+    интервал опроса к min_interval, у спокойных категорий он растет до
+    max_interval.
+
+    :param path: Путь к JSON-файлу. Если None, статистика только в памяти.
+    :param min_interval: Минимальный интервал опроса в секундах.
+    :param max_interval: Максимальный интервал опроса в секундах.
+    :param smoothing: Вес нового цикла в скользящих средних.
+    :param saturation_rate: Доля изменившихся товаров, считающаяся максимальной.
+    :param saturation_change: Средний размер изменения в %, считающийся максимальным.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        min_interval: float = 15,
+        max_interval: float = 900,
+        smoothing: float = 0.3,
+        saturation_rate: float = 0.05,
+        saturation_change: float = 30,
+    ) -> None:
+        super().__init__(path)
+        self.data.setdefault("categories", {})
+        self.data.setdefault("urls", {})
+        self.min_interval: float = min_interval
+        self.max_interval: float = max(max_interval, min_interval)
+        self.smoothing: float = smoothing
+        self.saturation_rate: float = saturation_rate
+        self.saturation_change: float = saturation_change
+
+    @property
+    def categories(self) -> dict[str, dict[str, float]]:
+        return self.data["categories"]
+
+    @property
+    def urls(self) -> dict[str, dict[str, Any]]:
+        return self.data["urls"]
+
+    def record(
+        self, name: str, compared: int, changed: int, mean_change: float
+    ) -> None:
+        """
+        Учитывает результат сравнения категории.
+
+        :param name: Имя снимка категории.
+        :param compared: Число товаров, найденных в обоих циклах.
+        :param changed: Число товаров с изменившейся ценой.
+        :param mean_change: Средний модуль изменения цены в процентах.
+        """
+        if compared <= 0:
+            return
+        observed: dict[str, float] = {
+            "activity": float(changed > 0),
+            "change_rate": changed / compared,
+            "magnitude": mean_change if changed else 0.0,
+        }
+        stats: Optional[dict[str, float]] = self.categories.get(name)
+        if stats is None:
+            stats = self.categories[name] = {**observed, "cycles": 0}
+        else:
+            for key, value in observed.items():
+                stats[key] += self.smoothing * (value - stats[key])
+        stats["cycles"] += 1
+
+    def score(self, name: Optional[str]) -> float:
+        """Волатильность категории от 0 (цены не меняются) до 1."""
+        stats: Optional[dict[str, float]] = self.categories.get(name) if name else None
+        if stats is None:
+            return 1.0
+        rate: float = min(stats["change_rate"] / self.saturation_rate, 1.0)
+        change: float = min(stats["magnitude"] / self.saturation_change, 1.0)
+        return stats["activity"] * math.sqrt(rate * change)
+
+    def interval(self, url: str) -> float:
+        """Интервал опроса категории. Новые категории опрашиваются чаще всего."""
+        name: Optional[str] = self.urls.get(url, {}).get("name")
+        return self.max_interval - (self.max_interval - self.min_interval) * self.score(
+            name
+        )
+
+    def mark_crawled(self, url: str, name: str, requests: int) -> None:
+        """Запоминает время обхода категории и число потраченных запросов."""
+        self.urls[url] = {"name": name, "crawled_at": time.time(), "requests": requests}
+
+    def select_due(
+        self, urls: list[str], request_budget: Optional[float] = None
+    ) -> list[str]:
+        """
+        Возвращает категории, которым пора на обход, начиная с самых
+        просроченных. Суммарная стоимость в запросах не превышает
+        request_budget, но хотя бы одна просроченная категория выбирается.
+        """
+        now: float = time.time()
+        overdue: list[tuple[float, str]] = []
+        for url in urls:
+            crawled_at: float = self.urls.get(url, {}).get("crawled_at", 0)
+            ratio: float = (now - crawled_at) / self.interval(url)
+            if ratio >= 1:
+                overdue.append((ratio, url))
+        overdue.sort(reverse=True)
+
+        selected: list[str] = []
+        spent: float = 0
+        for _, url in overdue:
+            cost: float = self.urls.get(url, {}).get("requests", 1)
+            if (
+                selected
+                and request_budget is not None
+                and spent + cost > request_budget
+            ):
+                continue
+            selected.append(url)
+            spent += cost
+        if len(selected) < len(overdue):
+            logger.info(
+                "Бюджет запросов исчерпан: отложено категорий %d",
+                len(overdue) - len(selected),
+            )
+        return selected
+
+
+__all__ = ["VolatilityTracker"]
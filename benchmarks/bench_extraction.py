@@ -0,0 +1,82 @@
+"""
+Сравнение извлечения товаров из ответов WB: список ProductRecord и DataFrame
+против накопления по колонкам в ProductColumns. Замеряются время и пик
+памяти на весь цикл (страницы x категории).
+
+    python benchmarks/bench_extraction.py --pages 30 --categories 50
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "app")]
+
+from data_processor import DataProcessor  # noqa: E402
+from fast_json import loads  # noqa: E402
+from product_columns import ProductColumns  # noqa: E402
+from stub_server import make_page  # noqa: E402
+
+
+def record_extraction(bodies: list[list[bytes]]) -> int:
+    """Построчный путь: json.loads, запись ProductRecord на товар и DataFrame из списка."""
+    rows = 0
+    for category_bodies in bodies:
+        data_list: list = []
+        for body in category_bodies:
+            data_list.extend(DataProcessor.get_data_from_json(json.loads(body)))
+        rows += len(pd.DataFrame(data_list))
+    return rows
+
+
+def column_extraction(bodies: list[list[bytes]]) -> int:
+    """Новый путь: быстрый JSON и накопление сразу по колонкам."""
+    rows = 0
+    for category_bodies in bodies:
+        product_columns = ProductColumns()
+        for body in category_bodies:
+            product_columns.extend_from_json(loads(body))
+        rows += len(product_columns.to_frame())
+    return rows
+
+
+def measure(func, bodies) -> tuple[float, float, int]:
+    gc.collect()
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    rows: int = func(bodies)
+    elapsed: float = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, rows
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--pages", type=int, default=30)
+    arg_parser.add_argument("--categories", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    bodies: list[list[bytes]] = [
+        [
+            json.dumps(make_page(f"shard{category}", page)).encode()
+            for page in range(1, args.pages + 1)
+        ]
+        for category in range(args.categories)
+    ]
+    for name, func in (("records", record_extraction), ("columns", column_extraction)):
+        elapsed, peak, rows = measure(func, bodies)
+        print(
+            f"{name:<8} товаров: {rows:>7}  время: {elapsed:.2f} с  пик: {peak:.1f} МиБ"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Набор микробенчмарков конвейера данных на синтетических данных.
+
+Для каждого этапа и размера замеряется лучшее время из --repeats серий,
+пропускная способность и пик памяти (отдельный запуск под tracemalloc;
+память процессов пула сравнения не учитывается). Логи INFO отключены.
+Результаты сохраняются в JSON, а с --compare сравниваются с прошлым
+запуском: при замедлении больше --threshold скрипт завершается с кодом 1.
+Рядом с каждым этапом замеряется эталонный цикл на чистом Python, и
+сравниваются времена относительно него, чтобы колебания частоты и
+загрузки машины между запусками не выглядели регрессией. Этапы с
+регрессией перемеряются до --confirm раз, берется лучший замер.
+
+    python benchmarks/bench_pipeline.py --sizes 1000 10000 100000 --output base.json
+    python benchmarks/bench_pipeline.py --compare base.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import platform
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "app")]
+
+from catalog_fetcher import CatalogFetcher  # noqa: E402
+from catalog_index import CatalogIndex  # noqa: E402
+from data_processor import DataProcessor  # noqa: E402
+from stub_server import make_catalog  # noqa: E402
+from synthetic import make_next_snapshot, make_payload, make_snapshot  # noqa: E402
+
+COLUMNS: list[str] = [
+    "id",
+    "name_current",
+    "price_current",
+    "salePriceU_current",
+    "salePriceU_previous",
+]
+
+CATEGORIES: int = 10
+LOOKUPS: int = 100
+CALIBRATION_SIZE: int = 20000
+
+
+class NullNotificationService:
+    """Очередь уведомлений без сети: сообщения только считаются."""
+
+    def __init__(self) -> None:
+        self.messages: int = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self, _timeout: float | None = None) -> None:
+        pass
+
+    async def send_message(self, _text: str, _alert_key: str | None = None) -> None:
+        self.messages += 1
+
+
+class OfflineDataProcessor(DataProcessor):
+    def create_notification_service(self, _token, _channel_ids):
+        return NullNotificationService()
+
+
+def bench_get_data_from_json(size: int, _tmp_dir: str) -> tuple[Callable[[], Any], int]:
+    payload: dict = make_payload(size)
+    return lambda: DataProcessor.get_data_from_json(payload), size
+
+
+def bench_save_csv(size: int, tmp_dir: str) -> tuple[Callable[[], Any], int]:
+    data_processor = DataProcessor(
+        f"{tmp_dir}/current", f"{tmp_dir}/previous", f"{tmp_dir}/changes"
+    )
+    snapshot: pd.DataFrame = make_snapshot(size)
+    return lambda: data_processor.save_csv(snapshot, "bench"), size
+
+
+def bench_process_file(size: int, tmp_dir: str) -> tuple[Callable[[], Any], int]:
+    data_processor = DataProcessor(
+        f"{tmp_dir}/current", f"{tmp_dir}/previous", f"{tmp_dir}/changes"
+    )
+    snapshot: pd.DataFrame = make_snapshot(size)
+    current_df = (
+        DataProcessor.compact_price_columns(make_next_snapshot(snapshot))
+        .add_suffix("_current")
+        .rename(columns={"id_current": "id"})
+    )
+    previous_df = (
+        DataProcessor.compact_price_columns(snapshot)
+        .add_suffix("_previous")
+        .rename(columns={"id_previous": "id"})
+    )
+    return (
+        lambda: asyncio.run(
+            data_processor.process_file(current_df, previous_df, COLUMNS, 30)
+        ),
+        size,
+    )
+
+
+def bench_compare_and_save_changes(
+    size: int, tmp_dir: str
+) -> tuple[Callable[[], Any], int]:
+    """Сравнение CATEGORIES снимков CSV, size товаров суммарно."""
+    data_processor = OfflineDataProcessor(
+        f"{tmp_dir}/current", f"{tmp_dir}/previous", f"{tmp_dir}/changes"
+    )
+    rows: int = max(size // CATEGORIES, 1)
+    for category in range(CATEGORIES):
+        snapshot: pd.DataFrame = make_snapshot(rows, seed=category)
+        data_processor.save_snapshot(make_next_snapshot(snapshot), f"cat{category}")
+        snapshot.to_csv(f"{tmp_dir}/previous/cat{category}.csv", index=False)
+    return (
+        lambda: asyncio.run(
+            data_processor.compare_and_save_changes("token", ["chat"], 30)
+        ),
+        rows * CATEGORIES,
+    )
+
+
+def bench_get_data_category(size: int, _tmp_dir: str) -> tuple[Callable[[], Any], int]:
+    catalog_fetcher = CatalogFetcher("http://localhost/menu.json", {})
+    catalog: list[dict] = make_catalog(size)
+    return lambda: catalog_fetcher.get_data_category(catalog), size
+
+
+def bench_find_by_url(size: int, _tmp_dir: str) -> tuple[Callable[[], Any], int]:
+    """LOOKUPS поисков категории по URL в индексе из size категорий."""
+    catalog_index: CatalogIndex = CatalogIndex.from_catalog(make_catalog(size))
+    step: int = max(len(catalog_index.categories) // LOOKUPS, 1)
+    urls: list[str] = [
+        f"https://www.wildberries.ru{category['url']}"
+        for category in catalog_index.categories[::step][:LOOKUPS]
+    ]
+
+    def run() -> None:
+        for url in urls:
+            catalog_index.find_by_url(url)
+
+    return run, len(urls)
+
+
+BENCHMARKS: dict[str, Callable[[int, str], tuple[Callable[[], Any], int]]] = {
+    "get_data_from_json": bench_get_data_from_json,
+    "save_csv": bench_save_csv,
+    "process_file": bench_process_file,
+    "compare_and_save_changes": bench_compare_and_save_changes,
+    "get_data_category": bench_get_data_category,
+    "find_by_url": bench_find_by_url,
+}
+
+
+def measure(
+    func: Callable[[], Any], repeats: int, min_time: float
+) -> tuple[float, float]:
+    """
+    Время одного запуска и пик памяти в МиБ. Число запусков в серии
+    подбирается так, чтобы серия шла не меньше min_time секунд: на
+    этапах в доли миллисекунды одиночный замер слишком шумный для
+    сравнения с baseline. Берется лучшая из repeats серий.
+    """
+    timer = timeit.Timer(func, setup="gc.enable()")
+    number: int = 1
+    while (elapsed := timer.timeit(number)) < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    gc.collect()
+    timings: list[float] = [total / number for total in timer.repeat(repeats, number)]
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak / 2**20
+
+
+def calibration() -> int:
+    """Эталонная нагрузка для нормировки замеров."""
+    return sum(range(CALIBRATION_SIZE))
+
+
+def relative_seconds(result: dict) -> float:
+    """Время этапа в единицах эталонного цикла, если он замерен."""
+    return result["seconds"] / result.get("calibration_seconds", 1.0)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Печатает изменение времени относительно baseline и возвращает регрессии."""
+    regressions: list[str] = []
+    for key, result in results["results"].items():
+        base: dict | None = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        if "calibration_seconds" in result and "calibration_seconds" in base:
+            change: float = relative_seconds(result) / relative_seconds(base) - 1
+        else:
+            change = result["seconds"] / base["seconds"] - 1
+        mark: str = ""
+        if change > threshold:
+            mark = "  РЕГРЕССИЯ"
+            regressions.append(key)
+        print(
+            f"{key:<40} {base['seconds']:.4f} с -> {result['seconds']:.4f} с"
+            f"  ({change:+.1%}){mark}"
+        )
+    return regressions
+
+
+def run_benchmark(name: str, size: int, repeats: int, min_time: float) -> dict:
+    """Замер одного этапа вместе с эталонным циклом до и после него."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        func, items = BENCHMARKS[name](size, tmp_dir)
+        before, _ = measure(calibration, repeats, min_time)
+        seconds, peak = measure(func, repeats, min_time)
+        after, _ = measure(calibration, repeats, min_time)
+    return {
+        "name": name,
+        "size": size,
+        "seconds": seconds,
+        "items": items,
+        "items_per_second": items / seconds,
+        "peak_mib": peak,
+        "calibration_seconds": (before + after) / 2,
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    arg_parser.add_argument("--repeats", type=int, default=5)
+    arg_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="Минимальная длительность серии замеров, с",
+    )
+    arg_parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    arg_parser.add_argument("--output", help="Сохранить результаты в JSON")
+    arg_parser.add_argument("--compare", help="JSON с результатами прошлого запуска")
+    arg_parser.add_argument("--threshold", type=float, default=0.2)
+    arg_parser.add_argument(
+        "--confirm",
+        type=int,
+        default=2,
+        help="Сколько раз перемерить этапы с регрессией перед выходом с ошибкой",
+    )
+    args = arg_parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results: dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "repeats": args.repeats,
+            "min_time": args.min_time,
+        },
+        "results": {},
+    }
+    for name in args.benchmarks:
+        for size in args.sizes:
+            result: dict = run_benchmark(name, size, args.repeats, args.min_time)
+            key: str = f"{name}[{size}]"
+            results["results"][key] = result
+            print(
+                f"{key:<40} {result['seconds']:.4f} с"
+                f"  {result['items_per_second']:>12,.0f} эл./с"
+                f"  пик: {result['peak_mib']:.1f} МиБ"
+            )
+
+    regressions: list[str] = []
+    if args.compare:
+        baseline: dict = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for attempt in range(args.confirm):
+            if not regressions:
+                break
+            print(f"Повторный замер {attempt + 1}: {', '.join(regressions)}")
+            for key in regressions:
+                previous: dict = results["results"][key]
+                retry: dict = run_benchmark(
+                    previous["name"], previous["size"], args.repeats, args.min_time
+                )
+                if relative_seconds(retry) < relative_seconds(previous):
+                    results["results"][key] = retry
+            regressions = compare(
+                {"results": {key: results["results"][key] for key in regressions}},
+                baseline,
+                args.threshold,
+            )
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
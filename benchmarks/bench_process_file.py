@@ -0,0 +1,117 @@
+"""
+Бенчмарк DataProcessor.process_file на синтетических снимках.
+
+Сравнивает векторное вычисление с прежним построчным apply. Построчная
+версия запускается только для снимков не больше --legacy-max-rows.
+
+    python benchmarks/bench_process_file.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "app")]
+
+from data_processor import DataProcessor  # noqa: E402
+from synthetic import make_next_snapshot, make_snapshot  # noqa: E402
+
+COLUMNS: list[str] = [
+    "id",
+    "name_current",
+    "price_current",
+    "salePriceU_current",
+    "salePriceU_previous",
+    "link_current",
+]
+
+
+async def legacy_process_file(
+    current_df: pd.DataFrame,
+    previous_df: pd.DataFrame,
+    columns_to_include: list[str],
+    price_difference_percentage: float,
+) -> pd.DataFrame:
+    """Прежняя реализация с apply по строкам."""
+    merged_df = current_df.merge(
+        previous_df, on="id", suffixes=("_current", "_previous")
+    )
+    merged_df["percent_change"] = merged_df.apply(
+        lambda row: DataProcessor.calculate_percent_change(
+            row["salePriceU_current"], row["salePriceU_previous"]
+        ),
+        axis=1,
+    )
+    return merged_df[
+        (merged_df["percent_change"] != -100)
+        & (merged_df["percent_change"] < -price_difference_percentage)
+    ][columns_to_include]
+
+
+def run_process_file(
+    process_file, current_df: pd.DataFrame, previous_df: pd.DataFrame
+) -> pd.DataFrame:
+    return asyncio.run(process_file(current_df, previous_df, COLUMNS, 30))
+
+
+def best_of(repeats: int, func) -> float:
+    timings: list[float] = []
+    for _ in range(repeats):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    arg_parser.add_argument("--repeats", type=int, default=3)
+    arg_parser.add_argument("--legacy-max-rows", type=int, default=100_000)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_processor = DataProcessor(
+            f"{tmp_dir}/current", f"{tmp_dir}/previous", f"{tmp_dir}/changes"
+        )
+        for rows in args.sizes:
+            snapshot: pd.DataFrame = make_snapshot(rows)
+            current_df = DataProcessor.compact_price_columns(
+                make_next_snapshot(snapshot)
+            )
+            previous_df = DataProcessor.compact_price_columns(snapshot)
+
+            vectorized: float = best_of(
+                args.repeats,
+                partial(
+                    run_process_file,
+                    data_processor.process_file,
+                    current_df,
+                    previous_df,
+                ),
+            )
+            line: str = f"{rows:>9} строк  векторно: {vectorized:.3f} с"
+            if rows <= args.legacy_max_rows:
+                legacy: float = best_of(
+                    1,
+                    partial(
+                        run_process_file, legacy_process_file, current_df, previous_df
+                    ),
+                )
+                line += (
+                    f"  apply: {legacy:.3f} с  ускорение: x{legacy / vectorized:.1f}"
+                )
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Сравнение сессии на каждую страницу и общей сессии DataFetcher.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_session.py --categories 10 --pages 30
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from data_fetcher import DataFetcher  # noqa: E402
+from page_params import PageParams  # noqa: E402
+from stub_server import start_server  # noqa: E402
+
+
+def make_params(categories: int, pages: int) -> list[PageParams]:
+    return [
+        PageParams(
+            page=page,
+            shard=f"shard{category}",
+            query=f"cat={category}",
+            low_price=1,
+            top_price=1000000,
+            discount=0,
+        )
+        for category in range(categories)
+        for page in range(1, pages + 1)
+    ]
+
+
+async def session_per_page(base_url: str, params: list[PageParams]) -> float:
+    """Старое поведение: новая ClientSession на каждую страницу."""
+    builder = DataFetcher({}, {}, base_url=base_url)
+
+    async def fetch(page_params: PageParams) -> None:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(builder.build_url(page_params)) as response:
+                await response.json(content_type=None)
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(fetch(page_params) for page_params in params))
+    return time.perf_counter() - start
+
+
+async def shared_session(base_url: str, params: list[PageParams]) -> float:
+    """Новое поведение: одна сессия с пулом соединений на весь цикл."""
+    start: float = time.perf_counter()
+    async with DataFetcher({}, {}, base_url=base_url) as data_fetcher:
+        await asyncio.gather(*(data_fetcher.scrap_page(p) for p in params))
+    return time.perf_counter() - start
+
+
+async def run(categories: int, pages: int, repeats: int) -> None:
+    runner, base_url = await start_server()
+    params: list[PageParams] = make_params(categories, pages)
+    try:
+        for name, bench in (
+            ("session per page", session_per_page),
+            ("shared session", shared_session),
+        ):
+            timings: list[float] = [
+                await bench(base_url, params) for _ in range(repeats)
+            ]
+            best: float = min(timings)
+            print(
+                f"{name:<17} запросов: {len(params):>5}  "
+                f"лучшее: {best:.3f} с  ({len(params) / best:.0f} запросов/с)"
+            )
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--categories", type=int, default=10)
+    arg_parser.add_argument("--pages", type=int, default=30)
+    arg_parser.add_argument("--repeats", type=int, default=3)
+    args = arg_parser.parse_args()
+    asyncio.run(run(args.categories, args.pages, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Полный цикл сбора и сравнения против локальной заглушки WB и Telegram.
+
+Parser.run обходит категории из меню заглушки, затем
+compare_and_save_changes ищет снижения цен и отправляет уведомления в
+заглушку Telegram. Первый цикл заполняет снимки, в следующих часть цен
+меняется. Для каждого цикла печатаются запросы/с, товары/с, время цикла
+и задержка уведомлений от начала сравнения до получения в Telegram.
+
+    python benchmarks/replay_cycle.py --categories 10 --products 3000 \\
+        --latency 0.02 --throttle-rate 0.02 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "app")]
+
+from catalog_fetcher import CatalogFetcher  # noqa: E402
+from data_fetcher import DataFetcher  # noqa: E402
+from data_parser import Parser, ParserConfig  # noqa: E402
+from data_processor import DataProcessor  # noqa: E402
+from metrics import MetricsRegistry  # noqa: E402
+from notification import NotificationService  # noqa: E402
+from page_fingerprint import FingerprintStore  # noqa: E402
+from price_store import PriceStore  # noqa: E402
+from product_index import ProductIndex  # noqa: E402
+from rate_limiter import RequestBudget  # noqa: E402
+from retry import RetryPolicy  # noqa: E402
+from stub_server import StubConfig, StubState, start_server  # noqa: E402
+
+
+class ReplayDataProcessor(DataProcessor):
+    """Отправляет уведомления в заглушку Telegram с заданной частотой."""
+
+    api_url: str = ""
+    telegram_rate: float = 30
+
+    def create_notification_service(self, token, channel_ids):
+        return NotificationService(
+            token,
+            channel_ids,
+            global_rate=self.telegram_rate,
+            per_chat_rate=self.telegram_rate,
+            per_chat_burst=self.telegram_rate,
+            api_url=self.api_url,
+            metrics=self.metrics,
+        )
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered: list[float] = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+async def run_cycle(
+    parser: Parser,
+    data_processor: DataProcessor,
+    state: StubState,
+    metrics: MetricsRegistry,
+    urls: list[str],
+    args: argparse.Namespace,
+) -> None:
+    responses_before = state.responses.copy()
+    products_counter = metrics.counter("wb_products_total", "")
+    products_before: float = products_counter.total()
+    messages_before: int = len(state.messages)
+    category_semaphore = asyncio.Semaphore(args.concurrent_categories)
+
+    async def crawl(url: str) -> None:
+        async with category_semaphore:
+            await parser.run({}, url, 1, 31)
+
+    started: float = time.monotonic()
+    data_processor.start_cycle()
+    await asyncio.gather(*(crawl(url) for url in urls))
+    crawled: float = time.monotonic()
+    await data_processor.compare_and_save_changes(
+        "token", ["chat"], args.price_difference
+    )
+    finished: float = time.monotonic()
+
+    crawl_time: float = crawled - started
+    responses = state.responses - responses_before
+    requests: int = sum(responses.values())
+    products: float = products_counter.total() - products_before
+    latencies: list[float] = [
+        received_at - crawled for received_at, _, _ in state.messages[messages_before:]
+    ]
+    print(
+        f"поколение {state.generation}: цикл {finished - started:.2f} с "
+        f"(сбор {crawl_time:.2f} с, сравнение {finished - crawled:.2f} с)\n"
+        f"  запросов: {requests} ({requests / crawl_time:.0f}/с), "
+        f"ответы: {dict(responses)}\n"
+        f"  товаров: {products:.0f} ({products / crawl_time:.0f}/с)"
+    )
+    if latencies:
+        print(
+            f"  уведомлений: {len(latencies)}, задержка: "
+            f"медиана {statistics.median(latencies):.2f} с, "
+            f"p95 {percentile(latencies, 0.95):.2f} с, "
+            f"макс {max(latencies):.2f} с"
+        )
+    else:
+        print("  уведомлений нет")
+
+
+async def replay(args: argparse.Namespace) -> None:
+    stub_config = StubConfig(
+        products_per_category=args.products,
+        categories=args.categories,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        changed_share=args.changed_share,
+    )
+    runner, base_url = await start_server(config=stub_config)
+    state: StubState = runner.app["state"]
+    root_url: str = base_url.removesuffix("/catalog")
+    metrics = MetricsRegistry()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        price_store = (
+            PriceStore(f"{tmp_dir}/prices.db") if args.storage == "sqlite" else None
+        )
+        data_processor = ReplayDataProcessor(
+            f"{tmp_dir}/current",
+            f"{tmp_dir}/previous",
+            f"{tmp_dir}/changes",
+            snapshot_format=args.snapshot_format,
+            price_store=price_store,
+            product_index=ProductIndex(),
+            metrics=metrics,
+        )
+        data_processor.api_url = root_url
+        data_processor.telegram_rate = args.telegram_rate
+        catalog_fetcher = CatalogFetcher(f"{root_url}/menu.json", {})
+        CatalogFetcher.clear_cache()
+        parser = Parser(
+            catalog_fetcher.catalog_url,
+            {},
+            data_processor,
+            ParserConfig(1, 1000000, 0),
+            catalog_fetcher=catalog_fetcher,
+            fingerprint_store=None if args.no_fingerprints else FingerprintStore(),
+            metrics=metrics,
+        )
+        urls: list[str] = [
+            f"https://www.wildberries.ru{category['url']}"
+            for category in await catalog_fetcher.get_categories()
+        ]
+        try:
+            async with DataFetcher(
+                {},
+                {},
+                base_url=base_url,
+                request_budget=RequestBudget(args.concurrent_requests),
+                retry_policy=RetryPolicy(base_delay=0.05, max_delay=1),
+                metrics=metrics,
+            ) as data_fetcher:
+                parser.data_fetcher = data_fetcher
+                for generation in range(args.cycles):
+                    state.generation = generation
+                    await run_cycle(parser, data_processor, state, metrics, urls, args)
+        finally:
+            if price_store is not None:
+                price_store.close()
+            await runner.cleanup()
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    arg_parser.add_argument("--categories", type=int, default=10)
+    arg_parser.add_argument("--products", type=int, default=2000)
+    arg_parser.add_argument("--cycles", type=int, default=2)
+    arg_parser.add_argument("--latency", type=float, default=0.0)
+    arg_parser.add_argument("--throttle-rate", type=float, default=0.0)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--changed-share", type=float, default=0.02)
+    arg_parser.add_argument("--price-difference", type=float, default=30)
+    arg_parser.add_argument("--concurrent-categories", type=int, default=5)
+    arg_parser.add_argument("--concurrent-requests", type=int, default=30)
+    arg_parser.add_argument("--telegram-rate", type=float, default=30)
+    arg_parser.add_argument("--storage", choices=["sqlite", "files"], default="sqlite")
+    arg_parser.add_argument("--snapshot-format", default="csv")
+    arg_parser.add_argument(
+        "--no-fingerprints",
+        action="store_true",
+        help="записывать и сравнивать все категории, даже без изменений цен",
+    )
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Локальная заглушка catalog.wb.ru и api.telegram.org для бенчмарков.
+
+По умолчанию каждая страница любого шарда содержит PRODUCTS_PER_PAGE
+товаров. С StubConfig.products_per_category заглушка ведет себя как
+каталог: у категории фиксированный набор товаров, учитываются фильтр
+priceU и total, а generation меняет цены части товаров. Можно добавить
+задержку ответов, 429 и 5xx.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aiohttp import web
+
+PRODUCTS_PER_PAGE: int = 100
+
+
+@dataclass
+class StubConfig:
+    """
+    Настройки заглушки.
+
+    :param products_per_category: Товаров в категории. None — страницы без конца.
+    :param categories: Листовых категорий в меню /menu.json.
+    :param latency: Средняя задержка ответа каталога в секундах.
+    :param throttle_rate: Доля ответов 429.
+    :param error_rate: Доля ответов 503.
+    :param retry_after: Значение Retry-After для 429.
+    :param changed_share: Доля товаров, цена которых меняется с generation.
+    """
+
+    products_per_category: Optional[int] = None
+    categories: int = 10
+    latency: float = 0.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: float = 0.1
+    changed_share: float = 0.02
+    seed: int = 0
+
+
+@dataclass
+class StubState:
+    """Изменяемое состояние заглушки и собранная статистика."""
+
+    generation: int = 0
+    responses: Counter = field(default_factory=Counter)
+    messages: list[tuple[float, str, str]] = field(default_factory=list)
+    products: dict[tuple[str, str, int], list[dict]] = field(default_factory=dict)
+
+
+def make_product(product_id: int, rng: random.Random) -> dict:
+    price: int = rng.randint(100, 100000) * 100
+    return {
+        "id": product_id,
+        "name": f"Товар {product_id}",
+        "priceU": price,
+        "salePriceU": price * rng.randint(50, 100) // 100,
+        "sale": rng.randint(0, 90),
+        "brand": f"Бренд {product_id % 500}",
+        "rating": rng.randint(0, 5),
+        "supplier": f"Продавец {product_id % 2000}",
+        "supplierRating": round(rng.uniform(3, 5), 1),
+        "feedbacks": rng.randint(0, 10000),
+        "reviewRating": round(rng.uniform(3, 5), 1),
+        "promoTextCard": None,
+        "promoTextCat": None,
+    }
+
+
+def make_page(
+    shard: str, page: int, products_per_page: int = PRODUCTS_PER_PAGE
+) -> dict:
+    rng = random.Random(f"{shard}:{page}")
+    first_id: int = page * products_per_page
+    return {
+        "data": {
+            "products": [
+                make_product(first_id + offset, rng)
+                for offset in range(products_per_page)
+            ]
+        }
+    }
+
+
+def make_catalog(categories: int, branching: int = 10) -> list[dict]:
+    """
+    Дерево меню каталога с заданным числом листовых категорий. Листья
+    распределены по разделам и подразделам по branching штук.
+    """
+    leaves: list[dict] = [
+        {
+            "id": index,
+            "name": f"Категория {index}",
+            "url": f"/catalog/razdel-{index // branching**2}"
+            f"/podrazdel-{index // branching}/kategoriya-{index}",
+            "shard": f"shard{index % 97}",
+            "query": f"cat={index}",
+        }
+        for index in range(categories)
+    ]
+    groups: list[dict] = [
+        {"name": f"Подраздел {start}", "childs": leaves[start : start + branching]}
+        for start in range(0, len(leaves), branching)
+    ]
+    return [
+        {"name": f"Раздел {start}", "childs": groups[start : start + branching]}
+        for start in range(0, len(groups), branching)
+    ]
+
+
+def category_products(
+    config: StubConfig, shard: str, query: str, generation: int
+) -> list[dict]:
+    """Товары категории, отсортированные по цене, в заданном поколении."""
+    rng = random.Random(f"{config.seed}:{shard}:{query}")
+    first_id: int = rng.randint(1, 10**8)
+    products: list[dict] = [
+        make_product(first_id + offset, rng)
+        for offset in range(config.products_per_category or 0)
+    ]
+    for product in products:
+        change_rng = random.Random(f"{product['id']}:{generation}")
+        if generation and change_rng.random() < config.changed_share:
+            product["salePriceU"] = (
+                product["salePriceU"] * change_rng.randint(30, 90) // 100
+            )
+    return sorted(products, key=lambda product: product["salePriceU"])
+
+
+def filter_page(products: list[dict], price_filter: str, page: int) -> dict:
+    low, _, top = price_filter.partition(";")
+    low_price: int = int(low or 0)
+    top_price: int = int(top or 10**12)
+    matched: list[dict] = [
+        product
+        for product in products
+        if low_price <= product["salePriceU"] <= top_price
+    ]
+    offset: int = (page - 1) * PRODUCTS_PER_PAGE
+    return {
+        "data": {
+            "products": matched[offset : offset + PRODUCTS_PER_PAGE],
+            "total": len(matched),
+        }
+    }
+
+
+@web.middleware
+async def fault_injection(request: web.Request, handler) -> web.StreamResponse:
+    """Задержка, 429 и 5xx для запросов к каталогу."""
+    if not request.path.startswith("/catalog/"):
+        return await handler(request)
+    config: StubConfig = request.app["config"]
+    state: StubState = request.app["state"]
+    rng: random.Random = request.app["rng"]
+    if config.latency:
+        await asyncio.sleep(rng.uniform(config.latency * 0.5, config.latency * 1.5))
+    roll: float = rng.random()
+    if roll < config.throttle_rate:
+        response: web.StreamResponse = web.Response(
+            status=429, headers={"Retry-After": str(config.retry_after)}
+        )
+    elif roll < config.throttle_rate + config.error_rate:
+        response = web.Response(status=503)
+    else:
+        response = await handler(request)
+    state.responses[response.status] += 1
+    return response
+
+
+async def catalog_handler(request: web.Request) -> web.Response:
+    config: StubConfig = request.app["config"]
+    state: StubState = request.app["state"]
+    shard: str = request.match_info["shard"]
+    page: int = int(request.query.get("page", 1))
+    if config.products_per_category is None:
+        return web.json_response(make_page(shard, page))
+
+    key = (shard, request.query.get("cat", ""), state.generation)
+    if key not in state.products:
+        state.products[key] = category_products(config, *key)
+    return web.json_response(
+        filter_page(state.products[key], request.query.get("priceU", ""), page)
+    )
+
+
+async def menu_handler(request: web.Request) -> web.Response:
+    return web.json_response(make_catalog(request.app["config"].categories))
+
+
+async def telegram_handler(request: web.Request) -> web.Response:
+    data = await request.post()
+    request.app["state"].messages.append(
+        (time.monotonic(), str(data.get("chat_id")), str(data.get("text")))
+    )
+    return web.json_response({"ok": True})
+
+
+def create_app(config: Optional[StubConfig] = None) -> web.Application:
+    config = config or StubConfig()
+    app = web.Application(middlewares=[fault_injection])
+    app["config"] = config
+    app["state"] = StubState()
+    app["rng"] = random.Random(config.seed)
+    app.router.add_get("/catalog/{shard}/catalog", catalog_handler)
+    app.router.add_get("/menu.json", menu_handler)
+    app.router.add_post("/bot{token}/sendMessage", telegram_handler)
+    return app
+
+
+async def start_server(
+    host: str = "127.0.0.1", port: int = 0, config: Optional[StubConfig] = None
+) -> tuple[web.AppRunner, str]:
+    """Запускает заглушку и возвращает runner и базовый URL каталога."""
+    runner = web.AppRunner(create_app(config), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port: int = site._server.sockets[0].getsockname()[1]  # pylint: disable=W0212
+    return runner, f"http://{host}:{bound_port}/catalog"
@@ -0,0 +1,64 @@
+"""Генерация синтетических снимков категорий для бенчмарков."""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from stub_server import make_product
+
+
+def make_snapshot(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Снимок категории с колонками, как у DataProcessor.save_csv."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, rows + 1, dtype=np.int64) * 7
+    price = rng.integers(100, 100000, rows)
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "name": [f"Товар {product_id}" for product_id in ids],
+            "price": price,
+            "salePriceU": price * rng.integers(50, 100, rows) // 100,
+            "sale": rng.integers(0, 90, rows),
+            "brand": [f"Бренд {product_id % 500}" for product_id in ids],
+            "rating": rng.integers(0, 6, rows),
+            "supplier": [f"Продавец {product_id % 2000}" for product_id in ids],
+            "supplierRating": rng.uniform(3, 5, rows).round(1),
+            "feedbacks": rng.integers(0, 10000, rows),
+            "reviewRating": rng.uniform(3, 5, rows).round(1),
+            "promoTextCard": None,
+            "promoTextCat": None,
+            "link": [
+                f"https://www.wildberries.ru/catalog/{product_id}/detail.aspx?targetUrl=BP"
+                for product_id in ids
+            ],
+        }
+    )
+
+
+def make_next_snapshot(
+    previous: pd.DataFrame, changed_share: float = 0.05, seed: int = 1
+) -> pd.DataFrame:
+    """Следующий снимок: часть цен снижена, часть товаров заменена."""
+    rng = np.random.default_rng(seed)
+    current = previous.copy()
+    changed = rng.random(len(current)) < changed_share
+    current.loc[changed, "salePriceU"] = (
+        current.loc[changed, "salePriceU"] * rng.uniform(0.3, 1.2, changed.sum())
+    ).astype(np.int64)
+    zeroed = rng.random(len(current)) < 0.001
+    current.loc[zeroed, "salePriceU"] = 0
+    return current
+
+
+def make_payload(products: int, seed: int = 0, first_id: int = 1) -> dict:
+    """Ответ catalog.wb.ru с заданным числом товаров."""
+    rng = random.Random(seed)
+    return {
+        "data": {
+            "products": [
+                make_product(product_id, rng)
+                for product_id in range(first_id, first_id + products)
+            ]
+        }
+    }
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from app.alert_cache import AlertDedupCache
+from app.data_processor import DataProcessor
+
+
+def test_alert_cache_persists_and_expires(tmp_path):
+    path = tmp_path / "alerts.json"
+    cache = AlertDedupCache(str(path), ttl=60)
+    cache.add(1, 100)
+    cache.save()
+
+    restored = AlertDedupCache(str(path), ttl=60)
+    assert restored.seen(1, 100)
+    assert not restored.seen(1, 90)
+
+    restored.data[AlertDedupCache.make_key(1, 100)] -= 120
+    assert not restored.seen(1, 100)
+    restored.evict()
+    assert not restored.data
+
+
+def test_alert_cache_is_bounded():
+    cache = AlertDedupCache(max_size=2)
+    for product_id in range(3):
+        cache.add(product_id, 100)
+    assert not cache.seen(0, 100)
+    assert cache.seen(1, 100) and cache.seen(2, 100)
+
+    cache.add(1, 100)
+    cache.add(3, 100)
+    assert list(cache.data) == ["1:100", "3:100"]
+
+
+def test_drop_seen_alerts_skips_duplicates_across_categories(tmp_path):
+    processor = DataProcessor(
+        str(tmp_path / "c"),
+        str(tmp_path / "p"),
+        str(tmp_path / "ch"),
+        alert_cache=AlertDedupCache(),
+    )
+    first = pd.DataFrame({"id": [1, 2], "salePriceU": [100, 200]})
+    second = pd.DataFrame({"id": [1, 3], "salePriceU": [100, 300]})
+
+    assert processor.drop_seen_alerts(first)["id"].tolist() == [1, 2]
+    assert processor.drop_seen_alerts(second)["id"].tolist() == [3]
@@ -0,0 +1,91 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.catalog_fetcher import CatalogFetcher
+
+CATALOG = [
+    {
+        "name": "Женщинам",
+        "url": "/catalog/zhenshchinam",
+        "childs": [
+            {
+                "name": "Блузки",
+                "shard": "bl_shirts",
+                "url": "/catalog/zhenshchinam/odezhda/bluzki-i-rubashki",
+                "query": "cat=8126",
+            }
+        ],
+    }
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    CatalogFetcher.clear_cache()
+    yield
+    CatalogFetcher.clear_cache()
+
+
+@pytest_asyncio.fixture
+async def catalog_server():
+    """Сервер каталога, отвечающий 304 на запрос с актуальным ETag."""
+    state = {"requests": 0, "fail": False}
+
+    async def handler(request: web.Request) -> web.Response:
+        state["requests"] += 1
+        if state["fail"]:
+            return web.Response(status=500)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response(CATALOG, headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/menu.json", handler)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_cached_within_ttl(catalog_server):
+    server, state = catalog_server
+    fetcher = CatalogFetcher(str(server.make_url("/menu.json")), {}, cache_ttl=60)
+
+    first = await fetcher.get_categories()
+    second = await fetcher.get_categories()
+
+    assert state["requests"] == 1
+    assert first is second
+    assert first[0]["shard"] == "bl_shirts"
+
+
+@pytest.mark.asyncio
+async def test_stale_catalog_is_revalidated_and_persisted(catalog_server, tmp_path):
+    server, state = catalog_server
+    cache_path = tmp_path / "catalog.json"
+    url = str(server.make_url("/menu.json"))
+
+    await CatalogFetcher(url, {}, cache_ttl=0, cache_path=str(cache_path)).get_catalog()
+    assert cache_path.exists()
+
+    CatalogFetcher.clear_cache()
+    catalog = await CatalogFetcher(
+        url, {}, cache_ttl=0, cache_path=str(cache_path)
+    ).get_catalog()
+
+    assert state["requests"] == 2
+    assert catalog == CATALOG
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_last_good_copy(catalog_server):
+    server, state = catalog_server
+    fetcher = CatalogFetcher(str(server.make_url("/menu.json")), {}, cache_ttl=0)
+
+    await fetcher.get_catalog()
+    state["fail"] = True
+
+    assert await fetcher.get_catalog() == CATALOG
@@ -0,0 +1,77 @@
+import pytest
+
+from app.catalog_index import CatalogIndex, flatten_catalog
+
+CATALOG = [
+    {
+        "name": "Женщинам",
+        "url": "/catalog/zhenshchinam",
+        "childs": [
+            {
+                "name": "Блузки и рубашки",
+                "shard": "bl_shirts",
+                "url": "/catalog/zhenshchinam/odezhda/bluzki-i-rubashki",
+                "query": "cat=8126",
+            },
+            {
+                "name": "Брюки",
+                "shard": "pants",
+                "url": "/catalog/zhenshchinam/odezhda/bryuki-i-shorty",
+                "query": "cat=8127",
+            },
+        ],
+    },
+    {
+        "name": "Детям",
+        "url": "/catalog/detyam",
+        "childs": [
+            {
+                "name": "Игрушки",
+                "url": "/catalog/detyam/igrushki",
+                "childs": [
+                    {
+                        "name": "Конструкторы",
+                        "shard": "toys",
+                        "url": "/catalog/detyam/igrushki/konstruktory",
+                        "query": "subject=1",
+                    }
+                ],
+            }
+        ],
+    },
+]
+
+
+def test_flatten_catalog_keeps_leaf_order():
+    names = [category["name"] for category in flatten_catalog(CATALOG)]
+
+    assert names == ["Блузки и рубашки", "Брюки", "Конструкторы"]
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.wildberries.ru/catalog/zhenshchinam/odezhda/bluzki-i-rubashki",
+        "https://wildberries.ru/catalog/zhenshchinam/odezhda/bluzki-i-rubashki/",
+        "https://www.wildberries.ru/catalog/zhenshchinam/odezhda/bluzki-i-rubashki?sort=popular",
+        "www.wildberries.ru/catalog/zhenshchinam/odezhda/bluzki-i-rubashki",
+        "/catalog/zhenshchinam/odezhda/bluzki-i-rubashki",
+    ],
+)
+def test_find_by_url_normalizes_variants(url):
+    index = CatalogIndex.from_catalog(CATALOG)
+
+    assert index.find_by_url(url)["shard"] == "bl_shirts"
+
+
+def test_find_by_shard_query():
+    index = CatalogIndex.from_catalog(CATALOG)
+
+    assert index.find_by_shard_query("toys", "subject=1")["name"] == "Конструкторы"
+    assert index.find_by_shard_query("toys", "subject=2") is None
+
+
+def test_unknown_url_returns_none():
+    index = CatalogIndex.from_catalog(CATALOG)
+
+    assert index.find_by_url("https://www.wildberries.ru/catalog/unknown") is None
@@ -0,0 +1,147 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import app.__main__ as cli
+from app.metrics import MetricsRegistry
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_python(code: str, cwd: Path) -> subprocess.CompletedProcess:
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("token", "channel_id")
+    }
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT), str(ROOT / "app")])
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_cli_does_not_import_heavy_modules(tmp_path):
+    result = run_python(
+        "import sys, app.__main__ as cli; cli.build_parser(); "
+        "print(sorted({'pandas', 'aiohttp', 'requests'} & set(sys.modules)))",
+        tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_catalog_dump_does_not_import_requests(tmp_path):
+    result = run_python(
+        "import sys, catalog_fetcher; print('requests' in sys.modules)", tmp_path
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_app_modules_are_loaded_once(tmp_path):
+    result = run_python(
+        "import sys, app.__main__, main; "
+        "print(sorted(name for name in sys.modules if name.startswith('app.')))",
+        tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "['app.__main__']"
+
+
+def test_main_import_has_no_side_effects(tmp_path):
+    result = run_python("import main", tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert not os.listdir(tmp_path)
+
+
+def test_modules_do_not_load_dotenv_on_import(tmp_path):
+    result = run_python(
+        "import dotenv; dotenv.load_dotenv = lambda *args, **kwargs: print('load'); "
+        "import main, notification, data_processor",
+        tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "load" not in result.stdout
+
+
+def test_commands_without_telegram_settings_exit_with_error(monkeypatch, capsys):
+    monkeypatch.setattr("config.APIConfig.TOKEN", None)
+
+    with pytest.raises(SystemExit) as exc_info:
+        cli.run(["crawl"])
+
+    assert exc_info.value.code == 2
+    assert "token" in capsys.readouterr().err
+
+
+def test_catalog_dump_writes_matching_urls(monkeypatch, tmp_path):
+    async def get_categories(self):
+        return [
+            {"url": "/catalog/zhenshchinam/odezhda"},
+            {"url": "/catalog/muzhchinam/odezhda"},
+            {"url": "/catalog/detyam/igrushki"},
+        ]
+
+    monkeypatch.setattr("catalog_fetcher.CatalogFetcher.get_categories", get_categories)
+    output = tmp_path / "urls.txt"
+
+    assert cli.run(["catalog-dump", "--output", str(output)]) == 0
+    assert output.read_text(encoding="utf-8").splitlines() == [
+        "https://www.wildberries.ru/catalog/zhenshchinam/odezhda",
+        "https://www.wildberries.ru/catalog/detyam/igrushki",
+    ]
+
+
+def test_default_paths_do_not_depend_on_working_directory(tmp_path):
+    result = run_python(
+        "import main; print(len(main.load_target_urls()))",
+        tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert int(result.stdout) > 0
+
+
+class IdleNotificationService:
+    async def start(self):
+        pass
+
+    async def close(self, timeout=None):
+        pass
+
+
+@pytest.mark.parametrize("command", ["crawl", "diff"])
+def test_failed_cycle_exits_with_error(monkeypatch, command):
+    runtime = SimpleNamespace(
+        cycle_lock=asyncio.Lock(),
+        cycle_seconds=MetricsRegistry().histogram("cycle_seconds", ""),
+        data_processor=SimpleNamespace(start_cycle=lambda: None),
+        notification_service=IdleNotificationService(),
+        close=lambda: None,
+    )
+
+    async def fail(*args):
+        raise RuntimeError("сбой цикла")
+
+    monkeypatch.setattr("main.build_runtime", lambda: runtime)
+    monkeypatch.setattr("main.main", fail)
+    monkeypatch.setattr("main.compare_changes", fail)
+    handler = cli.command_crawl if command == "crawl" else cli.command_diff
+
+    assert handler(argparse.Namespace(urls=[])) == 1
@@ -0,0 +1,213 @@
+import os
+
+import pytest
+
+from app.catalog_index import CatalogIndex
+from app.data_fetcher import FetchError
+from app.data_parser import Parser, ParserConfig
+from app.data_processor import DataProcessor
+from app.page_fingerprint import FingerprintStore
+from app.pagination import PageDepthStore
+
+CATEGORY = {"name": "Блузки", "shard": "bl_shirts", "query": "cat=8126"}
+URL = "https://www.wildberries.ru/catalog/zhenshchinam/odezhda/bluzki-i-rubashki"
+
+
+class FakeDataFetcher:
+    """Отдает товары с ценами от 1 до count рублей с учетом фильтра priceU."""
+
+    def __init__(self, count: int, page_size: int, with_total: bool = True):
+        self.prices = range(1, count + 1)
+        self.page_size = page_size
+        self.with_total = with_total
+        self.failed_pages: set[int] = set()
+        self.requested: list[tuple[int, int, int]] = []
+
+    async def scrap_page(self, page_params) -> dict:
+        self.requested.append(
+            (page_params.low_price, page_params.top_price, page_params.page)
+        )
+        if page_params.page in self.failed_pages:
+            raise FetchError("попытки исчерпаны (3)")
+        prices = [
+            price
+            for price in self.prices
+            if page_params.low_price <= price <= page_params.top_price
+        ]
+        offset = (page_params.page - 1) * self.page_size
+        data = {
+            "products": [
+                {"id": price, "priceU": price * 100, "salePriceU": price * 100}
+                for price in prices[offset : offset + self.page_size]
+            ]
+        }
+        if self.with_total:
+            data["total"] = len(prices)
+        return {"data": data}
+
+    @property
+    def pages(self) -> list[int]:
+        return sorted(page for _, _, page in self.requested)
+
+
+class FakeCatalogFetcher:
+    async def get_index(self) -> CatalogIndex:
+        return CatalogIndex(
+            [{**CATEGORY, "url": "/catalog/zhenshchinam/odezhda/bluzki-i-rubashki"}]
+        )
+
+
+@pytest.fixture
+def parser(tmp_path):
+    data_processor = DataProcessor(
+        tmp_path / "current", tmp_path / "previous", tmp_path / "changes"
+    )
+    return Parser(
+        "",
+        {},
+        data_processor,
+        ParserConfig(),
+        page_depth_store=PageDepthStore(),
+        page_size=2,
+        probe_window=3,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pages_are_planned_from_total(parser):
+    fetcher = FakeDataFetcher(count=6, page_size=2)
+
+    data = await parser.fetch_category(fetcher, CATEGORY, 1, 31)
+
+    assert fetcher.pages == [1, 2, 3]
+    assert len(data) == 6
+
+
+@pytest.mark.asyncio
+async def test_pages_are_probed_in_windows_without_total(parser):
+    fetcher = FakeDataFetcher(count=10, page_size=2, with_total=False)
+
+    data = await parser.fetch_category(fetcher, CATEGORY, 1, 31)
+
+    assert fetcher.pages == [1, 2, 3, 4, 5, 6, 7]
+    assert len(data) == 10
+
+
+@pytest.mark.asyncio
+async def test_known_depth_is_reused_next_cycle(parser):
+    await parser.fetch_category(FakeDataFetcher(6, 2), CATEGORY, 1, 31)
+    fetcher = FakeDataFetcher(count=6, page_size=2, with_total=False)
+
+    await parser.fetch_category(fetcher, CATEGORY, 1, 31)
+
+    assert fetcher.pages == [1, 2, 3, 4]
+    assert parser.page_depth_store.get(parser.band_key(CATEGORY)) == 3
+
+
+@pytest.mark.asyncio
+async def test_category_grown_past_known_depth_is_probed_further(parser):
+    await parser.fetch_category(FakeDataFetcher(6, 2), CATEGORY, 1, 31)
+    fetcher = FakeDataFetcher(count=10, page_size=2, with_total=False)
+
+    data = await parser.fetch_category(fetcher, CATEGORY, 1, 31)
+
+    assert len(data) == 10
+    assert fetcher.pages == [1, 2, 3, 4, 5, 6, 7]
+    assert parser.page_depth_store.get(parser.band_key(CATEGORY)) == 5
+
+
+@pytest.mark.asyncio
+async def test_overflowing_band_is_split_until_it_fits(parser):
+    fetcher = FakeDataFetcher(count=200, page_size=2)
+
+    data = await parser.fetch_category(fetcher, CATEGORY, 1, 11)
+
+    assert sorted(data["id"]) == list(range(1, 201))
+    assert max(fetcher.pages) <= 10
+    bands = parser.price_band_store.get(parser.band_key(CATEGORY))
+    assert len(bands) > 1
+    assert bands[0][0] == 1 and bands[-1][1] == 1000000
+
+
+@pytest.mark.asyncio
+async def test_learned_bands_are_reused_next_cycle(parser):
+    await parser.fetch_category(FakeDataFetcher(200, 2), CATEGORY, 1, 11)
+    bands = parser.price_band_store.get(parser.band_key(CATEGORY))
+    fetcher = FakeDataFetcher(count=200, page_size=2)
+
+    data = await parser.fetch_category(fetcher, CATEGORY, 1, 11)
+
+    assert len(data) == 200
+    assert {(low, top) for low, top, _ in fetcher.requested} == set(bands)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_category_is_not_saved_again(tmp_path):
+    data_processor = DataProcessor(
+        tmp_path / "current", tmp_path / "previous", tmp_path / "changes"
+    )
+    parser = Parser(
+        "",
+        {},
+        data_processor,
+        ParserConfig(),
+        page_depth_store=PageDepthStore(),
+        page_size=2,
+        fingerprint_store=FingerprintStore(),
+    )
+    page_cache = parser.metrics.counter("wb_page_cache_total", "")
+
+    data = await parser.fetch_category(FakeDataFetcher(6, 2), CATEGORY, 1, 31)
+    assert parser.save_category(data, CATEGORY, "")
+    data_processor.start_cycle()
+
+    data = await parser.fetch_category(FakeDataFetcher(6, 2), CATEGORY, 1, 31)
+    assert len(data) == 6
+    assert page_cache.value(result="hit") == 3
+    assert not parser.save_category(data, CATEGORY, "")
+    assert not os.listdir(data_processor.current_dir)
+
+    fetcher = FakeDataFetcher(6, 2)
+    fetcher.prices = range(1, 6)
+    data = await parser.fetch_category(fetcher, CATEGORY, 1, 31)
+    assert sorted(data["id"]) == [1, 2, 3, 4, 5]
+    assert page_cache.value(result="miss") == 4
+    assert parser.save_category(data, CATEGORY, "")
+
+
+@pytest.mark.asyncio
+async def test_band_that_cannot_be_split_warns_about_lost_products(parser, caplog):
+    fetcher = FakeDataFetcher(count=0, page_size=2)
+    fetcher.prices = [5] * 30
+
+    data = await parser.fetch_category(fetcher, CATEGORY, 1, 11)
+
+    assert len(data) == 1
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+    assert warnings
+    assert all("не собрано товаров: 10" in message for message in warnings)
+
+
+@pytest.mark.asyncio
+async def test_failed_page_does_not_update_category_state(parser, monkeypatch):
+    parser.catalog_fetcher = FakeCatalogFetcher()
+    parser.data_fetcher = FakeDataFetcher(count=6, page_size=2)
+    await parser.run({}, URL)
+    assert URL in parser.crawl_results
+    bands = parser.price_band_store.get(parser.band_key(CATEGORY))
+    saved = []
+    monkeypatch.setattr(
+        parser.data_processor, "save_snapshot", lambda *args: saved.append(args)
+    )
+
+    fetcher = FakeDataFetcher(count=6, page_size=2, with_total=False)
+    fetcher.failed_pages = {3}
+    parser.data_fetcher = fetcher
+    parser.crawl_results.clear()
+    await parser.run({}, URL)
+
+    assert 3 in fetcher.pages
+    assert not saved
+    assert URL not in parser.crawl_results
+    assert parser.page_depth_store.get(parser.band_key(CATEGORY)) == 3
+    assert parser.price_band_store.get(parser.band_key(CATEGORY)) == bands
@@ -1,7 +1,10 @@
+import os
+
 import pytest
 import pandas as pd
-from app.data_processor import DataProcessor
+from app.data_processor import DataProcessor, create_diff_executor
 from app.config import DataDirectories
+from app.product_index import ProductIndex
 
 
 @pytest.fixture
@@ -116,3 +119,151 @@ async def test_included_columns_only(
     )
 
     assert list(result_df.columns) == columns_to_include
+
+
+def test_vectorized_percent_change_matches_scalar():
+    current = pd.Series([100, 0, 50, 0, 120])
+    previous = pd.Series([110, 0, 0, 300, 100])
+
+    result = DataProcessor.calculate_percent_changes(current, previous)
+
+    expected = [
+        DataProcessor.calculate_percent_change(cur, prev)
+        for cur, prev in zip(current, previous)
+    ]
+    assert list(result) == expected
+
+
+def test_compact_price_columns_downcasts_integers():
+    df = pd.DataFrame({"price": [100, 200], "salePriceU": [90, 150], "id": [1, 2]})
+
+    DataProcessor.compact_price_columns(df)
+
+    assert df["price"].dtype.itemsize < 8
+    assert df["salePriceU"].dtype.itemsize < 8
+    assert df["id"].dtype.itemsize == 8
+
+
+class RecordingNotificationService:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, text, alert_key=None):
+        self.messages.append(text)
+
+
+def make_snapshot_df(prices):
+    return pd.DataFrame(
+        {
+            "id": list(prices),
+            "name": [f"Товар {product_id}" for product_id in prices],
+            "price": [price * 2 for price in prices.values()],
+            "salePriceU": list(prices.values()),
+            "sale": [50] * len(prices),
+            "brand": ["Бренд"] * len(prices),
+            "rating": [5] * len(prices),
+            "supplier": ["Продавец"] * len(prices),
+            "supplierRating": [4.5] * len(prices),
+            "feedbacks": [10] * len(prices),
+            "reviewRating": [4.8] * len(prices),
+            "promoTextCard": [None] * len(prices),
+            "promoTextCat": [None] * len(prices),
+        }
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("diff_workers", [1, 2])
+async def test_compare_files_diffs_every_category(tmp_path, diff_workers):
+    processor = DataProcessor(
+        str(tmp_path / "current"),
+        str(tmp_path / "previous"),
+        str(tmp_path / "changes"),
+        diff_workers=diff_workers,
+    )
+    for name in ("Блузки", "Платья"):
+        processor.save_snapshot(make_snapshot_df({1: 100, 2: 200}), name)
+    processor.move_data_to_previous()
+    processor.save_snapshot(make_snapshot_df({1: 50, 2: 200}), "Блузки")
+    processor.save_snapshot(make_snapshot_df({1: 100, 2: 90}), "Платья")
+
+    service = RecordingNotificationService()
+    await processor.compare_files(service, 30)
+
+    assert len(service.messages) == 2
+    assert sorted(os.listdir(tmp_path / "changes")) == [
+        "changes_Блузки.csv",
+        "changes_Платья.csv",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_shared_diff_executor_is_reused_between_cycles(tmp_path):
+    executor = create_diff_executor(2)
+    processor = DataProcessor(
+        str(tmp_path / "current"),
+        str(tmp_path / "previous"),
+        str(tmp_path / "changes"),
+        diff_workers=2,
+        diff_executor=executor,
+    )
+    try:
+        for price in (50, 25):
+            processor.start_cycle()
+            for name in ("Блузки", "Платья"):
+                processor.save_snapshot(make_snapshot_df({1: price * 2}), name)
+            processor.move_data_to_previous()
+            for name in ("Блузки", "Платья"):
+                processor.save_snapshot(make_snapshot_df({1: price}), name)
+
+            service = RecordingNotificationService()
+            await processor.compare_files(service, 30)
+
+            assert len(service.messages) == 2
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shared_product_is_diffed_once(tmp_path):
+    processor = DataProcessor(
+        str(tmp_path / "current"),
+        str(tmp_path / "previous"),
+        str(tmp_path / "changes"),
+        diff_workers=1,
+        product_index=ProductIndex(),
+    )
+    processor.save_snapshot(make_snapshot_df({1: 100, 2: 200}), "Платья")
+    processor.save_snapshot(make_snapshot_df({2: 200, 3: 300}), "Женщинам")
+    processor.move_data_to_previous()
+    processor.save_snapshot(make_snapshot_df({1: 100, 2: 100}), "Платья")
+    processor.save_snapshot(make_snapshot_df({2: 100, 3: 300}), "Женщинам")
+
+    service = RecordingNotificationService()
+    await processor.compare_files(service, 30)
+
+    assert len(service.messages) == 1
+    changes = pd.read_csv(tmp_path / "changes" / "changes_Платья.csv")
+    assert list(changes["id"]) == [2]
+    assert list(changes["categories"]) == ["Платья, Женщинам"]
+    assert os.listdir(tmp_path / "changes") == ["changes_Платья.csv"]
+
+
+@pytest.mark.asyncio
+async def test_shared_notification_service_is_left_open(tmp_path):
+    processor = DataProcessor(
+        str(tmp_path / "current"),
+        str(tmp_path / "previous"),
+        str(tmp_path / "changes"),
+        diff_workers=1,
+    )
+    processor.save_snapshot(make_snapshot_df({1: 100}), "Блузки")
+    processor.move_data_to_previous()
+    processor.save_snapshot(make_snapshot_df({1: 50}), "Блузки")
+
+    service = RecordingNotificationService()
+    await processor.compare_and_save_changes(
+        "token", ["chat"], 30, notification_service=service
+    )
+
+    assert len(service.messages) == 1
@@ -1,7 +1,16 @@
+import json
 import logging
+import threading
+
 import pytest
 
-from app.logging_config import LogConfig, LoggerSetup, LogLevel
+from app.logging_config import (
+    JsonFormatter,
+    LogConfig,
+    LoggerSetup,
+    LogLevel,
+    RateLimitFilter,
+)
 
 
 @pytest.fixture
@@ -56,3 +65,68 @@ def test_logging_message(logger_setup, caplog):
     assert (
         "This is a test error message." in caplog.text
     )  # Проверка сообщения об ошибке
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    return logging.makeLogRecord(
+        {
+            "name": "data_fetcher",
+            "msg": msg,
+            "args": args,
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            **extra,
+        }
+    )
+
+
+def test_json_formatter_outputs_one_object_per_record():
+    """Проверяет структуру записи в формате JSON."""
+    record = make_record("Страница %d", 3, shard="bl_shirts")
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["message"] == "Страница 3"
+    assert data["level"] == "INFO"
+    assert data["logger"] == "data_fetcher"
+    assert data["shard"] == "bl_shirts"
+
+
+def test_rate_limit_filter_limits_each_template(monkeypatch):
+    """Проверяет лимит одинаковых сообщений и счетчик пропущенных."""
+    now = [0.0]
+    monkeypatch.setattr("app.logging_config.time.monotonic", lambda: now[0])
+    rate_filter = RateLimitFilter(rate=1, burst=2)
+
+    passed = [rate_filter.filter(make_record("Страница %d", page)) for page in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert rate_filter.filter(make_record("Другое сообщение"))
+    assert rate_filter.filter(make_record("Страница %d", 6, level=logging.WARNING))
+
+    now[0] = 1.0
+    record = make_record("Страница %d", 7)
+    assert rate_filter.filter(record)
+    assert record.suppressed == 3
+    assert rate_filter.filter(record)
+
+
+def test_queue_mode_writes_in_background_thread(tmp_path):
+    """Проверяет, что в режиме очереди запись выполняет фоновый поток."""
+    log_file = tmp_path / "app.log"
+    setup = LoggerSetup(
+        "queue_test",
+        LogConfig(filename=str(log_file), use_queue=True, json_format=True),
+    )
+    threads = []
+    file_handler = setup.listener.handlers[0]
+    emit = file_handler.emit
+    file_handler.emit = lambda record: (
+        threads.append(threading.current_thread()),
+        emit(record),
+    )
+
+    setup.queue_handler.handle(make_record("Страница %d", 1))
+    setup.stop()
+
+    assert threads and threads[0] is not threading.current_thread()
+    assert json.loads(log_file.read_text(encoding="utf-8"))["message"] == "Страница 1"
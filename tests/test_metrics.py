@@ -0,0 +1,56 @@
+import json
+
+import aiohttp
+import pytest
+
+from app.metrics import MetricsRegistry, start_metrics_server
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Запросы", ("shard", "status"))
+    latency = registry.histogram("latency_seconds", "Задержка", buckets=(0.1, 1))
+    requests.inc(shard="bl_shirts", status=200)
+    requests.inc(2, shard="bl_shirts", status=200)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render_prometheus()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{shard="bl_shirts",status="200"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert registry.counter("requests_total", "Запросы") is requests
+
+
+def test_json_dump(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("notifications_total", "Уведомления", ("status",)).inc(
+        status="sent"
+    )
+    path = tmp_path / "metrics.json"
+    registry.dump_json(str(path))
+
+    dumped = json.loads(path.read_text(encoding="utf-8"))
+    samples = dumped["metrics"]["notifications_total"]["samples"]
+    assert samples == [{"labels": {"status": "sent"}, "value": 1}]
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(unused_tcp_port):
+    registry = MetricsRegistry()
+    registry.counter("cycles_total", "Циклы").inc()
+    runner = await start_metrics_server(registry, "127.0.0.1", unused_tcp_port)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                f"http://127.0.0.1:{unused_tcp_port}/metrics"
+            ) as response:
+                assert response.status == 200
+                assert "cycles_total 1" in await response.text()
+    finally:
+        await runner.cleanup()
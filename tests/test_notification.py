@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.alert_cache import AlertDedupCache
+from app.notification import NotificationService
+
+
+@pytest_asyncio.fixture
+async def telegram_server():
+    """Заглушка Telegram: первый запрос получает 429 с retry_after."""
+    state = {"received": [], "throttled": False, "paused": False}
+
+    async def send_message(request: web.Request) -> web.Response:
+        while state["paused"]:
+            await asyncio.sleep(0.01)
+        data = await request.post()
+        if not state["throttled"]:
+            state["throttled"] = True
+            return web.json_response(
+                {"ok": False, "parameters": {"retry_after": 0.05}}, status=429
+            )
+        state["received"].append((data["chat_id"], data["text"]))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/bottoken/sendMessage", send_message)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, state
+    await server.close()
+
+
+def make_service(server, **kwargs) -> NotificationService:
+    return NotificationService(
+        "token",
+        ["chat1", "chat2"],
+        api_url=str(server.make_url("")).rstrip("/"),
+        global_rate=1000,
+        per_chat_rate=1000,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_messages_are_delivered_in_order_after_retry_after(telegram_server):
+    server, state = telegram_server
+
+    async with make_service(server) as service:
+        for number in range(3):
+            await service.send_message(f"msg{number}")
+
+    assert service.sent == 6
+    assert service.failed == 0
+    assert [text for chat, text in state["received"] if chat == "chat1"] == [
+        "msg0",
+        "msg1",
+        "msg2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pending_messages_survive_restart(telegram_server, tmp_path):
+    server, state = telegram_server
+    queue_path = str(tmp_path / "queue.jsonl")
+    state["paused"] = True
+
+    service = make_service(server, queue_path=queue_path)
+    await service.start()
+    await service.send_message("msg")
+    await service.close(timeout=0.05)
+    state["paused"] = False
+
+    async with make_service(server, queue_path=queue_path) as restarted:
+        pass
+
+    assert restarted.sent == 2
+
+
+@pytest.mark.asyncio
+async def test_undelivered_alert_is_released_from_cache(tmp_path):
+    async def send_message(request: web.Request) -> web.Response:
+        data = await request.post()
+        if data["text"] == "lost":
+            return web.json_response({"ok": False, "description": "bad"}, status=400)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/bottoken/sendMessage", send_message)
+    cache_path = str(tmp_path / "alerts.json")
+    alert_cache = AlertDedupCache(cache_path)
+    alert_cache.add(1, 100)
+    alert_cache.add(2, 200)
+    alert_cache.save()
+    async with TestServer(app) as server:
+        async with make_service(server, alert_cache=alert_cache) as service:
+            await service.send_message("lost", AlertDedupCache.make_key(1, 100))
+            await service.send_message("sent", AlertDedupCache.make_key(2, 200))
+
+    assert service.failed == 2
+    restored = AlertDedupCache(cache_path)
+    assert not restored.seen(1, 100)
+    assert restored.seen(2, 200)
+
+
+@pytest.mark.asyncio
+async def test_throttled_message_stops_after_max_attempts():
+    requests = []
+
+    async def send_message(request: web.Request) -> web.Response:
+        data = await request.post()
+        requests.append(data["text"])
+        if data["text"] == "bad":
+            return web.json_response(["not", "a", "dict"], status=400)
+        return web.json_response({"parameters": {"retry_after": 0}}, status=429)
+
+    app = web.Application()
+    app.router.add_post("/bottoken/sendMessage", send_message)
+    async with TestServer(app) as server:
+        service = NotificationService(
+            "token",
+            ["chat1"],
+            api_url=str(server.make_url("")).rstrip("/"),
+            global_rate=1000,
+            per_chat_rate=1000,
+            max_attempts=3,
+        )
+        await service.start()
+        await service.start()
+        await service.send_message("msg")
+        await service.send_message("bad")
+        await asyncio.wait_for(service.close(), timeout=10)
+
+    assert requests == ["msg", "msg", "msg", "bad"]
+    assert service.failed == 2
+
+
+@pytest.mark.asyncio
+async def test_second_start_does_not_restore_journal_again(telegram_server, tmp_path):
+    server, state = telegram_server
+    queue_path = str(tmp_path / "queue.jsonl")
+    state["paused"] = True
+    service = make_service(server, queue_path=queue_path)
+    await service.start()
+    await service.send_message("msg")
+    await service.close(timeout=0.05)
+    state["paused"] = False
+
+    restarted = make_service(server, queue_path=queue_path)
+    await restarted.start()
+    await restarted.start()
+    await restarted.close()
+
+    assert restarted.sent == 2
+    assert len(state["received"]) == 2
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from app.price_store import PriceStore
+
+
+def make_snapshot(prices: dict[int, int]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": list(prices),
+            "name": [f"Товар {product_id}" for product_id in prices],
+            "price": [price * 2 for price in prices.values()],
+            "salePriceU": list(prices.values()),
+            "sale": [50] * len(prices),
+            "brand": ["Бренд"] * len(prices),
+        }
+    )
+
+
+@pytest.fixture
+def price_store(tmp_path):
+    store = PriceStore(str(tmp_path / "prices.db"), batch_size=2)
+    yield store
+    store.close()
+
+
+def test_price_drops_are_found_for_current_cycle_only(price_store):
+    price_store.start_cycle()
+    price_store.record("Блузки", make_snapshot({1: 100, 2: 200, 3: 300, 4: 400}))
+
+    assert price_store.find_price_drops(30).empty
+
+    price_store.start_cycle()
+    price_store.record("Блузки", make_snapshot({1: 50, 2: 190, 3: 0, 4: 400, 5: 10}))
+    drops = price_store.find_price_drops(30)
+
+    assert drops["id"].tolist() == [1]
+    assert drops.loc[0, "salePriceU"] == 50
+    assert drops.loc[0, "salePriceU_previous"] == 100
+    assert drops.loc[0, "category"] == "Блузки"
+
+    price_store.start_cycle()
+    price_store.record("Блузки", make_snapshot({1: 50}))
+
+    assert price_store.find_price_drops(30).empty
+
+
+def test_history_keeps_only_price_changes(price_store):
+    for price in (100, 100, 80, 80, 60):
+        price_store.start_cycle()
+        price_store.record("Блузки", make_snapshot({1: price}))
+
+    history = price_store.history(1)
+
+    assert history["sale_price"].tolist() == [100, 80, 60]
+
+
+def test_cycle_is_restored_after_reopen(tmp_path):
+    path = str(tmp_path / "prices.db")
+    store = PriceStore(path)
+    cycle = store.start_cycle()
+    store.close()
+
+    reopened = PriceStore(path)
+
+    assert reopened.current_cycle == cycle
+    reopened.close()
+
+
+def test_change_stats_per_category(price_store):
+    price_store.start_cycle()
+    price_store.record("Блузки", make_snapshot({1: 100, 2: 200}))
+    price_store.record("Платья", make_snapshot({3: 300}))
+
+    price_store.start_cycle()
+    price_store.record("Блузки", make_snapshot({1: 50, 2: 200}))
+    stats = price_store.change_stats()
+
+    assert stats["category"].tolist() == ["Блузки"]
+    assert stats.loc[0, "compared"] == 2
+    assert stats.loc[0, "changed"] == 1
+    assert stats.loc[0, "mean_change"] == 50
@@ -0,0 +1,69 @@
+import pandas as pd
+
+from app.data_processor import DataProcessor
+from app.product_columns import (
+    ProductColumns,
+    ProductRecord,
+    records_from_frame,
+    records_from_json,
+    records_to_frame,
+    with_links,
+)
+
+PAGE = {
+    "data": {
+        "products": [
+            {
+                "id": 139813034,
+                "name": "Резинки для волос",
+                "priceU": 37900,
+                "salePriceU": 24900,
+                "brand": "Вишенки",
+                "feedbacks": 420,
+            },
+            {"id": 2, "name": "Без цены"},
+        ]
+    }
+}
+
+
+def test_columns_match_dict_extraction():
+    product_columns = ProductColumns()
+
+    assert product_columns.extend_from_json(PAGE) == 2
+    assert product_columns.extend_from_json({}) == 0
+
+    expected = pd.DataFrame(DataProcessor.get_data_from_json(PAGE))
+    result = with_links(product_columns.to_frame())
+
+    pd.testing.assert_frame_equal(result[expected.columns], expected)
+
+
+def test_records_round_trip_through_frame():
+    records = records_from_json(PAGE)
+
+    frame = records_to_frame(records)
+    assert list(frame.columns) == list(ProductRecord._fields)
+    assert records_from_frame(with_links(frame)) == records
+
+    assert records[0].salePriceU == 249
+    assert records[1].price == 0 and records[1].brand is None
+    assert records[0].link == with_links(frame)["link"][0]
+
+
+def test_brand_and_supplier_strings_are_shared():
+    page = {
+        "data": {
+            "products": [
+                {"id": product_id, "brand": "".join(["Виш", "енки"])}
+                for product_id in (1, 2)
+            ]
+        }
+    }
+    first, second = records_from_json(page)
+    assert first.brand is second.brand
+
+    product_columns = ProductColumns()
+    product_columns.extend_from_json(page)
+    brands = product_columns._objects["brand"]  # pylint: disable=W0212
+    assert brands[0] is brands[1]
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from app.product_index import ProductIndex
+
+
+def frame(ids):
+    return pd.DataFrame({"id": ids, "salePriceU": [100] * len(ids)})
+
+
+def test_shared_products_are_kept_in_first_category_only():
+    index = ProductIndex()
+
+    assert list(index.claim("Платья", frame([1, 2, 3]))["id"]) == [1, 2, 3]
+    assert list(index.claim("Женщинам", frame([3, 4, 2]))["id"]) == [4]
+    assert len(index) == 4
+
+    categories = index.categories(pd.Series([2, 4, 5]))
+    assert list(categories) == ["Платья, Женщинам", "Женщинам", ""]
+
+
+def test_ownership_is_kept_between_cycles():
+    index = ProductIndex()
+    index.claim("Платья", frame([1, 2]))
+    index.claim("Женщинам", frame([1, 2, 3]))
+
+    assert list(index.claim("Женщинам", frame([1, 2, 3]))["id"]) == [3]
+    assert list(index.claim("Платья", frame([1, 2]))["id"]) == [1, 2]
+
+
+def test_product_removed_from_category_is_released():
+    index = ProductIndex()
+    index.claim("Платья", frame([1, 2]))
+    index.claim("Платья", frame([1]))
+
+    assert list(index.claim("Женщинам", frame([1, 2]))["id"]) == [2]
+    assert list(index.categories(pd.Series([2]))) == ["Женщинам"]
+
+
+def test_ownership_survives_restart(tmp_path):
+    path = str(tmp_path / "product_index.json")
+    index = ProductIndex(path)
+    index.claim("Платья", frame([1, 2]))
+    index.claim("Женщинам", frame([2, 3]))
+    index.save()
+
+    restarted = ProductIndex(path)
+    assert list(restarted.claim("Женщинам", frame([2, 3]))["id"]) == [3]
+    assert list(restarted.claim("Платья", frame([1, 2]))["id"]) == [1, 2]
+    assert list(restarted.categories(pd.Series([2]))) == ["Платья, Женщинам"]
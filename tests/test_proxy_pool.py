@@ -0,0 +1,46 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from app.proxy_pool import ProxyLease, ProxyPool
+
+
+@pytest.mark.asyncio
+async def test_proxy_pool_spreads_load_and_caps_concurrency():
+    pool = ProxyPool(["http://a", "http://b"], max_concurrent_per_proxy=1)
+    first = await pool.acquire()
+    second = await pool.acquire()
+    assert {first.url, second.url} == {"http://a", "http://b"}
+
+    third = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+    assert not third.done()
+
+    pool.release(first)
+    assert (await asyncio.wait_for(third, 1)).url == first.url
+
+
+@pytest.mark.asyncio
+async def test_proxy_pool_quarantines_failing_proxy():
+    pool = ProxyPool(["http://bad", "http://good"], failure_threshold=2)
+    bad = pool.proxies[0]
+    for _ in range(2):
+        bad.in_flight += 1
+        pool.release(ProxyLease(bad), failed=True)
+    assert bad.quarantined_until
+
+    with pytest.raises(aiohttp.ClientError):
+        async with pool.lease() as proxy:
+            assert proxy.url == "http://good"
+            raise aiohttp.ClientError()
+    assert pool.proxies[1].error_rate > 0
+
+    leases = [await pool.acquire() for _ in range(3)]
+    assert {lease.url for lease in leases} == {"http://good"}
+
+
+def test_proxy_pool_without_proxies_uses_direct_connection():
+    pool = ProxyPool([])
+    assert len(pool) == 1
+    assert pool.proxies[0].url is None
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from app.rate_limiter import RequestBudget, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """Проверяет, что после исчерпания всплеска запросы идут с заданной частотой."""
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= 5 / 50 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_pause_delays_every_consumer():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.1)
+    start = time.monotonic()
+    await asyncio.gather(bucket.acquire(), bucket.acquire())
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= 0.1 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_request_budget_limits_concurrency():
+    """Проверяет, что одновременно выполняется не больше max_concurrent запросов."""
+    budget = RequestBudget(max_concurrent=3)
+    in_flight = 0
+    peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        async with budget:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(request() for _ in range(10)))
+
+    assert peak == 3
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
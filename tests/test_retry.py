@@ -0,0 +1,134 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.data_fetcher import DataFetcher, FetchError
+from app.page_params import PageParams
+from app.retry import CircuitBreaker, CircuitBreakers, RetryPolicy, parse_retry_after
+
+
+def test_retry_policy_backoff_is_bounded():
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+    assert all(0 <= policy.backoff(attempt) <= 4 for attempt in range(10))
+    assert policy.delay(0, "2") == 2
+    assert policy.delay(0, "100") == 4
+    assert parse_retry_after("garbage") is None
+    assert not policy.is_retryable(404)
+
+
+def test_circuit_breaker_opens_and_probes(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("app.retry.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    now[0] = 10
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    now[0] = 20
+    assert breaker.allow(), "проба без исхода не блокирует шард навсегда"
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_scrap_page_retries_transient_statuses():
+    statuses = [503, 429, 200]
+    received = []
+
+    async def catalog(request: web.Request) -> web.Response:
+        received.append(request.query["page"])
+        status = statuses.pop(0)
+        if status != 200:
+            return web.Response(status=status, headers={"Retry-After": "0"})
+        return web.json_response({"data": {"products": [{"id": 1}]}})
+
+    app = web.Application()
+    app.router.add_get("/{shard}/catalog", catalog)
+    async with TestServer(app) as server:
+        async with DataFetcher(
+            {}, {}, base_url=str(server.make_url("")).rstrip("/")
+        ) as data_fetcher:
+            data = await data_fetcher.scrap_page(
+                PageParams(1, "bl_shirts", "cat=1", 0, 100)
+            )
+
+    assert data["data"]["products"] == [{"id": 1}]
+    assert len(received) == 3
+    requests = data_fetcher.metrics.counter("wb_requests_total", "")
+    assert requests.value(shard="bl_shirts", status=503) == 1
+    assert requests.value(shard="bl_shirts", status=200) == 1
+
+
+@pytest.mark.asyncio
+async def test_scrap_page_fails_fast_when_shard_is_down():
+    received = []
+
+    async def catalog(request: web.Request) -> web.Response:
+        received.append(request.query["page"])
+        return web.Response(status=502)
+
+    app = web.Application()
+    app.router.add_get("/{shard}/catalog", catalog)
+    async with TestServer(app) as server:
+        async with DataFetcher(
+            {},
+            {},
+            base_url=str(server.make_url("")).rstrip("/"),
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+            circuit_breakers=CircuitBreakers(failure_threshold=2, reset_timeout=60),
+        ) as data_fetcher:
+            with pytest.raises(FetchError):
+                await data_fetcher.scrap_page(
+                    PageParams(1, "bl_shirts", "cat=1", 0, 100)
+                )
+            with pytest.raises(FetchError, match="недоступен"):
+                await data_fetcher.scrap_page(
+                    PageParams(2, "bl_shirts", "cat=1", 0, 100)
+                )
+
+    assert len(received) == 2
+
+
+@pytest.mark.asyncio
+async def test_scrap_page_recovers_after_throttled_probe():
+    statuses = [503, 503, 429, 200, 200]
+
+    async def catalog(request: web.Request) -> web.Response:
+        status = statuses.pop(0)
+        if status != 200:
+            return web.Response(status=status)
+        return web.json_response({"data": {"products": [{"id": 1}]}})
+
+    app = web.Application()
+    app.router.add_get("/{shard}/catalog", catalog)
+    breakers = CircuitBreakers(failure_threshold=2, reset_timeout=0)
+    async with TestServer(app) as server:
+        async with DataFetcher(
+            {},
+            {},
+            base_url=str(server.make_url("")).rstrip("/"),
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breakers=breakers,
+        ) as data_fetcher:
+            results = []
+            for page in range(1, 6):
+                try:
+                    results.append(
+                        await data_fetcher.scrap_page(
+                            PageParams(page, "bl_shirts", "cat=1", 0, 100)
+                        )
+                    )
+                except FetchError:
+                    results.append(None)
+
+    assert results[:3] == [None, None, None]
+    assert results[3]["data"]["products"] == [{"id": 1}]
+    assert results[4]["data"]["products"] == [{"id": 1}]
+    assert breakers.get("bl_shirts").state == CircuitBreaker.CLOSED
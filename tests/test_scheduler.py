@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.scheduler import Job, Scheduler
+
+
+def test_job_schedule_stays_on_grid_and_skips_missed_ticks():
+    job = Job("job", lambda: None, interval=10, next_run=100)
+    job.schedule_next(now=101)
+    assert job.next_run == 110
+    job.schedule_next(now=145)
+    assert job.next_run == 150
+
+
+@pytest.mark.asyncio
+async def test_scheduler_does_not_overlap_runs():
+    scheduler = Scheduler(shutdown_timeout=1)
+    started = []
+    release = asyncio.Event()
+
+    async def slow_job():
+        started.append(asyncio.get_running_loop().time())
+        await release.wait()
+
+    job = scheduler.add_job("slow", slow_job, interval=0.02)
+    runner = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.1)
+    release.set()
+    scheduler.stop()
+    await asyncio.wait_for(runner, 1)
+
+    assert len(started) == 1
+    assert job.skipped >= 2
+    assert job.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_on_own_cadence():
+    scheduler = Scheduler()
+    calls = {"fast": 0, "slow": 0}
+
+    def make(name):
+        async def job():
+            calls[name] += 1
+
+        return job
+
+    scheduler.add_job("fast", make("fast"), interval=0.02)
+    scheduler.add_job("slow", make("slow"), interval=10)
+    runner = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.15)
+    scheduler.stop()
+    await asyncio.wait_for(runner, 1)
+
+    assert calls["fast"] >= 4
+    assert calls["slow"] == 1
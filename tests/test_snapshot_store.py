@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from app.snapshot_store import SnapshotBackend, apply_schema, get_snapshot_backend
+
+
+@pytest.fixture
+def snapshot():
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "name": ["Блузка", "Брюки", "Платье"],
+            "price": [1000, 2000, 3000],
+            "salePriceU": [900, 1500, 2500],
+            "sale": [10, None, 17],
+            "brand": ["A", "B", "A"],
+            "supplier": ["S1", "S1", "S2"],
+            "link": ["l1", "l2", "l3"],
+        }
+    )
+
+
+@pytest.mark.parametrize("snapshot_format", ["csv", "parquet", "arrow"])
+def test_snapshot_roundtrip_reads_requested_columns(
+    snapshot_format, snapshot, tmp_path
+):
+    if snapshot_format != "csv":
+        pytest.importorskip("pyarrow")
+    backend = get_snapshot_backend(snapshot_format)
+    path = str(tmp_path / f"snapshot{backend.extension}")
+
+    backend.write(snapshot, path)
+    result = backend.read(path, ["id", "salePriceU"])
+
+    assert list(result.columns) == ["id", "salePriceU"]
+    assert result["salePriceU"].tolist() == [900, 1500, 2500]
+
+
+def test_apply_schema_uses_compact_and_dictionary_types(snapshot):
+    typed = apply_schema(snapshot)
+
+    assert typed["salePriceU"].dtype == "int32"
+    assert isinstance(typed["brand"].dtype, pd.CategoricalDtype)
+    assert typed["sale"].isna().sum() == 1
+
+
+def test_unknown_snapshot_format():
+    with pytest.raises(ValueError):
+        get_snapshot_backend("xlsx")
+
+
+def test_incomplete_backend_cannot_be_created():
+    class WriteOnlyBackend(SnapshotBackend):
+        name = "write-only"
+        extension = ".bin"
+
+        def write(self, df, path):
+            pass
+
+    with pytest.raises(TypeError):
+        WriteOnlyBackend()
@@ -0,0 +1,59 @@
+import time
+
+import pandas as pd
+import pytest
+
+from app.data_processor import DataProcessor
+from app.volatility import VolatilityTracker
+
+
+def test_volatile_categories_get_shorter_intervals(tmp_path):
+    path = tmp_path / "volatility.json"
+    tracker = VolatilityTracker(str(path), min_interval=10, max_interval=100)
+    tracker.mark_crawled("https://wb/volatile", "volatile", 5)
+    tracker.mark_crawled("https://wb/quiet", "quiet", 5)
+    for _ in range(3):
+        tracker.record("volatile", compared=100, changed=10, mean_change=40)
+        tracker.record("quiet", compared=100, changed=0, mean_change=0)
+    tracker.save()
+
+    restored = VolatilityTracker(str(path), min_interval=10, max_interval=100)
+    assert restored.interval("https://wb/volatile") == 10
+    assert restored.interval("https://wb/quiet") == 100
+    assert restored.interval("https://wb/new") == 10
+
+
+def test_select_due_respects_request_budget():
+    tracker = VolatilityTracker(min_interval=10, max_interval=100)
+    tracker.mark_crawled("https://wb/fresh", "fresh", 5)
+    tracker.mark_crawled("https://wb/old", "old", 50)
+    tracker.urls["https://wb/old"]["crawled_at"] = time.time() - 1000
+
+    urls = ["https://wb/fresh", "https://wb/old", "https://wb/new"]
+    assert tracker.select_due(urls) == ["https://wb/new", "https://wb/old"]
+    assert tracker.select_due(urls, request_budget=10) == ["https://wb/new"]
+
+
+@pytest.mark.asyncio
+async def test_process_file_records_change_stats(tmp_path):
+    tracker = VolatilityTracker()
+    processor = DataProcessor(
+        str(tmp_path / "c"),
+        str(tmp_path / "p"),
+        str(tmp_path / "ch"),
+        volatility_tracker=tracker,
+    )
+    current = pd.DataFrame({"id": [1, 2, 3], "salePriceU": [50, 200, 0]})
+    previous = pd.DataFrame({"id": [1, 2, 3], "salePriceU": [100, 200, 300]})
+
+    await processor.process_file(
+        current.add_suffix("_current").rename(columns={"id_current": "id"}),
+        previous.add_suffix("_previous").rename(columns={"id_previous": "id"}),
+        ["id"],
+        30,
+        category="Блузки",
+    )
+
+    stats = tracker.categories["Блузки"]
+    assert stats["change_rate"] == pytest.approx(1 / 3)
+    assert stats["magnitude"] == 50